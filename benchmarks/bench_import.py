@@ -0,0 +1,83 @@
+"""
+Measures how long `import spbu` takes in a fresh interpreter, and how long
+the first access to an endpoint function, such as `spbu.get_group_events`,
+takes to import what it needs.
+
+Times come from `python -X importtime`, so interpreter startup is not
+counted; the median of several runs is reported. Exits with status 1 if
+either takes longer than its budget, which CI enforces. Run from the
+repository root:
+
+    python benchmarks/bench_import.py [budget_ms [access_budget_ms]]
+"""
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+RUNS = 7
+DEFAULT_BUDGET_MS = 20
+# most of it is spent creating the dataclasses of spbu.types
+DEFAULT_ACCESS_BUDGET_MS = 75
+_IMPORT_TIME = re.compile(r'^import time:\s+\d+ \|\s+(\d+) \| (\s*)(\S+)$')
+
+
+def import_times(code: str) -> dict:
+    """
+    Cumulative import times in microseconds of the top-level modules
+    imported by `code`.
+    """
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        env=env, stderr=subprocess.PIPE, check=True,
+        universal_newlines=True
+    ).stderr
+    times = {}
+    for line in stderr.splitlines():
+        match = _IMPORT_TIME.match(line)
+        if match and not match.group(2):
+            times[match.group(3)] = int(match.group(1))
+    return times
+
+
+def median_ms(code: str) -> float:
+    """
+    Median time in milliseconds of the imports `code` makes, leaving out
+    the modules imported at interpreter startup.
+    """
+    startup = set(import_times('pass'))
+    runs = []
+    for _ in range(RUNS):
+        times = import_times(code)
+        runs.append(sum(
+            us for module, us in times.items() if module not in startup
+        ))
+    return statistics.median(runs) / 1000
+
+
+def main():
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 \
+        else DEFAULT_BUDGET_MS
+    access_budget = float(sys.argv[2]) if len(sys.argv) > 2 \
+        else DEFAULT_ACCESS_BUDGET_MS
+    package = median_ms('import spbu')
+    endpoint = median_ms('import spbu; spbu.get_group_events')
+    print(f'import spbu:                        {package:.1f}ms')
+    print(f'import spbu; spbu.get_group_events: {endpoint:.1f}ms')
+    failed = False
+    if package > budget:
+        print(f'import spbu takes longer than the {budget:.0f}ms budget')
+        failed = True
+    if endpoint > access_budget:
+        print(f'spbu.get_group_events takes longer than the '
+              f'{access_budget:.0f}ms budget')
+        failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
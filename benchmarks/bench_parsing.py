@@ -0,0 +1,73 @@
+"""
+Compares parsing many group weeks on the calling thread with parsing them in
+a process pool (`parse_processes`).
+
+HTTP is replaced by in-memory bodies, so only decoding and `de_json` are
+measured. Every week gets a body of its own group id and the memos of
+`spbu.util` are cleared before each run, so no week is answered from them.
+Run from the repository root:
+
+    python benchmarks/bench_parsing.py [number_of_weeks]
+"""
+import os
+import sys
+import time
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from spbu import bulk, util  # noqa: E402
+from spbu.types import GroupEvents  # noqa: E402
+
+DATASET = os.path.join(
+    os.path.dirname(__file__), '..', 'tests', 'datasets', 'groups_events.json'
+)
+
+
+def _bodies(body: bytes, weeks: int) -> dict:
+    return {
+        i: body.replace(b'"StudentGroupId":19082',
+                        b'"StudentGroupId":%d' % i)
+        for i in range(weeks)
+    }
+
+
+def _serve(bodies: dict):
+    def call_api_raw(method, path_values=None, params=None):
+        return bodies[path_values['id']]
+    return call_api_raw
+
+
+def run(body: bytes, weeks: int, parse_processes: int = None) -> float:
+    requests = {
+        i: bulk._group_events_request(i) for i in range(weeks)
+    }
+    bodies = _bodies(body, weeks)
+    util._decoded.clear()
+    util._parsed.clear()
+    with patch('spbu.util.call_api_raw', side_effect=_serve(bodies)):
+        started = time.perf_counter()
+        for _ in bulk.iter_fetched(GroupEvents, requests,
+                                   parse_processes=parse_processes):
+            pass
+        return time.perf_counter() - started
+
+
+def main():
+    weeks = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    with open(DATASET, 'rb') as f:
+        body = f.read()
+
+    baseline = run(body, weeks)
+    print(f'{weeks} weeks, {len(body)} bytes each')
+    print(f'in-thread parsing: {baseline:.2f}s')
+    processes = 1
+    while processes <= (os.cpu_count() or 1):
+        elapsed = run(body, weeks, processes)
+        print(f'{processes:>3} processes:     {elapsed:.2f}s '
+              f'(x{baseline / elapsed:.2f})')
+        processes *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,58 @@
-from . import consts, types
-from .addresses import get_addresses, get_classrooms
-from .classrooms import is_classroom_busy, get_classroom_events
-from .educators import (get_educator_term_events, search_educator,
-                        get_educator_events)
-from .extracurdivisions import get_extracur_divisions, get_extracur_events
-from .groups import get_group_events
-from .programs import get_groups
-from .studydivisions import get_study_divisions, get_study_levels
-from .types import ApiException
+"""
+The endpoint functions and submodules are imported on first use, so
+`import spbu` stays cheap: `spbu.get_group_events` loads only the modules
+that function needs.
+"""
+import importlib
+
+# exported name -> submodule it is defined in
+_EXPORTS = {
+    'get_addresses': 'addresses',
+    'get_classrooms': 'addresses',
+    'get_many_group_events': 'bulk',
+    'get_many_educator_term_events': 'bulk',
+    'get_many_classrooms': 'bulk',
+    'get_educator_events_chunked': 'bulk',
+    'get_group_events_chunked': 'bulk',
+    'is_classroom_busy': 'classrooms',
+    'get_classroom_events': 'classrooms',
+    'crawl': 'crawler',
+    'get_educator_term_events': 'educators',
+    'search_educator': 'educators',
+    'get_educator_events': 'educators',
+    'get_extracur_divisions': 'extracurdivisions',
+    'get_extracur_events': 'extracurdivisions',
+    'get_group_events': 'groups',
+    'iter_group_weeks': 'groups',
+    'get_groups': 'programs',
+    'find_free_slots': 'slots',
+    'get_study_divisions': 'studydivisions',
+    'get_study_levels': 'studydivisions',
+    'resync': 'sync',
+    'ApiException': 'types',
+}
+
+__all__ = ['consts', 'types'] + list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name in _EXPORTS:
+        module = importlib.import_module(f'.{_EXPORTS[name]}', __name__)
+        value = getattr(module, name)
+    elif not name.startswith('__'):
+        try:
+            value = importlib.import_module(f'.{name}', __name__)
+        except ModuleNotFoundError as e:
+            if e.name != f'{__name__}.{name}':
+                raise
+            raise AttributeError(
+                f'module {__name__!r} has no attribute {name!r}'
+            ) from None
+    else:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
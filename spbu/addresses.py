@@ -22,22 +22,22 @@ def _create_params(seating: SeatingTypes = None, capacity: int = None,
 
 def get_addresses(seating: SeatingTypes = None, capacity: int = None,
                   equipment: str = None) -> List[Address]:
-    return [
-        Address.de_json(adr)
-        for adr in util.call_api(
+    return util.parse_list(
+        Address,
+        util.call_api(
             method=APIMethods.A_ADDRESSES,
             params=_create_params(seating, capacity, equipment)
         )
-    ]
+    )
 
 
 def get_classrooms(oid: str, seating: SeatingTypes = None, capacity: int = None,
                    equipment: str = None) -> List[Classroom]:
-    return [
-        Classroom.de_json(cls)
-        for cls in util.call_api(
+    return util.parse_list(
+        Classroom,
+        util.call_api(
             method=APIMethods.A_CLASSROOMS,
             path_values={'oid': oid},
             params=_create_params(seating, capacity, equipment)
         )
-    ]
+    )
@@ -0,0 +1,258 @@
+from concurrent.futures import (ThreadPoolExecutor, ProcessPoolExecutor,
+                                FIRST_COMPLETED, Future, wait)
+from dataclasses import replace
+from datetime import date, timedelta
+from typing import (Callable, Dict, Hashable, Iterable, Iterator, List,
+                    Optional, Tuple, Type, TypeVar)
+
+from . import util
+from .addresses import get_addresses, get_classrooms
+from .consts import APIMethods, ChunkSizes, LessonsTypes
+from .educators import _educator_term_events_request, get_educator_events
+from .groups import _group_events_request, get_group_events
+from .types import (_JsonDeserializable, Address, Classroom, EducatorEvents,
+                    GroupEvents, EducatorEventsTerm)
+
+KEY = TypeVar('KEY', bound=Hashable)
+PARSED = TypeVar('PARSED', bound=_JsonDeserializable)
+EVENTS = TypeVar('EVENTS', GroupEvents, EducatorEvents)
+Request = Tuple[APIMethods, dict, dict]
+
+default_max_workers = 8
+default_parse_batch_size = 16
+
+
+def parse_response(cls: Type[PARSED], content: bytes) -> PARSED:
+    return util.parse(cls, util.decode(content))
+
+
+def _parse_batch(cls: Type[PARSED], contents: List[bytes]) -> List[PARSED]:
+    # runs in a worker process; one pickled list per batch keeps the
+    # inter-process traffic low and lets pickle share repeated strings
+    return [parse_response(cls, content) for content in contents]
+
+
+def iter_fetched(cls: Type[PARSED], requests: Dict[KEY, Request],
+                 max_workers: int = default_max_workers,
+                 parse_processes: Optional[int] = None,
+                 parse_batch_size: int = default_parse_batch_size,
+                 return_exceptions: bool = False
+                 ) -> Iterator[Tuple[KEY, PARSED]]:
+    """
+    Fetches every request concurrently and yields `(key, parsed)` pairs in
+    completion order.
+
+    :param cls: type every response body is parsed into
+    :param requests: `(method, path_values, params)` triples by key
+    :param max_workers: number of concurrent HTTP requests
+    :param parse_processes: if set, raw bodies are sent to a pool of that many
+        processes for json decoding and `de_json`, so parsing is not limited
+        to one core. Pass `os.cpu_count()` to use every core.
+    :param parse_batch_size: max number of bodies sent to a worker process
+        at once
+    :param return_exceptions: yield a failed request's exception in place of
+        the parsed object instead of raising it
+    """
+    parse_pool = None
+    if parse_processes:
+        parse_pool = ProcessPoolExecutor(parse_processes)
+    http_pool = ThreadPoolExecutor(max_workers)
+    fetching = {
+        http_pool.submit(util.call_api_raw, *request): key
+        for key, request in requests.items()
+    }
+    parsing = {}
+    buffered_keys, buffered_contents = [], []
+
+    def submit_batch() -> Future:
+        nonlocal buffered_keys, buffered_contents
+        batch = parse_pool.submit(_parse_batch, cls, buffered_contents)
+        parsing[batch] = buffered_keys, buffered_contents
+        buffered_keys, buffered_contents = [], []
+        return batch
+
+    pending = set(fetching)
+    try:
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                exc = future.exception()
+                if future in parsing:
+                    batch_keys, batch_contents = parsing.pop(future)
+                    if exc is None:
+                        yield from zip(batch_keys, future.result())
+                    elif not return_exceptions:
+                        raise exc
+                    else:
+                        # parse the failed batch again one body at a time
+                        # to find out which of them are broken
+                        for key, content in zip(batch_keys, batch_contents):
+                            try:
+                                parsed = parse_response(cls, content)
+                            except Exception as e:
+                                parsed = e
+                            yield key, parsed
+                    continue
+                key = fetching.pop(future)
+                if exc is not None:
+                    if not return_exceptions:
+                        raise exc
+                    yield key, exc
+                elif parse_pool is not None:
+                    buffered_keys.append(key)
+                    buffered_contents.append(future.result())
+                    if len(buffered_keys) >= parse_batch_size:
+                        pending.add(submit_batch())
+                else:
+                    try:
+                        parsed = parse_response(cls, future.result())
+                    except Exception as e:
+                        if not return_exceptions:
+                            raise
+                        parsed = e
+                    yield key, parsed
+            if buffered_keys and not fetching:
+                pending.add(submit_batch())
+    finally:
+        for future in pending:
+            future.cancel()
+        http_pool.shutdown()
+        if parse_pool is not None:
+            parse_pool.shutdown()
+
+
+def get_many_group_events(group_ids: Iterable[int], from_date: date = None,
+                          to_date: date = None,
+                          lessons_type: LessonsTypes = LessonsTypes.UNKNOWN,
+                          max_workers: int = default_max_workers,
+                          parse_processes: Optional[int] = None
+                          ) -> Dict[int, GroupEvents]:
+    return dict(iter_fetched(
+        GroupEvents,
+        {
+            group_id: _group_events_request(
+                group_id, from_date, to_date, lessons_type
+            )
+            for group_id in group_ids
+        },
+        max_workers=max_workers,
+        parse_processes=parse_processes
+    ))
+
+
+def get_many_educator_term_events(educator_ids: Iterable[int],
+                                  next_term: bool = False,
+                                  max_workers: int = default_max_workers,
+                                  parse_processes: Optional[int] = None
+                                  ) -> Dict[int, EducatorEventsTerm]:
+    return dict(iter_fetched(
+        EducatorEventsTerm,
+        {
+            educator_id: _educator_term_events_request(educator_id, next_term)
+            for educator_id in educator_ids
+        },
+        max_workers=max_workers,
+        parse_processes=parse_processes
+    ))
+
+
+def get_many_classrooms(address_oids: Iterable[str] = None,
+                        equipment: str = None,
+                        max_workers: int = default_max_workers
+                        ) -> List[Tuple[Address, Classroom]]:
+    """
+    Every classroom of the addresses with oids `address_oids`, or of all
+    addresses, with its address. The classrooms of the addresses are
+    requested concurrently.
+    """
+    address_oids = set(address_oids) if address_oids else None
+    addresses = [
+        address for address in get_addresses()
+        if address_oids is None or address.oid in address_oids
+    ]
+    with ThreadPoolExecutor(max_workers) as pool:
+        classrooms_lists = list(pool.map(
+            lambda address: get_classrooms(address.oid, equipment=equipment),
+            addresses
+        ))
+    return [
+        (address, classroom)
+        for address, classrooms in zip(addresses, classrooms_lists)
+        for classroom in classrooms
+    ]
+
+
+def split_range(_from: date, _to: date, chunk: ChunkSizes = ChunkSizes.WEEK
+                ) -> List[Tuple[date, date]]:
+    """
+    Splits the days from `_from` to `_to` inclusive into `(first, last)`
+    chunks ending on Sundays or on the last days of months. A range no
+    longer than a chunk, of 7 or 31 days, is left whole.
+    """
+    chunk_days = 7 if chunk is ChunkSizes.WEEK else 31
+    if _from <= _to and (_to - _from).days < chunk_days:
+        return [(_from, _to)]
+    chunks = []
+    first = _from
+    while first <= _to:
+        if chunk is ChunkSizes.WEEK:
+            last = first + timedelta(days=6 - first.weekday())
+        else:
+            next_month = date(first.year + first.month // 12,
+                              first.month % 12 + 1, 1)
+            last = next_month - timedelta(days=1)
+        last = min(last, _to)
+        chunks.append((first, last))
+        first = last + timedelta(days=1)
+    return chunks
+
+
+def _get_chunked(fetch: Callable[[date, date], EVENTS], days_field: str,
+                 _from: date, _to: date, chunk: ChunkSizes,
+                 max_workers: int) -> EVENTS:
+    chunks = split_range(_from, _to, chunk)
+    if len(chunks) <= 1:
+        return fetch(_from, _to)
+    with ThreadPoolExecutor(min(max_workers, len(chunks))) as pool:
+        parts = list(pool.map(lambda c: fetch(*c), chunks))
+    days = []
+    for (first, last), part in zip(chunks, parts):
+        days.extend(
+            day for day in getattr(part, days_field)
+            if day.day is None or first <= day.day <= last
+        )
+    return replace(parts[0], **{days_field: days})
+
+
+def get_educator_events_chunked(educator_id: int, _from: date, _to: date,
+                                lessons_type: LessonsTypes =
+                                LessonsTypes.UNKNOWN,
+                                chunk: ChunkSizes = ChunkSizes.WEEK,
+                                max_workers: int = default_max_workers
+                                ) -> EducatorEvents:
+    """
+    `get_educator_events` for a long range, requested as concurrent
+    requests of a week or a month each and merged into one timetable.
+    """
+    return _get_chunked(
+        lambda first, last: get_educator_events(educator_id, first, last,
+                                                lessons_type),
+        'educator_events_days', _from, _to, chunk, max_workers
+    )
+
+
+def get_group_events_chunked(group_id: int, from_date: date, to_date: date,
+                             lessons_type: LessonsTypes =
+                             LessonsTypes.UNKNOWN,
+                             chunk: ChunkSizes = ChunkSizes.WEEK,
+                             max_workers: int = default_max_workers
+                             ) -> GroupEvents:
+    """
+    `get_group_events` for a long range, requested as concurrent requests
+    of a week or a month each and merged into one timetable.
+    """
+    return _get_chunked(
+        lambda first, last: get_group_events(group_id, first, last,
+                                             lessons_type),
+        'days', from_date, to_date, chunk, max_workers
+    )
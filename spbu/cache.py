@@ -0,0 +1,478 @@
+import os
+import pickle
+import threading
+import time
+import zlib
+from collections import Counter, OrderedDict, defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Set
+
+default_cache_ttl = int(os.getenv('SPBU_TT_API_CACHE_TTL', '600'))
+default_cache_max_bytes = int(os.getenv('SPBU_TT_API_CACHE_MAX_BYTES',
+                                        str(64 * 2 ** 20)))
+default_cache_max_entries = int(os.getenv('SPBU_TT_API_CACHE_MAX_ENTRIES',
+                                          '10000'))
+default_stale_ttl = int(os.getenv('SPBU_TT_API_CACHE_STALE_TTL', '3600'))
+default_negative_ttl = int(os.getenv('SPBU_TT_API_CACHE_NEGATIVE_TTL', '60'))
+default_refresh_workers = int(os.getenv('SPBU_TT_API_CACHE_REFRESH_WORKERS',
+                                        '4'))
+
+# bodies of responses that have nothing in them
+EMPTY_BODIES = (b'', b'null', b'[]', b'{}')
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe mapping whose entries expire `ttl` seconds after they were
+    put. It holds at most `max_entries` entries, dropping the ones put the
+    longest ago first.
+    """
+    def __init__(self, ttl: float = default_cache_ttl,
+                 max_entries: int = default_cache_max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return default
+            return value
+
+    def put(self, key: Hashable, value: Any, ttl: Optional[float] = None
+            ) -> None:
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = expires_at, value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    rejections: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        if not total:
+            return 0.0
+        return self.hits / total
+
+
+class _Stored:
+    __slots__ = ('value', 'size', 'raw_size', 'expires_at', 'frequency',
+                 'compressed', 'in_window')
+
+    def __init__(self, value: Any, size: int, raw_size: int,
+                 expires_at: float, compressed: bool):
+        self.value = value
+        self.size = size
+        self.raw_size = raw_size
+        self.expires_at = expires_at
+        self.frequency = 1
+        self.compressed = compressed
+        self.in_window = True
+
+
+class BoundedCache:
+    """
+    Thread-safe cache holding at most `max_bytes`, usable wherever a
+    `TTLCache` is.
+
+    With `compress` set, values are stored pickled and zlib-compressed and
+    weigh the size of the compressed payload; otherwise they are stored as
+    they are and weigh `parsed_size_factor` times their pickled size, a
+    rough estimate of the memory taken by the objects. A compressed entry
+    read `hot_frequency` times is unpacked and kept as it is from then on,
+    so hot entries are not unpickled on every read.
+
+    New entries go to an admission window of `window_fraction` of the
+    budget, evicted least recently used first. An entry leaving the window
+    enters the main part only if its key was looked up or put more often
+    lately than the key it would evict, so a burst of one-off entries
+    does not push out the entries in use. The main part evicts the least
+    frequently used entries, the least recently used first among equally
+    frequent ones. Frequencies and lookup counts are halved every
+    `aging_period` lookups, so entries that were popular long ago do not
+    stay forever. Values larger than the whole budget are not stored.
+    Counters are kept in `stats`.
+    """
+    def __init__(self, max_bytes: int = default_cache_max_bytes,
+                 ttl: float = default_cache_ttl, compress: bool = True,
+                 compress_level: int = 6, parsed_size_factor: float = 6.0,
+                 aging_period: int = 10000, window_fraction: float = 0.01,
+                 hot_frequency: int = 4):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.compress = compress
+        self.compress_level = compress_level
+        self.parsed_size_factor = parsed_size_factor
+        self.aging_period = aging_period
+        self.window_bytes = int(max_bytes * window_fraction)
+        self.hot_frequency = hot_frequency
+        self.size = 0
+        self.stats = CacheStats()
+        self._entries: Dict[Hashable, _Stored] = {}
+        # keys of the admission window, least recently used first
+        self._window: OrderedDict = OrderedDict()
+        self._window_size = 0
+        # frequency -> keys of the main part of that frequency, least
+        # recently used first
+        self._by_frequency: Dict[int, OrderedDict] = defaultdict(OrderedDict)
+        # hash of key -> recent lookups and puts, kept for evicted keys too
+        self._seen: Counter = Counter()
+        self._lookups = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def _link(self, key: Hashable, entry: _Stored) -> None:
+        if entry.in_window:
+            self._window[key] = None
+            self._window_size += entry.size
+        else:
+            self._by_frequency[entry.frequency][key] = None
+
+    def _unlink(self, key: Hashable, entry: _Stored) -> None:
+        if entry.in_window:
+            del self._window[key]
+            self._window_size -= entry.size
+            return
+        keys = self._by_frequency[entry.frequency]
+        del keys[key]
+        if not keys:
+            del self._by_frequency[entry.frequency]
+
+    def _remove(self, key: Hashable) -> _Stored:
+        entry = self._entries.pop(key)
+        self._unlink(key, entry)
+        self.size -= entry.size
+        return entry
+
+    def _evict(self, key: Hashable) -> None:
+        entry = self._remove(key)
+        if entry.expires_at <= time.time():
+            self.stats.expirations += 1
+        else:
+            self.stats.evictions += 1
+
+    def _count(self, key: Hashable) -> None:
+        self._seen[hash(key)] += 1
+        self._lookups += 1
+        if self._lookups >= self.aging_period:
+            self._lookups = 0
+            self._age()
+
+    def _age(self) -> None:
+        self._by_frequency = defaultdict(OrderedDict)
+        for key, entry in self._entries.items():
+            entry.frequency = max(entry.frequency // 2, 1)
+            if not entry.in_window:
+                self._by_frequency[entry.frequency][key] = None
+        self._seen = Counter({
+            key_hash: count // 2 for key_hash, count in self._seen.items()
+            if count > 1
+        })
+
+    def _victim(self, exclude: Hashable = _MISSING) -> Any:
+        for frequency in sorted(self._by_frequency):
+            for key in self._by_frequency[frequency]:
+                if key != exclude:
+                    return key
+        return _MISSING
+
+    def _main_size(self) -> int:
+        return self.size - self._window_size
+
+    def _admit(self, key: Hashable) -> None:
+        """
+        Moves the entry of `key` from the window to the main part, or drops
+        it if it is not used more than the entries it would evict.
+        """
+        entry = self._entries[key]
+        self._unlink(key, entry)
+        entry.in_window = False
+        main_bytes = self.max_bytes - self.window_bytes
+        if entry.size > main_bytes:
+            self._entries.pop(key)
+            self.size -= entry.size
+            self.stats.rejections += 1
+            return
+        count = self._seen[hash(key)]
+        while self._main_size() > main_bytes:
+            victim = self._victim(key)
+            if victim is _MISSING:
+                break
+            victim_entry = self._entries[victim]
+            if victim_entry.expires_at > time.time() \
+                    and self._seen[hash(victim)] >= count:
+                break
+            self._evict(victim)
+        if self._main_size() > main_bytes:
+            self._entries.pop(key)
+            self.size -= entry.size
+            self.stats.rejections += 1
+            return
+        self._link(key, entry)
+
+    def _fit(self, keep: Hashable = _MISSING) -> None:
+        while self._window_size > self.window_bytes:
+            self._admit(next(iter(self._window)))
+        while self.size > self.max_bytes:
+            victim = self._victim(keep)
+            if victim is _MISSING:
+                break
+            self._evict(victim)
+
+    def _promote(self, key: Hashable, entry: _Stored, value: Any) -> None:
+        """
+        Keeps the unpacked `value` of a hot entry instead of its compressed
+        payload, evicting colder entries to make room.
+        """
+        if self._entries.get(key) is not entry or not entry.compressed:
+            return
+        size = int(entry.raw_size * self.parsed_size_factor)
+        if size > self.max_bytes - self.window_bytes:
+            return
+        self._unlink(key, entry)
+        self.size += size - entry.size
+        entry.size = size
+        entry.value = value
+        entry.compressed = False
+        self._link(key, entry)
+        self._fit(key)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            self._count(key)
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= time.time():
+                self._remove(key)
+                self.stats.expirations += 1
+                entry = None
+            if entry is None:
+                self.stats.misses += 1
+                return default
+            self.stats.hits += 1
+            self._unlink(key, entry)
+            entry.frequency += 1
+            self._link(key, entry)
+            if not entry.compressed:
+                return entry.value
+            payload = entry.value
+        value = pickle.loads(zlib.decompress(payload))
+        if entry.frequency >= self.hot_frequency:
+            with self._lock:
+                self._promote(key, entry, value)
+        return value
+
+    def put(self, key: Hashable, value: Any, ttl: Optional[float] = None
+            ) -> None:
+        payload = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        if self.compress:
+            value = zlib.compress(payload, self.compress_level)
+            size = len(value)
+        else:
+            size = int(len(payload) * self.parsed_size_factor)
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._count(key)
+            frequency = 1
+            if key in self._entries:
+                frequency = self._remove(key).frequency
+            if size > self.max_bytes:
+                self.stats.rejections += 1
+                return
+            entry = _Stored(value, size, len(payload), expires_at,
+                            self.compress)
+            entry.frequency = frequency
+            self._entries[key] = entry
+            self._link(key, entry)
+            self.size += size
+            self._fit()
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            if key not in self._entries:
+                return default
+            entry = self._remove(key)
+        if entry.compressed:
+            return pickle.loads(zlib.decompress(entry.value))
+        return entry.value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._window.clear()
+            self._by_frequency.clear()
+            self._seen.clear()
+            self._window_size = 0
+            self.size = 0
+
+
+class _Response:
+    def __init__(self, body: Optional[bytes], error: Optional[Exception],
+                 fresh_until: float, stale_until: float):
+        self.body = body
+        self.error = error
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+        self.refreshing = False
+
+
+def _is_not_found(error: Exception) -> bool:
+    result = getattr(error, 'result', None)
+    return getattr(result, 'status_code', None) == 404
+
+
+class ResponseCache:
+    """
+    Cache of raw API responses with stale-while-revalidate and negative
+    caching. Set it as `spbu.util.response_cache` to have `call_api` and
+    `call_api_raw` go through it.
+
+    A response is fresh for `ttl` seconds and then stale for `stale_ttl`
+    more: a stale response is returned at once while it is requested again
+    in the background, by up to `refresh_workers` threads shared by the
+    cache, so only the first request of a key waits for the server. Failed
+    background requests keep the stale response.
+
+    404 responses and empty bodies are cached for `negative_ttl` seconds
+    with no stale period, 404s being raised again as the same exception.
+
+    The bodies held weigh at most `max_bytes`; the least recently used
+    responses are dropped first.
+    """
+    def __init__(self, ttl: float = default_cache_ttl,
+                 stale_ttl: float = default_stale_ttl,
+                 negative_ttl: float = default_negative_ttl,
+                 refresh_workers: int = default_refresh_workers,
+                 max_bytes: int = default_cache_max_bytes):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.negative_ttl = negative_ttl
+        self.refresh_workers = refresh_workers
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._responses: Dict[Hashable, _Response] = OrderedDict()
+        self._refresh_pool: Optional[ThreadPoolExecutor] = None
+        self._refreshes: Set[Future] = set()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._responses.clear()
+            self.size = 0
+
+    def _pop(self, key: Hashable) -> None:
+        response = self._responses.pop(key, None)
+        if response is not None:
+            self.size -= len(response.body or b'')
+
+    def _fetch(self, key: Hashable, fetch: Callable[[], bytes]
+               ) -> _Response:
+        try:
+            body, error = fetch(), None
+        except Exception as e:
+            if not _is_not_found(e):
+                raise
+            body, error = None, e
+        now = time.time()
+        if error is not None or body.strip() in EMPTY_BODIES:
+            response = _Response(body, error, now + self.negative_ttl,
+                                 now + self.negative_ttl)
+        else:
+            response = _Response(body, None, now + self.ttl,
+                                 now + self.ttl + self.stale_ttl)
+        with self._lock:
+            self._pop(key)
+            self._responses[key] = response
+            self.size += len(body or b'')
+            while self.size > self.max_bytes:
+                self._pop(next(iter(self._responses)))
+        return response
+
+    def _refresh(self, key: Hashable, fetch: Callable[[], bytes],
+                 stale: _Response) -> None:
+        try:
+            self._fetch(key, fetch)
+        except Exception:
+            pass
+        finally:
+            stale.refreshing = False
+
+    def get(self, key: Hashable, fetch: Callable[[], bytes]) -> bytes:
+        """
+        The response body of `key`, calling `fetch` for it when it is
+        missing or expired, and in the background when it is stale.
+        """
+        now = time.time()
+        with self._lock:
+            response = self._responses.get(key)
+            if response is not None and response.stale_until <= now:
+                self._pop(key)
+                response = None
+            if response is not None:
+                self._responses.move_to_end(key)
+            if response is not None and response.fresh_until <= now \
+                    and not response.refreshing:
+                response.refreshing = True
+                if self._refresh_pool is None:
+                    self._refresh_pool = ThreadPoolExecutor(
+                        self.refresh_workers
+                    )
+                refresh = self._refresh_pool.submit(self._refresh, key, fetch,
+                                                    response)
+                self._refreshes.add(refresh)
+                refresh.add_done_callback(self._refreshes.discard)
+        if response is None:
+            response = self._fetch(key, fetch)
+        if response.error is not None:
+            # a fresh traceback, not one growing with every cached raise
+            raise response.error.with_traceback(None)
+        return response.body
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """
+        Waits for the background refreshes running now to finish.
+        """
+        with self._lock:
+            refreshes = list(self._refreshes)
+        wait(refreshes, timeout)
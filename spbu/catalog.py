@@ -0,0 +1,203 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .bulk import default_max_workers
+from .programs import get_groups
+from .snapshot import (Snapshot, STUDY_DIVISIONS_KEY, study_levels_key,
+                       groups_key)
+from .studydivisions import get_study_divisions, get_study_levels
+from .types import (PGGroup, SDPLAdmissionYear, SDPLProgramCombination,
+                    SDPLStudyLevel, SDStudyDivision)
+
+# the hierarchy changes about once a semester
+default_catalog_ttl = int(os.getenv('SPBU_TT_API_CATALOG_TTL', '604800'))
+
+Tree = Tuple[List[SDStudyDivision], Dict[str, List[SDPLStudyLevel]],
+             Dict[int, List[PGGroup]]]
+
+
+def normalize_name(name: Optional[str]) -> str:
+    return ' '.join((name or '').lower().split())
+
+
+@dataclass
+class CatalogProgram:
+    division: SDStudyDivision
+    level: SDPLStudyLevel
+    combination: SDPLProgramCombination
+    admission_year: SDPLAdmissionYear
+    groups: List[PGGroup] = field(default_factory=list)
+
+
+class _Indexes:
+    def __init__(self, tree: Tree):
+        divisions, levels_by_alias, groups_by_program = tree
+        self.divisions: Dict[str, SDStudyDivision] = {
+            division.alias: division for division in divisions
+        }
+        self.programs: Dict[int, CatalogProgram] = {}
+        self.groups: Dict[int, PGGroup] = {}
+        self.programs_by_group: Dict[int, CatalogProgram] = {}
+        self.groups_by_name: Dict[str, List[PGGroup]] = defaultdict(list)
+        self.groups_by_division: Dict[str, List[PGGroup]] = defaultdict(list)
+        for division in divisions:
+            for level in levels_by_alias.get(division.alias, []):
+                for combination in level.study_program_combinations:
+                    for admission_year in combination.admission_years:
+                        program_id = admission_year.study_program_id
+                        if program_id in self.programs:
+                            continue
+                        program = CatalogProgram(
+                            division, level, combination, admission_year,
+                            groups_by_program.get(program_id, [])
+                        )
+                        self.programs[program_id] = program
+                        for group in program.groups:
+                            self._add_group(program, group)
+
+    def _add_group(self, program: CatalogProgram, group: PGGroup) -> None:
+        if group.student_group_id in self.groups:
+            return
+        self.groups[group.student_group_id] = group
+        self.programs_by_group[group.student_group_id] = program
+        self.groups_by_name[normalize_name(group.student_group_name)].append(
+            group
+        )
+        self.groups_by_division[program.division.alias].append(group)
+
+
+def fetch_tree(max_workers: int = default_max_workers) -> Tree:
+    """
+    Fetches study divisions, their study levels and the groups of every
+    program, the levels and the groups concurrently.
+    """
+    divisions = get_study_divisions()
+    with ThreadPoolExecutor(max_workers) as pool:
+        aliases = [division.alias for division in divisions]
+        levels_by_alias = dict(zip(aliases,
+                                   pool.map(get_study_levels, aliases)))
+        program_ids = list(dict.fromkeys(
+            admission_year.study_program_id
+            for levels in levels_by_alias.values()
+            for level in levels
+            for combination in level.study_program_combinations
+            for admission_year in combination.admission_years
+            if not admission_year.is_empty
+        ))
+        groups_by_program = dict(zip(program_ids,
+                                     pool.map(get_groups, program_ids)))
+    return divisions, levels_by_alias, groups_by_program
+
+
+def read_tree(snapshot: Snapshot) -> Tree:
+    """
+    Reads the hierarchy stored in a crawled snapshot.
+    """
+    def load(key: str):
+        content = snapshot.sink.get(key)
+        return json.loads(content) if content is not None else None
+
+    divisions = [
+        SDStudyDivision.de_json(obj)
+        for obj in load(STUDY_DIVISIONS_KEY) or []
+    ]
+    levels_by_alias, groups_by_program = {}, {}
+    for division in divisions:
+        levels = load(study_levels_key(division.alias))
+        if levels is None:
+            continue
+        levels_by_alias[division.alias] = [
+            SDPLStudyLevel.de_json(obj) for obj in levels
+        ]
+        for level in levels_by_alias[division.alias]:
+            for combination in level.study_program_combinations:
+                for admission_year in combination.admission_years:
+                    program_id = admission_year.study_program_id
+                    groups = load(groups_key(program_id))
+                    if groups is not None:
+                        groups_by_program[program_id] = [
+                            PGGroup.de_json(obj) for obj in groups["Groups"]
+                        ]
+    return divisions, levels_by_alias, groups_by_program
+
+
+class Catalog:
+    """
+    The division → study level → program combination → admission year →
+    group tree, loaded once and kept for `ttl` seconds, with dictionary
+    lookups. The first lookup after the TTL has passed reloads the tree;
+    lookups made during a reload are answered from the previous tree.
+    """
+    def __init__(self, ttl: float = default_catalog_ttl,
+                 loader: Callable[[], Tree] = fetch_tree):
+        self.ttl = ttl
+        self.loader = loader
+        self.loaded_at: Optional[float] = None
+        self._indexes: Optional[_Indexes] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Snapshot,
+                      ttl: float = default_catalog_ttl) -> 'Catalog':
+        return cls(ttl, lambda: read_tree(snapshot))
+
+    def load(self) -> 'Catalog':
+        with self._lock:
+            self._indexes = _Indexes(self.loader())
+            self.loaded_at = time.time()
+        return self
+
+    def _current(self) -> _Indexes:
+        indexes = self._indexes
+        if indexes is None:
+            with self._lock:
+                if self._indexes is None:
+                    self._indexes = _Indexes(self.loader())
+                    self.loaded_at = time.time()
+                return self._indexes
+        if time.time() - self.loaded_at >= self.ttl:
+            if self._lock.acquire(blocking=False):
+                try:
+                    self._indexes = _Indexes(self.loader())
+                    self.loaded_at = time.time()
+                except Exception:
+                    # keep answering from the previous tree and try again
+                    # in a minute
+                    self.loaded_at = time.time() - self.ttl + min(self.ttl,
+                                                                  60)
+                finally:
+                    self._lock.release()
+            return self._indexes
+        return indexes
+
+    def division(self, alias: str) -> Optional[SDStudyDivision]:
+        return self._current().divisions.get(alias)
+
+    def program(self, study_program_id: int) -> Optional[CatalogProgram]:
+        return self._current().programs.get(study_program_id)
+
+    def group(self, group_id: int) -> Optional[PGGroup]:
+        return self._current().groups.get(group_id)
+
+    def groups_by_name(self, name: str) -> List[PGGroup]:
+        """
+        Groups named `name`, ignoring case and repeated spaces.
+        """
+        return list(
+            self._current().groups_by_name.get(normalize_name(name), [])
+        )
+
+    def program_of_group(self, group_id: int) -> Optional[CatalogProgram]:
+        return self._current().programs_by_group.get(group_id)
+
+    def division_groups(self, alias: str) -> List[PGGroup]:
+        return list(self._current().groups_by_division.get(alias, []))
+
+    def groups(self) -> List[PGGroup]:
+        return list(self._current().groups.values())
@@ -2,6 +2,8 @@ from datetime import datetime
 
 from . import util
 from .consts import APIMethods
+from .intervals import IntervalIndex
+from .occurrences import iter_classroom_occurrences
 from .types import ClassroomBusyness, ClassroomEvents
 
 
@@ -11,7 +13,8 @@ def _create_string_from_datetime(dt: datetime) -> str:
 
 def is_classroom_busy(oid: str, start: datetime,
                       end: datetime) -> ClassroomBusyness:
-    return ClassroomBusyness.de_json(
+    return util.parse(
+        ClassroomBusyness,
         util.call_api(
             method=APIMethods.C_IS_BUSY,
             path_values={
@@ -25,7 +28,8 @@ def is_classroom_busy(oid: str, start: datetime,
 
 def get_classroom_events(oid: str, _from: datetime,
                          _to: datetime) -> ClassroomEvents:
-    return ClassroomEvents.de_json(
+    return util.parse(
+        ClassroomEvents,
         util.call_api(
             method=APIMethods.C_EVENTS,
             path_values={
@@ -35,3 +39,52 @@ def get_classroom_events(oid: str, _from: datetime,
             }
         )
     )
+
+
+class ClassroomSchedule:
+    """
+    Local `is_classroom_busy` for one classroom, built from its
+    `ClassroomEvents`. Busy intervals are kept in an `IntervalIndex`, so a
+    query is a binary search; queries outside the loaded ranges fall back to
+    the API.
+    """
+    def __init__(self, oid: str):
+        self.oid = oid
+        self.covered = IntervalIndex()
+        self.busy = IntervalIndex()
+
+    @classmethod
+    def load(cls, oid: str, _from: datetime,
+             _to: datetime) -> 'ClassroomSchedule':
+        schedule = cls(oid)
+        schedule.add(get_classroom_events(oid, _from, _to))
+        return schedule
+
+    def add(self, classroom_events: ClassroomEvents) -> None:
+        """
+        Adds the events of another range; the known events of that range
+        are replaced.
+        """
+        _from = classroom_events.from_datetime
+        _to = classroom_events.to_datetime
+        kept = [
+            piece
+            for start, end in self.busy
+            for piece in ((start, min(end, _from)), (max(start, _to), end))
+        ]
+        self.busy = IntervalIndex(kept + [
+            (occurrence.start, occurrence.end)
+            for occurrence in iter_classroom_occurrences(classroom_events)
+            if not occurrence.is_cancelled
+        ])
+        self.covered = IntervalIndex(list(self.covered) + [(_from, _to)])
+
+    def is_busy(self, start: datetime, end: datetime) -> ClassroomBusyness:
+        if not self.covered.covers(start, end):
+            return is_classroom_busy(self.oid, start, end)
+        return ClassroomBusyness(
+            oid=self.oid,
+            from_datetime=start,
+            to_datetime=end,
+            is_busy=self.busy.overlaps(start, end)
+        )
@@ -0,0 +1,176 @@
+import heapq
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import (Any, Dict, Iterable, Iterator, List, Set, Tuple, Union)
+
+from .consts import ResourceKinds
+from .occurrences import (Occurrence, iter_classroom_occurrences,
+                          iter_educator_occurrences, iter_group_occurrences,
+                          room_name)
+from .search import normalize_group_name
+from .types import ClassroomEvents, EducatorEvents, GroupEvents
+
+Timetable = Union[GroupEvents, EducatorEvents, ClassroomEvents]
+Resource = Tuple[ResourceKinds, Any]
+
+_GROUP_PREFIX = 'Группа '
+# commas outside parentheses, which separate groups in a contingent unit
+# name; commas inside belong to course descriptions
+_UNIT_SEPARATOR = re.compile(r',\s*(?![^()]*\))')
+# group codes such as '17.Б01-пу' or '10 И1'; course names such as
+# '034294 История ...' or 'ВМ.5585.012617. ...' do not match
+_GROUP_CODE = re.compile(r'^\d{2}[.\s][^\W\d_]\d')
+
+
+@dataclass
+class Conflict:
+    """
+    Two different events holding the same educator, classroom or group at
+    the same time; `start` and `end` bound the overlap.
+    """
+    kind: ResourceKinds
+    resource: Any
+    start: datetime
+    end: datetime
+    first: Occurrence
+    second: Occurrence
+
+
+def _groups(names: str) -> Set[Resource]:
+    """
+    Group resources of a contingent unit name, which may list several
+    groups separated by commas. Names of courses and streams are not
+    groups and give no resources.
+    """
+    return {
+        (ResourceKinds.GROUP, normalize_group_name(name))
+        for name in map(str.strip, _UNIT_SEPARATOR.split(names))
+        if _GROUP_CODE.match(name)
+    }
+
+
+def _group_name(group_events: GroupEvents) -> str:
+    name = group_events.student_group_display_name or ''
+    if name.startswith(_GROUP_PREFIX):
+        name = name[len(_GROUP_PREFIX):]
+    return name
+
+
+def _group_resources(group_events: GroupEvents
+                     ) -> Iterator[Tuple[Occurrence, Set[Resource]]]:
+    for occurrence in iter_group_occurrences(group_events):
+        event = occurrence.event
+        resources = {
+            (ResourceKinds.EDUCATOR, educator.eid)
+            for educator in event.educator_ids
+            if educator.eid is not None and educator.eid >= 0
+        }
+        if not event.is_elective:
+            resources.update(_groups(_group_name(group_events)))
+        yield occurrence, resources
+
+
+def _educator_resources(educator_events: EducatorEvents
+                        ) -> Iterator[Tuple[Occurrence, Set[Resource]]]:
+    for occurrence in iter_educator_occurrences(educator_events):
+        resources = {
+            (ResourceKinds.EDUCATOR, educator_events.educator_master_id)
+        }
+        name = occurrence.event.contingent_unit_name
+        if name and not occurrence.event.is_elective:
+            resources.update(_groups(name))
+        yield occurrence, resources
+
+
+def _classroom_resources(classroom_events: ClassroomEvents
+                         ) -> Iterator[Tuple[Occurrence, Set[Resource]]]:
+    for occurrence in iter_classroom_occurrences(classroom_events):
+        event = occurrence.event
+        resources = {
+            (ResourceKinds.EDUCATOR, educator.eid)
+            for educator in event.educator_ids
+            if educator.eid is not None and educator.eid >= 0
+        }
+        for unit in event.contingent_unit_names:
+            if unit.groups:
+                resources.update(_groups(unit.groups))
+        yield occurrence, resources
+
+
+def iter_bookings(timetables: Iterable[Timetable]
+                  ) -> Iterator[Tuple[Resource, Occurrence]]:
+    """
+    Yields `(resource, occurrence)` for every resource held by every
+    occurrence that is not cancelled. Classrooms are identified by their
+    location names, educators by their ids and groups by their names, taken
+    from the display name of group timetables and from the contingent unit
+    names of educator and classroom timetables and normalized by
+    `normalize_group_name`, so the same group matches across all three.
+    """
+    for timetable in timetables:
+        if isinstance(timetable, GroupEvents):
+            held = _group_resources(timetable)
+        elif isinstance(timetable, EducatorEvents):
+            held = _educator_resources(timetable)
+        elif isinstance(timetable, ClassroomEvents):
+            held = _classroom_resources(timetable)
+        else:
+            raise TypeError(
+                f'Unsupported timetable type {type(timetable).__name__}'
+            )
+        for occurrence, resources in held:
+            if occurrence.is_cancelled:
+                continue
+            resources.update(
+                (ResourceKinds.CLASSROOM, room_name(location))
+                for location in occurrence.locations
+            )
+            for resource in resources:
+                yield resource, occurrence
+
+
+def _same_event_key(occurrence: Occurrence) -> tuple:
+    return occurrence.start, occurrence.end, occurrence.subject
+
+
+def _sweep(kind: ResourceKinds, resource: Any,
+           occurrences: List[Occurrence]) -> Iterator[Conflict]:
+    occurrences.sort(key=lambda o: (o.start, o.end))
+    active: List[Tuple[datetime, int, Occurrence]] = []
+    active_keys: Dict[tuple, int] = defaultdict(int)
+    for i, occurrence in enumerate(occurrences):
+        while active and active[0][0] <= occurrence.start:
+            _, _, ended = heapq.heappop(active)
+            active_keys[_same_event_key(ended)] -= 1
+        key = _same_event_key(occurrence)
+        if active_keys[key]:
+            # the same event seen from another timetable, or the same
+            # lecture held for several groups
+            continue
+        for _, _, other in active:
+            yield Conflict(kind, resource, occurrence.start,
+                           min(other.end, occurrence.end), other, occurrence)
+        heapq.heappush(active, (occurrence.end, i, occurrence))
+        active_keys[key] += 1
+
+
+def find_conflicts(timetables: Iterable[Timetable]) -> Iterator[Conflict]:
+    """
+    Yields every pair of different events that hold the same educator,
+    classroom or group at overlapping times, across any mix of
+    `GroupEvents`, `EducatorEvents` and `ClassroomEvents`.
+
+    The occurrences of every resource are sorted and swept once with a heap
+    of the events in progress, so the whole run takes O(n log n) for n
+    bookings plus the number of conflicts. Events with the same start, end
+    and subject are treated as one event. Elective events do not make
+    group conflicts.
+    """
+    by_resource: Dict[Resource, List[Occurrence]] = defaultdict(list)
+    for resource, occurrence in iter_bookings(timetables):
+        by_resource[resource].append(occurrence)
+    while by_resource:
+        (kind, resource), occurrences = by_resource.popitem()
+        yield from _sweep(kind, resource, occurrences)
@@ -15,6 +15,26 @@ class SeatingTypes(Enum):
     ROUNDTABLE = "roundtable"
 
 
+class ChangeKinds(Enum):
+    ADDED = "added"
+    REMOVED = "removed"
+    MOVED = "moved"
+    CANCELLED = "cancelled"
+    ROOM_CHANGED = "room_changed"
+    EDUCATOR_REASSIGNED = "educator_reassigned"
+
+
+class ResourceKinds(Enum):
+    EDUCATOR = "educator"
+    CLASSROOM = "classroom"
+    GROUP = "group"
+
+
+class ChunkSizes(Enum):
+    WEEK = "week"
+    MONTH = "month"
+
+
 class APIMethods(Enum):
     SD_DIVISIONS = "/study/divisions"
     SD_PROGRAMS = SD_DIVISIONS + "/{alias}/programs/levels"
@@ -41,4 +61,8 @@ class APIMethods(Enum):
 
 BASE_URL = "https://timetable.spbu.ru/api/v1"
 
+# day names of `date.weekday()`, as the API writes them in `day_string`
+WEEKDAYS = ['Понедельник', 'Вторник', 'Среда', 'Четверг', 'Пятница',
+            'Суббота', 'Воскресенье']
+
 error_msg = "A request to the SPbU Timetable API was unsuccessful. {0}"
@@ -0,0 +1,200 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Dict, Iterable, Iterator, Optional, Set, Tuple
+
+from requests import RequestException
+
+from . import util
+from .bulk import Request, default_max_workers
+from .consts import APIMethods
+from .groups import _group_events_request
+from .snapshot import (Sink, Snapshot, META_KEY, STUDY_DIVISIONS_KEY,
+                       study_levels_key, groups_key, group_events_key)
+from .types import ApiException, SDStudyDivision, SDPLStudyLevel, PGGroup
+
+
+@dataclass
+class CrawlReport:
+    week_monday: date
+    weeks: int
+    fetched: int = 0
+    resumed: int = 0
+    failures: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def is_complete(self) -> bool:
+        return not self.failures
+
+
+def _is_transient(exc: Exception) -> bool:
+    if isinstance(exc, ApiException):
+        return exc.result.status_code >= 500
+    return isinstance(exc, RequestException)
+
+
+def _fetch(request: Request, limiter: Optional[util.RateLimiter],
+           retries: int, retry_delay: float) -> bytes:
+    attempt = 0
+    while True:
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            return util.call_api_raw(*request)
+        except Exception as e:
+            if attempt >= retries or not _is_transient(e):
+                raise
+        attempt += 1
+        time.sleep(retry_delay * 2 ** (attempt - 1))
+
+
+class _Crawl:
+    def __init__(self, sink: Sink, report: CrawlReport,
+                 pool: ThreadPoolExecutor, limiter: Optional[util.RateLimiter],
+                 retries: int, retry_delay: float):
+        self.sink = sink
+        self.report = report
+        self.pool = pool
+        self.limiter = limiter
+        self.retries = retries
+        self.retry_delay = retry_delay
+
+    def fetch(self, request: Request) -> bytes:
+        return _fetch(request, self.limiter, self.retries, self.retry_delay)
+
+    def fetch_all(self, requests: Iterable[Tuple[str, Request]],
+                  stored_content: bool = True
+                  ) -> Iterator[Tuple[str, bytes]]:
+        """
+        Yields `(key, content)` for every request that succeeded. Entries
+        already in the sink are not requested again; their content is read
+        back only when `stored_content` is set.
+        """
+        futures = {}
+        for key, request in requests:
+            if key in self.sink:
+                self.report.resumed += 1
+                if stored_content:
+                    yield key, self.sink.get(key)
+            else:
+                futures[self.pool.submit(self.fetch, request)] = key
+        for future in as_completed(futures):
+            # dropping the future releases its content once it is stored
+            key = futures.pop(future)
+            try:
+                content = future.result()
+            except Exception as e:
+                self.report.failures[key] = f'{type(e).__name__}: {e}'
+                continue
+            self.sink.put(key, content)
+            self.report.fetched += 1
+            yield key, content
+
+
+def _start_snapshot(sink: Sink, week_monday: Optional[date], weeks: int,
+                    aliases: Optional[Iterable[str]]
+                    ) -> Tuple[date, int, Optional[Set[str]]]:
+    meta = Snapshot(sink).meta
+    if week_monday is not None:
+        week_monday -= timedelta(days=week_monday.weekday())
+    if meta:
+        stored_monday = date.fromisoformat(meta['week_monday'])
+        if week_monday is not None and week_monday != stored_monday:
+            raise ValueError(
+                f'The sink holds a snapshot of the week of {stored_monday}, '
+                f'not {week_monday}'
+            )
+        week_monday, weeks = stored_monday, meta['weeks']
+        if aliases is None:
+            aliases = meta.get('aliases')
+    else:
+        if week_monday is None:
+            today = date.today()
+            week_monday = today - timedelta(days=today.weekday())
+        if aliases is not None:
+            aliases = sorted(aliases)
+        sink.put(META_KEY, json.dumps({
+            'week_monday': str(week_monday),
+            'weeks': weeks,
+            'aliases': aliases,
+            'started_at': time.time()
+        }).encode())
+    return week_monday, weeks, set(aliases) if aliases is not None else None
+
+
+def crawl(sink: Sink, week_monday: date = None, weeks: int = 1,
+          aliases: Iterable[str] = None,
+          max_workers: int = default_max_workers,
+          requests_per_second: float = None, retries: int = 2,
+          retry_delay: float = 1.0) -> CrawlReport:
+    """
+    Walks study divisions, study levels, programs and groups and stores the
+    timetables of every group for `weeks` weeks starting with the week of
+    `week_monday` (the current week by default) in `sink`.
+
+    Every response body is written to the sink as soon as it arrives.
+    Entries that are already in the sink are not requested again, so an
+    interrupted crawl is resumed by calling `crawl` with the same sink; the
+    week and the divisions of the first run are kept.
+    Failed requests are retried `retries` times if the failure looks
+    transient and are then listed in `CrawlReport.failures` without stopping
+    the crawl.
+
+    :param aliases: crawl only the study divisions with these aliases
+    :param requests_per_second: overall limit of the request rate
+    """
+    week_monday, weeks, aliases = _start_snapshot(
+        sink, week_monday, weeks, aliases
+    )
+    report = CrawlReport(week_monday=week_monday, weeks=weeks)
+    limiter = None
+    if requests_per_second:
+        limiter = util.RateLimiter(requests_per_second)
+
+    with ThreadPoolExecutor(max_workers) as pool:
+        run = _Crawl(sink, report, pool, limiter, retries, retry_delay)
+        divisions = [
+            SDStudyDivision.de_json(obj)
+            for _, content in run.fetch_all([
+                (STUDY_DIVISIONS_KEY, (APIMethods.SD_DIVISIONS, None, None))
+            ])
+            for obj in json.loads(content)
+        ]
+
+        program_ids = []
+        for _, content in run.fetch_all(
+                (study_levels_key(division.alias),
+                 (APIMethods.SD_PROGRAMS, {"alias": division.alias}, None))
+                for division in divisions
+                if aliases is None or division.alias in aliases):
+            for obj in json.loads(content):
+                level = SDPLStudyLevel.de_json(obj)
+                program_ids.extend(
+                    admission_year.study_program_id
+                    for combination in level.study_program_combinations
+                    for admission_year in combination.admission_years
+                    if not admission_year.is_empty
+                )
+
+        group_ids = set()
+        for _, content in run.fetch_all(
+                (groups_key(program_id),
+                 (APIMethods.P_GROUPS, {"id": program_id}, None))
+                for program_id in dict.fromkeys(program_ids)):
+            group_ids.update(
+                PGGroup.de_json(obj).student_group_id
+                for obj in json.loads(content)["Groups"]
+            )
+
+        mondays = [week_monday + timedelta(weeks=i) for i in range(weeks)]
+        for _ in run.fetch_all(
+                ((group_events_key(group_id, monday),
+                  _group_events_request(group_id, monday))
+                 for group_id in sorted(group_ids)
+                 for monday in mondays),
+                stored_content=False):
+            pass
+
+    return report
@@ -0,0 +1,170 @@
+import json
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .consts import ChangeKinds
+from .snapshot import Snapshot, _parse_group_events_key
+from .types import GEEvent, GroupEvents
+
+EventKey = Tuple[Optional[datetime], Optional[str], Optional[str]]
+
+
+@dataclass
+class EventChange:
+    kind: ChangeKinds
+    group_id: Optional[int]
+    old: Optional[GEEvent]
+    new: Optional[GEEvent]
+
+
+def event_key(event: GEEvent) -> EventKey:
+    return event.start, event.subject, event.contingent_unit_name
+
+
+def _locations(event: GEEvent) -> frozenset:
+    return frozenset(
+        location.display_name for location in event.event_locations
+    )
+
+
+def _educators(event: GEEvent) -> frozenset:
+    return frozenset(
+        (educator.eid, educator.name) for educator in event.educator_ids
+    )
+
+
+def _signature(event: GEEvent) -> tuple:
+    return event.is_cancelled, _locations(event), _educators(event)
+
+
+def _compare(group_id: Optional[int], old: GEEvent,
+             new: GEEvent) -> Iterator[EventChange]:
+    if not old.is_cancelled and new.is_cancelled:
+        yield EventChange(ChangeKinds.CANCELLED, group_id, old, new)
+    if _locations(old) != _locations(new):
+        yield EventChange(ChangeKinds.ROOM_CHANGED, group_id, old, new)
+    if _educators(old) != _educators(new):
+        yield EventChange(ChangeKinds.EDUCATOR_REASSIGNED, group_id, old, new)
+
+
+def _pair(old_events: List[GEEvent], new_events: List[GEEvent]
+          ) -> Tuple[List[Tuple[GEEvent, GEEvent]], List[GEEvent],
+                     List[GEEvent]]:
+    """
+    Pairs events sharing a key: identical ones first, so that parallel
+    events of subgroups are not reported as swapping rooms, then the rest in
+    order. Returns the pairs and the unpaired old and new events.
+    """
+    if len(old_events) == 1 and len(new_events) == 1:
+        return [(old_events[0], new_events[0])], [], []
+
+    by_signature = defaultdict(list)
+    for old in old_events:
+        by_signature[_signature(old)].append(old)
+    pairs, rest_new = [], []
+    for new in new_events:
+        same = by_signature.get(_signature(new))
+        if same:
+            pairs.append((same.pop(0), new))
+        else:
+            rest_new.append(new)
+    rest_old = [old for same in by_signature.values() for old in same]
+    paired = min(len(rest_old), len(rest_new))
+    pairs.extend(zip(rest_old[:paired], rest_new[:paired]))
+    return pairs, rest_old[paired:], rest_new[paired:]
+
+
+def _group_by(events: Iterable[GEEvent], key) -> Dict[tuple, List[GEEvent]]:
+    grouped = defaultdict(list)
+    for event in events:
+        grouped[key(event)].append(event)
+    return grouped
+
+
+def _iter_events(group_events: Optional[GroupEvents]) -> Iterator[GEEvent]:
+    if group_events is None:
+        return
+    for day in group_events.days:
+        yield from day.day_study_events
+
+
+def diff_group_events(old: Optional[GroupEvents], new: Optional[GroupEvents]
+                      ) -> Iterator[EventChange]:
+    """
+    Yields the changes between two versions of a group's timetable in time
+    linear in the number of events.
+
+    Events are matched by `(start, subject, contingent_unit_name)`. Events
+    left unmatched are matched by `(subject, contingent_unit_name)` and
+    reported as moved, the rest as added or removed.
+    """
+    source = new if new is not None else old
+    group_id = source.student_group_id if source is not None else None
+    old_by_key = _group_by(_iter_events(old), event_key)
+    new_by_key = _group_by(_iter_events(new), event_key)
+
+    removed, added = [], []
+    for key, new_events in new_by_key.items():
+        pairs, rest_old, rest_new = _pair(old_by_key.pop(key, []),
+                                          new_events)
+        for old_event, new_event in pairs:
+            yield from _compare(group_id, old_event, new_event)
+        removed.extend(rest_old)
+        added.extend(rest_new)
+    for old_events in old_by_key.values():
+        removed.extend(old_events)
+
+    def moved_key(event: GEEvent) -> tuple:
+        return event.subject, event.contingent_unit_name
+
+    removed_by_key = _group_by(removed, moved_key)
+    for key, new_events in _group_by(added, moved_key).items():
+        old_events = sorted(removed_by_key.pop(key, []),
+                            key=lambda e: e.start or datetime.min)
+        new_events.sort(key=lambda e: e.start or datetime.min)
+        for old_event, new_event in zip(old_events, new_events):
+            yield EventChange(ChangeKinds.MOVED, group_id, old_event,
+                              new_event)
+            yield from _compare(group_id, old_event, new_event)
+        for new_event in new_events[len(old_events):]:
+            yield EventChange(ChangeKinds.ADDED, group_id, None, new_event)
+        for old_event in old_events[len(new_events):]:
+            yield EventChange(ChangeKinds.REMOVED, group_id, old_event, None)
+    for old_events in removed_by_key.values():
+        for old_event in old_events:
+            yield EventChange(ChangeKinds.REMOVED, group_id, old_event, None)
+
+
+def _parse(content: Optional[bytes]) -> Optional[GroupEvents]:
+    return GroupEvents.de_json(json.loads(content)) if content else None
+
+
+def diff_snapshots(old: Snapshot, new: Snapshot
+                   ) -> Iterator[Tuple[Tuple[int, date], EventChange]]:
+    """
+    Yields `((group_id, week_monday), change)` for every event that differs
+    between two snapshots. Group weeks are loaded one pair at a time and
+    byte-identical weeks are not parsed at all.
+    """
+    old_keys = set()
+    for key in old.sink.keys('group_events/'):
+        old_keys.add(key)
+        old_content, new_content = old.sink.get(key), new.sink.get(key)
+        if old_content != new_content:
+            yield from _diff_week(key, old_content, new_content)
+    for key in new.sink.keys('group_events/'):
+        if key not in old_keys:
+            yield from _diff_week(key, None, new.sink.get(key))
+
+
+def _diff_week(key: str, old_content: Optional[bytes],
+               new_content: Optional[bytes]
+               ) -> Iterator[Tuple[Tuple[int, date], EventChange]]:
+    week_key = _parse_group_events_key(key)
+    for change in diff_group_events(_parse(old_content),
+                                    _parse(new_content)):
+        if change.group_id is None:
+            change.group_id = week_key[0]
+        yield week_key, change
@@ -1,50 +1,78 @@
 from datetime import date
-from typing import List
+from typing import List, Tuple
 
 from . import util
 from .consts import APIMethods, LessonsTypes
 from .types import EducatorEventsTerm, Educator, EducatorEvents
 
 
+def _educator_term_events_request(educator_id: int, next_term: bool = False
+                                  ) -> Tuple[APIMethods, dict, dict]:
+    return (
+        APIMethods.E_EVENTS,
+        {
+            "id": educator_id
+        },
+        {
+            "showNextTerm": int(next_term)
+        }
+    )
+
+
+def _educator_events_request(educator_id: int, _from: date, _to: date,
+                             lessons_type: LessonsTypes = LessonsTypes.UNKNOWN
+                             ) -> Tuple[APIMethods, dict, dict]:
+    return (
+        APIMethods.E_EVENTS_FROM_TO,
+        {
+            "id": educator_id,
+            "from": _from,
+            "to": _to
+        },
+        {
+            "timetable": lessons_type.value
+        }
+    )
+
+
 def get_educator_term_events(educator_id: int,
                              next_term: bool = False) -> EducatorEventsTerm:
-    return EducatorEventsTerm.de_json(
+    method, path_values, params = _educator_term_events_request(
+        educator_id, next_term
+    )
+    return util.parse(
+        EducatorEventsTerm,
         util.call_api(
-            method=APIMethods.E_EVENTS,
-            path_values={
-                "id": educator_id
-            },
-            params={
-                "showNextTerm": int(next_term)
-            }
+            method=method,
+            path_values=path_values,
+            params=params
         )
     )
 
 
 def get_educator_events(educator_id: int, _from: date, _to: date,
                         lessons_type: LessonsTypes = LessonsTypes.UNKNOWN) -> EducatorEvents:
-    return EducatorEvents.de_json(
+    method, path_values, params = _educator_events_request(
+        educator_id, _from, _to, lessons_type
+    )
+    return util.parse(
+        EducatorEvents,
         util.call_api(
-            method=APIMethods.E_EVENTS_FROM_TO,
-            path_values={
-                "id": educator_id,
-                "from": _from,
-                "to": _to
-            },
-            params={
-                "timetable": lessons_type.value
-            }
+            method=method,
+            path_values=path_values,
+            params=params
         )
     )
 
 
 def search_educator(query: str) -> List[Educator]:
-    return [
-        Educator.de_json(ed)
-        for ed in util.call_api(
+    return util.parse_list(
+        Educator,
+        util.call_api(
             method=APIMethods.E_SEARCH,
             path_values={
                 "query": query
             }
-        )["Educators"]
-    ]
+        ),
+        "Educators"
+    )
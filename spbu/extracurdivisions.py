@@ -7,16 +7,17 @@ from .types import ExtracurDivision, ExtracurEvents
 
 
 def get_extracur_divisions() -> List[ExtracurDivision]:
-    return [
-        ExtracurDivision.de_json(ex_div)
-        for ex_div in util.call_api(
+    return util.parse_list(
+        ExtracurDivision,
+        util.call_api(
             method=APIMethods.ED_DIVISIONS
         )
-    ]
+    )
 
 
 def get_extracur_events(alias: str, from_date: date = None) -> ExtracurEvents:
-    return ExtracurEvents.de_json(
+    return util.parse(
+        ExtracurEvents,
         util.call_api(
             method=APIMethods.ED_EVENTS,
             path_values={
@@ -1,13 +1,15 @@
-from datetime import date
+from datetime import date, timedelta
+from typing import Iterator, Tuple
 
 from . import util
 from .consts import LessonsTypes, APIMethods
-from .types import GroupEvents
+from .types import GroupEvents, GEEventsDay
 
 
-def get_group_events(group_id: int, from_date: date = None,
-                     to_date: date = None,
-                     lessons_type: LessonsTypes = LessonsTypes.UNKNOWN) -> GroupEvents:
+def _group_events_request(group_id: int, from_date: date = None,
+                          to_date: date = None,
+                          lessons_type: LessonsTypes = LessonsTypes.UNKNOWN
+                          ) -> Tuple[APIMethods, dict, dict]:
     if from_date and to_date:
         method = APIMethods.G_EVENTS_FROM_TO
         path_values = {
@@ -26,12 +28,75 @@ def get_group_events(group_id: int, from_date: date = None,
         path_values = {
             "id": group_id
         }
-    return GroupEvents.de_json(
+    return method, path_values, {"timetable": lessons_type.value}
+
+
+def get_group_events(group_id: int, from_date: date = None,
+                     to_date: date = None,
+                     lessons_type: LessonsTypes = LessonsTypes.UNKNOWN) -> GroupEvents:
+    method, path_values, params = _group_events_request(
+        group_id, from_date, to_date, lessons_type
+    )
+    return util.parse(
+        GroupEvents,
         util.call_api(
             method=method,
             path_values=path_values,
-            params={
-                "timetable": lessons_type.value
-            }
+            params=params
         )
     )
+
+
+def iter_group_weeks(group_id: int, start: date, end: date,
+                     prefetch: int = 2,
+                     lessons_type: LessonsTypes = LessonsTypes.UNKNOWN
+                     ) -> Iterator[GEEventsDay]:
+    """
+    Yields the days of the group's timetable from `start` to `end`
+    (inclusive) week by week, following the week links of every response.
+    While a week is being consumed the next `prefetch` weeks are loaded in
+    background threads.
+    """
+    # imported here, so getting an endpoint function does not pay for
+    # concurrent.futures
+    from collections import deque
+    from concurrent.futures import ThreadPoolExecutor
+
+    pool = ThreadPoolExecutor(max(prefetch, 1))
+    scheduled = deque()
+    next_monday = start - timedelta(days=start.weekday())
+
+    def schedule():
+        nonlocal next_monday
+        while len(scheduled) <= prefetch and next_monday <= end:
+            scheduled.append((next_monday, pool.submit(
+                get_group_events, group_id, next_monday,
+                lessons_type=lessons_type
+            )))
+            next_monday += timedelta(weeks=1)
+
+    try:
+        schedule()
+        while scheduled:
+            week_monday, future = scheduled.popleft()
+            group_events = future.result()
+            for day in group_events.days:
+                if start <= day.day <= end:
+                    yield day
+
+            following = group_events.next_week_monday
+            if not group_events.is_next_week_reference_available \
+                    or not following or following > end:
+                break
+            if following != week_monday + timedelta(weeks=1):
+                # the server skipped some weeks, the prefetched ones are
+                # not the weeks it links to
+                for _, future in scheduled:
+                    future.cancel()
+                scheduled.clear()
+                next_monday = following
+            schedule()
+    finally:
+        for _, future in scheduled:
+            future.cancel()
+        pool.shutdown(wait=False)
@@ -0,0 +1,266 @@
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, datetime
+from typing import (BinaryIO, Dict, Iterable, Iterator, Optional, Tuple,
+                    Type, Union)
+
+from . import util
+from .bulk import PARSED, Request, default_max_workers, parse_response
+from .educators import _educator_term_events_request
+from .groups import _group_events_request
+from .occurrences import (Occurrence, iter_classroom_occurrences,
+                          iter_educator_occurrences,
+                          iter_educator_term_occurrences,
+                          iter_extracur_occurrences, iter_group_occurrences)
+from .types import (ClassroomEvents, EducatorEvents, EducatorEventsTerm,
+                    ExtracurEvents, GroupEvents)
+
+Timetable = Union[GroupEvents, EducatorEvents, EducatorEventsTerm,
+                  ClassroomEvents, ExtracurEvents]
+
+TZID = 'Europe/Moscow'
+UID_DOMAIN = 'timetable.spbu.ru'
+
+_VTIMEZONE = (
+    'BEGIN:VTIMEZONE',
+    f'TZID:{TZID}',
+    'BEGIN:STANDARD',
+    'DTSTART:19700101T000000',
+    'TZOFFSETFROM:+0300',
+    'TZOFFSETTO:+0300',
+    'TZNAME:MSK',
+    'END:STANDARD',
+    'END:VTIMEZONE',
+)
+
+
+def _escape(text: str) -> str:
+    return (text.replace('\\', '\\\\').replace(';', '\\;')
+            .replace(',', '\\,').replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def _fold(line: str) -> bytes:
+    # content lines are limited to 75 octets, continued after CRLF + space;
+    # lines are split between characters, never inside one
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return encoded + b'\r\n'
+    chunks, chunk, limit = [], b'', 75
+    for char in line:
+        char_bytes = char.encode()
+        if len(chunk) + len(char_bytes) > limit:
+            chunks.append(chunk)
+            chunk, limit = b'', 74
+        chunk += char_bytes
+    chunks.append(chunk)
+    return b'\r\n '.join(chunks) + b'\r\n'
+
+
+def _format_datetime(dt: datetime) -> str:
+    return dt.strftime('%Y%m%dT%H%M%S')
+
+
+def _describe(timetable: Timetable) -> Tuple[str, Optional[str],
+                                               Iterator[Occurrence]]:
+    if isinstance(timetable, GroupEvents):
+        return (f'group-{timetable.student_group_id}',
+                timetable.student_group_display_name,
+                iter_group_occurrences(timetable))
+    if isinstance(timetable, EducatorEvents):
+        return (f'educator-{timetable.educator_master_id}',
+                timetable.educator_long_display_text,
+                iter_educator_occurrences(timetable))
+    if isinstance(timetable, EducatorEventsTerm):
+        return (f'educator-{timetable.educator_master_id}',
+                timetable.educator_long_display_text,
+                iter_educator_term_occurrences(timetable))
+    if isinstance(timetable, ClassroomEvents):
+        return (f'classroom-{timetable.oid}', timetable.display_text,
+                iter_classroom_occurrences(timetable))
+    if isinstance(timetable, ExtracurEvents):
+        return (f'extracur-{timetable.alias}', timetable.title,
+                iter_extracur_occurrences(timetable))
+    raise TypeError(f'Unsupported timetable type {type(timetable).__name__}')
+
+
+class CalendarWriter:
+    """
+    Writes an iCalendar feed event by event to a binary stream, such as an
+    open file or `socket.makefile('wb')`, so a feed is never held in memory.
+    Event times are local times of the `Europe/Moscow` zone.
+
+    UIDs are derived from the feed, the date and the subject of an event,
+    so regenerating a feed keeps the UIDs of unchanged events, and of
+    events moved to another time or room of the same day, which calendar
+    clients then update instead of adding as new events.
+    """
+    def __init__(self, stream: BinaryIO, feed_id: str, name: str = None,
+                 dtstamp: datetime = None):
+        self.stream = stream
+        self.feed_id = feed_id
+        self.name = name
+        self.dtstamp = dtstamp or datetime.utcnow()
+        self.events_written = 0
+        self._seen_uids = set()
+
+    def __enter__(self) -> 'CalendarWriter':
+        self.begin()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if exc_type is None:
+            self.end()
+
+    def _write(self, *lines: str) -> None:
+        self.stream.write(b''.join(_fold(line) for line in lines))
+
+    def begin(self) -> None:
+        self._write('BEGIN:VCALENDAR', 'VERSION:2.0',
+                    'PRODID:-//spbuTimetableAPI//iCalendar export//RU',
+                    'CALSCALE:GREGORIAN', 'METHOD:PUBLISH')
+        if self.name:
+            self._write(f'X-WR-CALNAME:{_escape(self.name)}')
+        self._write(f'X-WR-TIMEZONE:{TZID}', *_VTIMEZONE)
+
+    def uid(self, occurrence: Occurrence) -> str:
+        key = '\n'.join((self.feed_id, occurrence.start.date().isoformat(),
+                         occurrence.subject or ''))
+        digest = hashlib.sha1(key.encode()).hexdigest()[:24]
+        uid, n = f'{digest}@{UID_DOMAIN}', 1
+        while uid in self._seen_uids:
+            # events of the same subject on the same day, in order of time
+            n += 1
+            uid = f'{digest}-{n}@{UID_DOMAIN}'
+        self._seen_uids.add(uid)
+        return uid
+
+    def write_event(self, occurrence: Occurrence) -> None:
+        lines = [
+            'BEGIN:VEVENT',
+            f'UID:{self.uid(occurrence)}',
+            f'DTSTAMP:{_format_datetime(self.dtstamp)}Z',
+            f'DTSTART;TZID={TZID}:{_format_datetime(occurrence.start)}',
+            f'DTEND;TZID={TZID}:{_format_datetime(occurrence.end)}',
+            f'SUMMARY:{_escape(occurrence.subject or "")}',
+        ]
+        if occurrence.locations:
+            lines.append(
+                f'LOCATION:{_escape("; ".join(occurrence.locations))}'
+            )
+        educators = getattr(occurrence.event, 'educators_display_text', None)
+        if educators:
+            lines.append(f'DESCRIPTION:{_escape(educators)}')
+        if occurrence.is_cancelled:
+            lines.append('STATUS:CANCELLED')
+        lines.append('END:VEVENT')
+        self._write(*lines)
+        self.events_written += 1
+
+    def end(self) -> None:
+        self._write('END:VCALENDAR')
+        self.stream.flush()
+
+
+def write_calendar(timetable: Timetable, stream: BinaryIO,
+                   dtstamp: datetime = None) -> int:
+    """
+    Streams the events of a group, educator, educator term, classroom or
+    extracurricular timetable to `stream` as an iCalendar feed and returns
+    the number of events written. Term events are expanded into every date
+    they take place on.
+    """
+    feed_id, name, occurrences = _describe(timetable)
+    with CalendarWriter(stream, feed_id, name, dtstamp) as writer:
+        for occurrence in occurrences:
+            writer.write_event(occurrence)
+    return writer.events_written
+
+
+def _write_file(cls: Type[PARSED], content: bytes, path: str,
+                dtstamp: Optional[datetime]) -> int:
+    # runs in a worker process when the feeds are rendered in parallel
+    tmp_path = f'{path}.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            written = write_calendar(parse_response(cls, content), f,
+                                     dtstamp)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return written
+
+
+def write_calendars(cls: Type[PARSED], requests: Dict[str, Request],
+                    directory: str, max_workers: int = default_max_workers,
+                    processes: Optional[int] = None,
+                    dtstamp: datetime = None) -> Dict[str, Exception]:
+    """
+    Fetches every request concurrently and writes the timetable it returns
+    to `<directory>/<key>.ics`, replacing the previous file atomically.
+    Returns the exceptions of the feeds that failed by key.
+
+    :param processes: if set, feeds are parsed and rendered by a pool of
+        that many processes instead of the fetching threads
+    """
+    os.makedirs(directory, exist_ok=True)
+    dtstamp = dtstamp or datetime.utcnow()
+    render_pool = ProcessPoolExecutor(processes) if processes else None
+
+    def export(key: str, request: Request) -> None:
+        content = util.call_api_raw(*request)
+        path = os.path.join(directory, f'{key}.ics')
+        if render_pool is None:
+            _write_file(cls, content, path, dtstamp)
+        else:
+            render_pool.submit(_write_file, cls, content, path,
+                               dtstamp).result()
+
+    failures = {}
+    try:
+        with ThreadPoolExecutor(max_workers) as pool:
+            futures = {
+                pool.submit(export, key, request): key
+                for key, request in requests.items()
+            }
+            for future, key in futures.items():
+                exc = future.exception()
+                if exc is not None:
+                    failures[key] = exc
+    finally:
+        if render_pool is not None:
+            render_pool.shutdown()
+    return failures
+
+
+def write_group_calendars(group_ids: Iterable[int], directory: str,
+                          from_date: date = None, to_date: date = None,
+                          max_workers: int = default_max_workers,
+                          processes: Optional[int] = None
+                          ) -> Dict[str, Exception]:
+    return write_calendars(
+        GroupEvents,
+        {
+            str(group_id): _group_events_request(group_id, from_date, to_date)
+            for group_id in group_ids
+        },
+        directory, max_workers=max_workers, processes=processes
+    )
+
+
+def write_educator_calendars(educator_ids: Iterable[int], directory: str,
+                             next_term: bool = False,
+                             max_workers: int = default_max_workers,
+                             processes: Optional[int] = None
+                             ) -> Dict[str, Exception]:
+    return write_calendars(
+        EducatorEventsTerm,
+        {
+            str(educator_id): _educator_term_events_request(educator_id,
+                                                            next_term)
+            for educator_id in educator_ids
+        },
+        directory, max_workers=max_workers, processes=processes
+    )
@@ -0,0 +1,85 @@
+import heapq
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Iterable, Iterator, List, Tuple
+
+Interval = Tuple[datetime, datetime]
+
+
+class IntervalIndex:
+    """
+    Immutable set of half-open `[start, end)` intervals. Overlapping and
+    adjacent intervals are merged on construction, so every query is a
+    binary search over the sorted starts.
+    """
+    def __init__(self, intervals: Iterable[Interval] = ()):
+        starts: List[datetime] = []
+        ends: List[datetime] = []
+        for start, end in sorted(intervals):
+            if start >= end:
+                continue
+            if ends and start <= ends[-1]:
+                ends[-1] = max(ends[-1], end)
+            else:
+                starts.append(start)
+                ends.append(end)
+        self._starts = starts
+        self._ends = ends
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __iter__(self) -> Iterator[Interval]:
+        return zip(self._starts, self._ends)
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({list(self)!r})'
+
+    def overlaps(self, start: datetime, end: datetime) -> bool:
+        """
+        Whether any interval intersects `[start, end)`.
+        """
+        i = bisect_right(self._starts, start)
+        if i and self._ends[i - 1] > start:
+            return True
+        return i < len(self._starts) and self._starts[i] < end
+
+    def covers(self, start: datetime, end: datetime) -> bool:
+        """
+        Whether `[start, end)` lies entirely within one interval.
+        """
+        i = bisect_right(self._starts, start)
+        return bool(i) and self._ends[i - 1] >= end
+
+    def gaps(self, start: datetime, end: datetime) -> Iterator[Interval]:
+        """
+        Yields the parts of `[start, end)` no interval covers.
+        """
+        i = bisect_left(self._ends, start)
+        cursor = start
+        while i < len(self._starts) and self._starts[i] < end:
+            if self._starts[i] > cursor:
+                yield cursor, self._starts[i]
+            cursor = max(cursor, self._ends[i])
+            i += 1
+        if cursor < end:
+            yield cursor, end
+
+
+def merge(*sorted_intervals: Iterable[Interval]) -> Iterator[Interval]:
+    """
+    Merges interval sequences, each sorted by start, into their union as
+    disjoint sorted intervals, with a k-way merge in O(n log k).
+    """
+    current = None
+    for start, end in heapq.merge(*sorted_intervals):
+        if start >= end:
+            continue
+        if current is not None and start <= current[1]:
+            current = current[0], max(current[1], end)
+            continue
+        if current is not None:
+            yield current
+        current = start, end
+    if current is not None:
+        yield current
@@ -0,0 +1,183 @@
+from collections import defaultdict
+from datetime import datetime, time
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from .bulk import default_max_workers, get_many_classrooms
+from .consts import WEEKDAYS
+from .occurrences import (Occurrence, iter_educator_occurrences,
+                          iter_group_occurrences, room_name)
+from .snapshot import Snapshot
+from .types import (Address, CEEvent, CEEventsDay, Classroom, ClassroomEvents,
+                    ContingentUnitName, EducatorEvents, EducatorId,
+                    GroupEvents)
+
+
+class ClassroomDirectory:
+    """
+    Maps event location names, such as
+    `"В.О., Университетская наб., д. 11, 188"`, to the address and the
+    classroom they name.
+    """
+    def __init__(self, rooms: Iterable[Tuple[Address, Classroom]] = ()):
+        self._rooms: Dict[str, Tuple[Address, Classroom]] = {}
+        for address, classroom in rooms:
+            self.add(address, classroom)
+
+    def __len__(self) -> int:
+        return len(self._rooms)
+
+    @classmethod
+    def load(cls, max_workers: int = default_max_workers
+             ) -> 'ClassroomDirectory':
+        return cls(get_many_classrooms(max_workers=max_workers))
+
+    def add(self, address: Address, classroom: Classroom) -> None:
+        name = f'{address.display_name}, {classroom.display_name}'
+        self._rooms[room_name(name)] = address, classroom
+
+    def lookup(self, location: str
+               ) -> Optional[Tuple[Address, Classroom]]:
+        return self._rooms.get(room_name(location))
+
+
+def _time_interval_string(start: time, end: time) -> str:
+    return (f'{start.hour}:{start.minute:02d}-'
+            f'{end.hour}:{end.minute:02d}')
+
+
+def _educator_ids(source: Union[GroupEvents, EducatorEvents],
+                  occurrence: Occurrence) -> List[EducatorId]:
+    if isinstance(source, EducatorEvents):
+        return [EducatorId(eid=source.educator_master_id,
+                           name=source.educator_display_text)]
+    return list(occurrence.event.educator_ids)
+
+
+def _contingent_unit(source: Union[GroupEvents, EducatorEvents],
+                     occurrence: Occurrence) -> Optional[ContingentUnitName]:
+    event = occurrence.event
+    groups = event.contingent_unit_name
+    if not groups and isinstance(source, GroupEvents):
+        groups = source.student_group_display_name
+    if not groups:
+        return None
+    return ContingentUnitName(groups=groups,
+                              courses=event.division_and_course)
+
+
+def derive_classroom_events(timetables: Iterable[Union[GroupEvents,
+                                                       EducatorEvents]],
+                            directory: ClassroomDirectory,
+                            _from: datetime, _to: datetime
+                            ) -> Dict[str, ClassroomEvents]:
+    """
+    Builds what `get_classroom_events` would return for every classroom
+    used between `_from` and `_to` from group and educator timetables that
+    are already at hand, without requesting the classrooms.
+
+    The result is keyed by classroom oid; locations missing from
+    `directory` are keyed by their name and have no oid. An event seen in
+    several timetables, e.g. a lecture for several groups, becomes one
+    event listing all of their contingent units.
+    """
+    # classroom key -> (start, end, subject) -> event
+    events: Dict[str, Dict[tuple, CEEvent]] = defaultdict(dict)
+    display_texts: Dict[str, str] = {}
+    oids: Dict[str, Optional[str]] = {}
+    for source in timetables:
+        if isinstance(source, GroupEvents):
+            occurrences = iter_group_occurrences(source)
+        elif isinstance(source, EducatorEvents):
+            occurrences = iter_educator_occurrences(source)
+        else:
+            raise TypeError(
+                f'Unsupported timetable type {type(source).__name__}'
+            )
+        for occurrence in occurrences:
+            if occurrence.end <= _from or occurrence.start >= _to:
+                continue
+            for location in occurrence.locations:
+                room = directory.lookup(location)
+                key = room[1].oid if room else room_name(location)
+                if key not in display_texts:
+                    display_texts[key] = room_name(location)
+                    oids[key] = room[1].oid if room else None
+                _add_occurrence(events[key], source, occurrence)
+
+    return {
+        key: ClassroomEvents(
+            oid=oids[key],
+            from_datetime=_from,
+            to_datetime=_to,
+            display_text=display_texts[key],
+            has_events=bool(room_events),
+            classroom_events_days=_days(room_events)
+        )
+        for key, room_events in events.items()
+    }
+
+
+def _add_occurrence(room_events: Dict[tuple, CEEvent],
+                    source: Union[GroupEvents, EducatorEvents],
+                    occurrence: Occurrence) -> None:
+    event_key = (occurrence.start, occurrence.end, occurrence.subject)
+    unit = _contingent_unit(source, occurrence)
+    known = room_events.get(event_key)
+    if known is None:
+        start, end = occurrence.start.time(), occurrence.end.time()
+        room_events[event_key] = CEEvent(
+            start=start,
+            end=end,
+            subject=occurrence.subject,
+            time_interval_string=_time_interval_string(start, end),
+            educators_display_text=occurrence.event.educators_display_text,
+            study_events_timetable_kind_code=(
+                occurrence.event.study_events_timetable_kind_code
+            ),
+            is_cancelled=occurrence.is_cancelled,
+            dates=[f'{occurrence.start.day}.{occurrence.start.month}'],
+            educator_ids=_educator_ids(source, occurrence),
+            contingent_unit_names=[unit] if unit else []
+        )
+        return
+    known.is_cancelled = known.is_cancelled and occurrence.is_cancelled
+    for educator in _educator_ids(source, occurrence):
+        if educator not in known.educator_ids:
+            known.educator_ids.append(educator)
+    if unit and unit.groups not in (u.groups
+                                    for u in known.contingent_unit_names):
+        known.contingent_unit_names.append(unit)
+
+
+def _days(room_events: Dict[tuple, CEEvent]) -> List[CEEventsDay]:
+    by_weekday: Dict[int, List[Tuple[datetime, CEEvent]]] = defaultdict(list)
+    for (start, _, _), event in room_events.items():
+        by_weekday[start.weekday()].append((start, event))
+    days = []
+    for weekday in sorted(by_weekday):
+        day_events = [
+            event for _, event in sorted(by_weekday[weekday],
+                                         key=lambda item: item[0])
+        ]
+        days.append(CEEventsDay(
+            day=weekday + 1,
+            day_string=WEEKDAYS[weekday],
+            day_study_events_count=len(day_events),
+            day_study_events=day_events
+        ))
+    return days
+
+
+def derive_snapshot_classroom_events(snapshot: Snapshot,
+                                     directory: ClassroomDirectory,
+                                     _from: datetime, _to: datetime,
+                                     parse_processes: Optional[int] = None
+                                     ) -> Dict[str, ClassroomEvents]:
+    """
+    `derive_classroom_events` over every group week of a crawled snapshot.
+    """
+    return derive_classroom_events(
+        (group_events for _, group_events
+         in snapshot.iter_group_events(parse_processes)),
+        directory, _from, _to
+    )
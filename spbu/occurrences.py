@@ -0,0 +1,218 @@
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from typing import Any, Iterator, List, Optional
+
+from .types import (CEEvent, ClassroomEvents, EducatorEvents,
+                    EducatorEventsTerm, EventLocation, ExtracurEvents,
+                    GroupEvents)
+
+_SPACES = re.compile(r'\s+')
+_COMMA = re.compile(r'\s*,\s*')
+_SINGLE_DATE = re.compile(r'^\s*(\d{1,2})\.(\d{1,2})\s*$')
+_DATE_RANGE = re.compile(
+    r'^\s*с\s+(\d{1,2})\.(\d{1,2})\s+по\s+(\d{1,2})\.(\d{1,2})'
+    r'(?:\s*\((\d+)\))?\s*$'
+)
+
+
+@dataclass
+class Occurrence:
+    """
+    A single dated occurrence of a timetable event.
+    """
+    start: datetime
+    end: datetime
+    subject: Optional[str]
+    is_cancelled: bool = False
+    locations: List[str] = field(default_factory=list)
+    event: Any = None
+
+
+def _closest_date(day: int, month: int, from_date: date,
+                  to_date: date) -> date:
+    # the dates of term and classroom timetables come without a year; the
+    # year is the one that puts the date closest to the covered range
+    def distance(d: date) -> int:
+        if d < from_date:
+            return (from_date - d).days
+        if d > to_date:
+            return (d - to_date).days
+        return 0
+
+    candidates = []
+    for year in range(from_date.year - 1, to_date.year + 2):
+        try:
+            candidates.append(date(year, month, day))
+        except ValueError:
+            pass
+    return min(candidates, key=distance)
+
+
+def expand_dates(dates: List[str], from_date: date,
+                 to_date: date) -> List[date]:
+    """
+    Turns the `dates` of term and classroom events, such as `"20.5"` or
+    `"с 26.2 по 7.5 (11)"` (11 weekly occurrences from 26.02 to 07.05),
+    into dates. Years are inferred from the range the timetable covers.
+    Unknown formats and dates that exist in no year are skipped.
+    """
+    expanded = []
+    for item in dates:
+        single = _SINGLE_DATE.match(item)
+        if single:
+            day, month = map(int, single.groups())
+            try:
+                expanded.append(_closest_date(day, month, from_date, to_date))
+            except ValueError:
+                pass
+            continue
+        recurrence = _DATE_RANGE.match(item)
+        if not recurrence:
+            continue
+        first_day, first_month, last_day, last_month = map(
+            int, recurrence.groups()[:4]
+        )
+        count = recurrence.group(5)
+        try:
+            first = _closest_date(first_day, first_month, from_date, to_date)
+            # a range crossing New Year ends in the next year
+            last_year = first.year
+            if (last_month, last_day) < (first_month, first_day):
+                last_year += 1
+            last = date(last_year, last_month, last_day)
+        except ValueError:
+            continue
+        step = 7
+        if count and int(count) > 1:
+            weeks = (last - first).days / 7 / (int(count) - 1)
+            step = 7 * max(1, round(weeks))
+        current = first
+        while current <= last:
+            expanded.append(current)
+            current += timedelta(days=step)
+    return expanded
+
+
+def room_name(name: str) -> str:
+    """
+    A location name with its runs of whitespace collapsed and a single space
+    after every comma, as the same room is spelled differently by different
+    timetables and by the classroom list.
+    """
+    return _SPACES.sub(' ', _COMMA.sub(', ', name)).strip()
+
+
+def _combine(day: date, t: Optional[time]) -> datetime:
+    return datetime.combine(day, t or time())
+
+
+def iter_classroom_occurrences(classroom_events: ClassroomEvents
+                               ) -> Iterator[Occurrence]:
+    """
+    Yields every occurrence of the classroom's events within the range the
+    classroom timetable was requested for.
+    """
+    from_datetime = classroom_events.from_datetime
+    to_datetime = classroom_events.to_datetime
+    location = classroom_events.display_text
+    for day in classroom_events.classroom_events_days:
+        for event in day.day_study_events:
+            event: CEEvent
+            for event_date in expand_dates(event.dates, from_datetime.date(),
+                                           to_datetime.date()):
+                start = _combine(event_date, event.start)
+                end = _combine(event_date, event.end)
+                if end <= from_datetime or start >= to_datetime:
+                    continue
+                yield Occurrence(
+                    start=start,
+                    end=end,
+                    subject=event.subject,
+                    is_cancelled=event.is_cancelled,
+                    locations=[location] if location else [],
+                    event=event
+                )
+
+
+def _location_names(locations: List[EventLocation]) -> List[str]:
+    return [
+        location.display_name for location in locations
+        if location.display_name
+    ]
+
+
+def iter_group_occurrences(group_events: GroupEvents) -> Iterator[Occurrence]:
+    for day in group_events.days:
+        for event in day.day_study_events:
+            if event.start is None or event.end is None:
+                continue
+            yield Occurrence(
+                start=event.start,
+                end=event.end,
+                subject=event.subject,
+                is_cancelled=event.is_cancelled,
+                locations=_location_names(event.event_locations),
+                event=event
+            )
+
+
+def iter_educator_occurrences(educator_events: EducatorEvents
+                              ) -> Iterator[Occurrence]:
+    for day in educator_events.educator_events_days:
+        for event in day.day_study_events:
+            if event.start is None or event.end is None:
+                continue
+            yield Occurrence(
+                start=event.start,
+                end=event.end,
+                subject=event.subject,
+                is_cancelled=event.is_cancelled,
+                locations=_location_names(event.event_locations),
+                event=event
+            )
+
+
+def iter_educator_term_occurrences(educator_events_term: EducatorEventsTerm,
+                                   from_date: date = None, to_date: date = None
+                                   ) -> Iterator[Occurrence]:
+    """
+    Yields every dated occurrence of the term's events, optionally only the
+    ones between `from_date` and `to_date` inclusive.
+    """
+    term_from = educator_events_term.from_date or from_date
+    term_to = educator_events_term.to_date or to_date
+    if term_from is None or term_to is None:
+        return
+    for day in educator_events_term.educator_events_days:
+        for event in day.day_study_events:
+            for event_date in expand_dates(event.dates, term_from, term_to):
+                if ((from_date is not None and event_date < from_date)
+                        or (to_date is not None and event_date > to_date)):
+                    continue
+                yield Occurrence(
+                    start=_combine(event_date, event.start),
+                    end=_combine(event_date, event.end),
+                    subject=event.subject,
+                    is_cancelled=event.is_cancelled,
+                    locations=_location_names(event.event_locations),
+                    event=event
+                )
+
+
+def iter_extracur_occurrences(extracur_events: ExtracurEvents
+                              ) -> Iterator[Occurrence]:
+    for day in extracur_events.days:
+        for event in day.day_events:
+            if event.start is None or event.end is None:
+                continue
+            location = event.location
+            yield Occurrence(
+                start=event.start,
+                end=event.end,
+                subject=event.subject,
+                is_cancelled=event.is_cancelled,
+                locations=[location.display_name]
+                if location is not None and location.display_name else [],
+                event=event
+            )
@@ -0,0 +1,198 @@
+import abc
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Hashable, List, Tuple
+
+from .bulk import default_max_workers
+from .cache import default_cache_ttl
+from .classrooms import get_classroom_events
+from .consts import WEEKDAYS, LessonsTypes
+from .educators import get_educator_events
+from .occurrences import Occurrence, iter_classroom_occurrences
+from .types import CEEvent, CEEventsDay, ClassroomEvents, EducatorEvents
+
+_DAY = timedelta(days=1)
+
+
+def missing_runs(covered, first: date, last: date
+                 ) -> List[Tuple[date, date]]:
+    """
+    The runs of consecutive days from `first` to `last` inclusive that are
+    not in `covered`, as `(first, last)` pairs.
+    """
+    runs = []
+    day = first
+    while day <= last:
+        if day in covered:
+            day += _DAY
+            continue
+        run_first = day
+        while day + _DAY <= last and day + _DAY not in covered:
+            day += _DAY
+        runs.append((run_first, day))
+        day += _DAY
+    return runs
+
+
+class _Entry:
+    def __init__(self):
+        self.meta = None
+        # day -> time the day's data expires at
+        self.covered: Dict[date, float] = {}
+        self.days: Dict[date, Any] = {}
+
+
+class RangeCache(abc.ABC):
+    """
+    Per-entity cache of timetables requested for date ranges.
+
+    Coverage is kept per day, so a request overlapping the ranges already
+    fetched only requests the days missing from the cache, one request per
+    run of consecutive missing days, concurrently. Days expire `ttl`
+    seconds after they were fetched.
+
+    Subclasses define `_fetch`, which requests the days from `first` to
+    `last` inclusive and returns the entity's metadata and its data by day.
+    """
+    def __init__(self, ttl: float = default_cache_ttl,
+                 max_workers: int = default_max_workers):
+        self.ttl = ttl
+        self.max_workers = max_workers
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._lock = threading.Lock()
+
+    @abc.abstractmethod
+    def _fetch(self, key: Hashable, first: date, last: date
+               ) -> Tuple[Any, Dict[date, Any]]:
+        ...
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _get_days(self, key: Hashable, first: date, last: date
+                  ) -> Tuple[Any, Dict[date, Any]]:
+        if first > last:
+            raise ValueError(f'The range from {first} to {last} is empty')
+        now = time.time()
+        with self._lock:
+            entry = self._entries.setdefault(key, _Entry())
+            fresh = {
+                day for day, expires_at in entry.covered.items()
+                if expires_at > now and first <= day <= last
+            }
+        runs = missing_runs(fresh, first, last)
+        if len(runs) > 1:
+            with ThreadPoolExecutor(min(self.max_workers, len(runs))) as pool:
+                fetched = list(pool.map(
+                    lambda run: self._fetch(key, *run), runs
+                ))
+        else:
+            fetched = [self._fetch(key, *run) for run in runs]
+
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            for (run_first, run_last), (meta, days) in zip(runs, fetched):
+                entry.meta = meta
+                day = run_first
+                while day <= run_last:
+                    entry.covered[day] = expires_at
+                    entry.days.pop(day, None)
+                    day += _DAY
+                entry.days.update(
+                    (day, data) for day, data in days.items()
+                    if run_first <= day <= run_last
+                )
+            return entry.meta, {
+                day: data for day, data in entry.days.items()
+                if first <= day <= last
+            }
+
+
+class ClassroomRangeCache(RangeCache):
+    """
+    `get_classroom_events` through a `RangeCache`, keyed by classroom oid.
+    """
+    def _fetch(self, oid: str, first: date, last: date
+               ) -> Tuple[str, Dict[date, List[Occurrence]]]:
+        classroom_events = get_classroom_events(
+            oid, datetime.combine(first, datetime.min.time()),
+            datetime.combine(last + _DAY, datetime.min.time())
+        )
+        days: Dict[date, List[Occurrence]] = defaultdict(list)
+        for occurrence in iter_classroom_occurrences(classroom_events):
+            days[occurrence.start.date()].append(occurrence)
+        return classroom_events.display_text, days
+
+    def get_classroom_events(self, oid: str, _from: datetime,
+                             _to: datetime) -> ClassroomEvents:
+        """
+        What `get_classroom_events` returns for the range, with the events
+        of different weeks held on the same weekday and time merged into
+        one event with several dates, as the API does.
+        """
+        last = (_to - timedelta(microseconds=1)).date()
+        display_text, days = self._get_days(oid, _from.date(), last)
+        # (weekday, start, end, subject, ...) -> event
+        events: Dict[tuple, CEEvent] = {}
+        for day in sorted(days):
+            for occurrence in days[day]:
+                if occurrence.end <= _from or occurrence.start >= _to:
+                    continue
+                event: CEEvent = occurrence.event
+                event_key = (day.weekday(), event.start, event.end,
+                             event.subject, event.is_cancelled,
+                             event.educators_display_text)
+                event_date = f'{day.day}.{day.month}'
+                if event_key in events:
+                    events[event_key].dates.append(event_date)
+                else:
+                    events[event_key] = replace(event, dates=[event_date])
+
+        by_weekday: Dict[int, List[CEEvent]] = defaultdict(list)
+        for event_key in sorted(events, key=lambda k: k[:2]):
+            by_weekday[event_key[0]].append(events[event_key])
+        return ClassroomEvents(
+            oid=oid,
+            from_datetime=_from,
+            to_datetime=_to,
+            display_text=display_text,
+            has_events=bool(events),
+            classroom_events_days=[
+                CEEventsDay(
+                    day=weekday + 1,
+                    day_string=WEEKDAYS[weekday],
+                    day_study_events_count=len(by_weekday[weekday]),
+                    day_study_events=by_weekday[weekday]
+                )
+                for weekday in sorted(by_weekday)
+            ]
+        )
+
+
+class EducatorRangeCache(RangeCache):
+    """
+    `get_educator_events` through a `RangeCache`, keyed by educator id and
+    lessons type.
+    """
+    def _fetch(self, key: Tuple[int, LessonsTypes], first: date, last: date
+               ) -> Tuple[EducatorEvents, dict]:
+        educator_id, lessons_type = key
+        educator_events = get_educator_events(educator_id, first, last,
+                                              lessons_type)
+        return (
+            replace(educator_events, educator_events_days=[]),
+            {day.day: day for day in educator_events.educator_events_days}
+        )
+
+    def get_educator_events(self, educator_id: int, _from: date, _to: date,
+                            lessons_type: LessonsTypes = LessonsTypes.UNKNOWN
+                            ) -> EducatorEvents:
+        meta, days = self._get_days((educator_id, lessons_type), _from, _to)
+        return replace(
+            meta, educator_events_days=[days[day] for day in sorted(days)]
+        )
@@ -0,0 +1,165 @@
+from collections import Counter, defaultdict
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple, Union
+
+from .consts import ResourceKinds
+from .occurrences import room_name
+from .search import GroupResolver
+from .snapshot import Snapshot
+from .types import EducatorEventsTerm, EventLocation, GroupEvents
+
+Node = Tuple[ResourceKinds, Hashable]
+Edge = Tuple[Node, Node]
+# groups are identified by their id, or by their name when only the name
+# is known and cannot be resolved
+GroupKey = Union[int, str]
+
+
+def _educator_ids(ids) -> Set[int]:
+    return {
+        educator.eid for educator in ids
+        if educator.eid is not None and educator.eid >= 0
+    }
+
+
+class RelationIndex:
+    """
+    Reverse indexes between educators, groups and classrooms, built from
+    collected `GroupEvents` and `EducatorEventsTerm`.
+
+    Every timetable is a source of links; adding a newer version of the
+    same source, such as the same group week fetched again, replaces the
+    links it brought. Links are reference counted, so a link stays while
+    any source still has it, and lookups are dictionary reads.
+    """
+    def __init__(self, resolver: GroupResolver = None):
+        self.resolver = resolver
+        self._links: Dict[Node, Dict[ResourceKinds, Counter]] = \
+            defaultdict(lambda: defaultdict(Counter))
+        self._sources: Dict[Hashable, List[Edge]] = {}
+
+    def __len__(self) -> int:
+        return len(self._sources)
+
+    def _link(self, edge: Edge, delta: int) -> None:
+        a, b = edge
+        for node, other in ((a, b), (b, a)):
+            counts = self._links[node][other[0]]
+            counts[other[1]] += delta
+            if counts[other[1]] <= 0:
+                del counts[other[1]]
+
+    def _replace(self, source: Hashable, edges: Set[Edge]) -> None:
+        for edge in self._sources.pop(source, ()):
+            self._link(edge, -1)
+        for edge in edges:
+            self._link(edge, 1)
+        self._sources[source] = list(edges)
+
+    def _group(self, name: str) -> GroupKey:
+        if self.resolver is not None:
+            group_id = self.resolver.resolve_id(name, fuzzy=False)
+            if group_id is not None:
+                return group_id
+        return name
+
+    @staticmethod
+    def _location_edges(locations: List[EventLocation],
+                        educators: Set[int]) -> Iterable[Edge]:
+        for location in locations:
+            if not location.display_name:
+                continue
+            room = (ResourceKinds.CLASSROOM,
+                    room_name(location.display_name))
+            located = _educator_ids(location.educator_ids)
+            if not located and len(locations) == 1:
+                located = educators
+            for educator_id in located:
+                yield (ResourceKinds.EDUCATOR, educator_id), room
+
+    def add_group_events(self, group_events: GroupEvents) -> None:
+        group = (ResourceKinds.GROUP, group_events.student_group_id)
+        edges = set()
+        for day in group_events.days:
+            for event in day.day_study_events:
+                educators = _educator_ids(event.educator_ids)
+                edges.update(
+                    ((ResourceKinds.EDUCATOR, educator_id), group)
+                    for educator_id in educators
+                )
+                edges.update(
+                    (group, (ResourceKinds.CLASSROOM,
+                             room_name(location.display_name)))
+                    for location in event.event_locations
+                    if location.display_name
+                )
+                edges.update(self._location_edges(event.event_locations,
+                                                  educators))
+        self._replace(
+            (ResourceKinds.GROUP, group_events.student_group_id,
+             group_events.week_monday),
+            edges
+        )
+
+    def add_educator_term(self, educator_events_term: EducatorEventsTerm
+                          ) -> None:
+        educator = (ResourceKinds.EDUCATOR,
+                    educator_events_term.educator_master_id)
+        edges = set()
+        for day in educator_events_term.educator_events_days:
+            for event in day.day_study_events:
+                groups = {
+                    (ResourceKinds.GROUP, self._group(unit.groups))
+                    for unit in event.contingent_unit_names if unit.groups
+                }
+                rooms = {
+                    (ResourceKinds.CLASSROOM,
+                     room_name(location.display_name))
+                    for location in event.event_locations
+                    if location.display_name
+                }
+                edges.update((educator, group) for group in groups)
+                edges.update((educator, room) for room in rooms)
+                edges.update(
+                    (group, room) for group in groups for room in rooms
+                )
+        self._replace(
+            (ResourceKinds.EDUCATOR, educator_events_term.educator_master_id,
+             educator_events_term.from_date),
+            edges
+        )
+
+    def add_snapshot(self, snapshot: Snapshot,
+                     parse_processes: Optional[int] = None) -> None:
+        for _, group_events in snapshot.iter_group_events(parse_processes):
+            self.add_group_events(group_events)
+
+    def _related(self, kind: ResourceKinds, key: Hashable,
+                 other: ResourceKinds) -> Set:
+        node = (kind, key)
+        if node not in self._links:
+            return set()
+        return set(self._links[node].get(other, ()))
+
+    def groups_of_educator(self, educator_id: int) -> Set[GroupKey]:
+        return self._related(ResourceKinds.EDUCATOR, educator_id,
+                             ResourceKinds.GROUP)
+
+    def educators_of_group(self, group: GroupKey) -> Set[int]:
+        return self._related(ResourceKinds.GROUP, group,
+                             ResourceKinds.EDUCATOR)
+
+    def classrooms_of_educator(self, educator_id: int) -> Set[str]:
+        return self._related(ResourceKinds.EDUCATOR, educator_id,
+                             ResourceKinds.CLASSROOM)
+
+    def educators_of_classroom(self, classroom: str) -> Set[int]:
+        return self._related(ResourceKinds.CLASSROOM, room_name(classroom),
+                             ResourceKinds.EDUCATOR)
+
+    def classrooms_of_group(self, group: GroupKey) -> Set[str]:
+        return self._related(ResourceKinds.GROUP, group,
+                             ResourceKinds.CLASSROOM)
+
+    def groups_of_classroom(self, classroom: str) -> Set[GroupKey]:
+        return self._related(ResourceKinds.CLASSROOM, room_name(classroom),
+                             ResourceKinds.GROUP)
@@ -0,0 +1,142 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from requests import RequestException
+
+from .bulk import default_max_workers, get_many_classrooms
+from .classrooms import ClassroomSchedule
+from .consts import SeatingTypes
+from .types import Address, ApiException, Classroom
+
+
+def _seating_matches(classroom: Classroom, seating: SeatingTypes) -> bool:
+    # the classroom list reports seating as the index of the seating type
+    return classroom.seating_type in (
+        seating.value, list(SeatingTypes).index(seating)
+    )
+
+
+@dataclass
+class Room:
+    address: Address
+    classroom: Classroom
+    schedule: Optional[ClassroomSchedule] = None
+    refreshed_at: Optional[float] = None
+
+
+class RoomFinder:
+    """
+    Answers free classroom queries from a local copy of the classroom list
+    and of every classroom's events between `_from` and `_to`.
+
+    `load` makes one request per address and one per classroom; every query
+    after that is answered in memory. `start_refreshing` keeps the events up
+    to date in a background thread. The rooms whose events could not be
+    fetched are kept in `failures` with the error, and are not reported as
+    free until a refresh of them succeeds.
+    """
+    def __init__(self, _from: datetime, _to: datetime,
+                 address_oids: Iterable[str] = None, equipment: str = None,
+                 max_workers: int = default_max_workers):
+        self._from = _from
+        self._to = _to
+        self.address_oids = set(address_oids) if address_oids else None
+        self.equipment = equipment
+        self.max_workers = max_workers
+        self.rooms: Dict[str, Room] = {}
+        self.failures: Dict[str, Exception] = {}
+        self._stop_refreshing = threading.Event()
+        self._refresher: Optional[threading.Thread] = None
+
+    def load(self) -> 'RoomFinder':
+        rooms = {
+            classroom.oid: Room(address, classroom)
+            for address, classroom in get_many_classrooms(
+                self.address_oids, self.equipment, self.max_workers
+            )
+        }
+        self.rooms = rooms
+        self.failures = {}
+        with ThreadPoolExecutor(self.max_workers) as pool:
+            list(pool.map(self._try_refresh_room, rooms))
+        return self
+
+    def refresh_room(self, oid: str) -> None:
+        room = self.rooms[oid]
+        room.schedule = ClassroomSchedule.load(oid, self._from, self._to)
+        room.refreshed_at = time.time()
+
+    def _try_refresh_room(self, oid: str) -> None:
+        try:
+            self.refresh_room(oid)
+        except (ApiException, RequestException, KeyError, TypeError,
+                ValueError) as e:
+            # keep serving the previous events of the room, if any; a
+            # malformed response fails only its own room
+            self.failures[oid] = e
+        else:
+            self.failures.pop(oid, None)
+
+    def find_free_rooms(self, start: datetime, end: datetime,
+                        capacity: int = None, seating: SeatingTypes = None,
+                        with_equipment: bool = False,
+                        near: str = None) -> List[Room]:
+        """
+        Returns the rooms free during `[start, end)`, the rooms at the
+        address with oid `near` first, then the smallest rooms first.
+
+        :param capacity: minimal number of seats
+        :param with_equipment: only rooms with all of the `equipment` the
+            finder was created with
+        """
+        if start < self._from or end > self._to:
+            raise ValueError(
+                f'Only rooms between {self._from} and {self._to} are loaded'
+            )
+        free = [
+            room for room in self.rooms.values()
+            if (capacity is None
+                or (room.classroom.capacity or 0) >= capacity)
+            and (seating is None
+                 or _seating_matches(room.classroom, seating))
+            and not (with_equipment and room.classroom.wanting_equipment)
+            and room.schedule is not None
+            and not room.schedule.busy.overlaps(start, end)
+        ]
+        free.sort(key=lambda room: (
+            room.address.oid != near,
+            room.classroom.capacity or 0,
+            room.classroom.display_name or ''
+        ))
+        return free
+
+    def start_refreshing(self, interval: float) -> None:
+        """
+        Refetches the events of every room once per `interval` seconds,
+        one room at a time, in a daemon thread.
+        """
+        self.stop_refreshing()
+        self._stop_refreshing.clear()
+        self._refresher = threading.Thread(
+            target=self._refresh_forever, args=(interval,), daemon=True
+        )
+        self._refresher.start()
+
+    def stop_refreshing(self) -> None:
+        if self._refresher is not None:
+            self._stop_refreshing.set()
+            self._refresher.join()
+            self._refresher = None
+
+    def _refresh_forever(self, interval: float) -> None:
+        while not self._stop_refreshing.is_set():
+            oids = list(self.rooms)
+            pause = interval / max(len(oids), 1)
+            for oid in oids:
+                if self._stop_refreshing.wait(pause):
+                    return
+                self._try_refresh_room(oid)
@@ -0,0 +1,300 @@
+import json
+import os
+import re
+from bisect import bisect_left, insort
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Set
+
+from .bulk import default_max_workers
+from .catalog import Catalog
+from .educators import search_educator
+from .types import Educator, PGGroup
+
+_NON_WORD = re.compile(r'[^\w]+')
+# latin letters typed in place of the cyrillic ones looking the same
+_HOMOGLYPHS = str.maketrans('aebkmhopctyx', 'аевкмнорстух')
+
+# every educator has a last name starting with one of these letters
+default_seed_queries = list('абвгдеёжзийклмнопрстуфхцчшщэюя')
+
+
+def normalize(text: Optional[str]) -> str:
+    return _NON_WORD.sub(' ', (text or '').lower().replace('ё', 'е')).strip()
+
+
+def _trigrams(word: str) -> Set[str]:
+    return {word[i:i + 3] for i in range(len(word) - 2)}
+
+
+class EducatorIndex:
+    """
+    In-memory educator search by `display_name` and `full_name`, an offline
+    replacement of `search_educator`.
+
+    Every query word has to match an educator: either as a case-insensitive
+    prefix of one of the educator's name words, found by a binary search
+    over the sorted words, or, for words of three letters and more, as a
+    substring, found through a trigram index. Educators matching by prefix
+    come first.
+    """
+    def __init__(self, educators: Iterable[Educator] = ()):
+        self.educators: Dict[int, Educator] = {}
+        self._words: List[str] = []
+        self._ids_by_word: Dict[str, Set[int]] = defaultdict(set)
+        self._ids_by_trigram: Dict[str, Set[int]] = defaultdict(set)
+        self._texts: Dict[int, str] = {}
+        self.update(educators)
+
+    def __len__(self) -> int:
+        return len(self.educators)
+
+    def __contains__(self, educator_id: int) -> bool:
+        return educator_id in self.educators
+
+    def get(self, educator_id: int) -> Optional[Educator]:
+        return self.educators.get(educator_id)
+
+    @classmethod
+    def seed(cls, queries: Iterable[str] = None,
+             max_workers: int = default_max_workers) -> 'EducatorIndex':
+        """
+        Builds the index from the results of `search_educator` for every
+        one of `queries`, by default every letter of the alphabet.
+        """
+        index = cls()
+        index.refresh(queries, max_workers)
+        return index
+
+    def update(self, educators: Iterable[Educator]) -> int:
+        """
+        Adds new educators and reindexes the changed ones. Returns the
+        number of educators added or changed.
+        """
+        changed = 0
+        for educator in educators:
+            if self.educators.get(educator.id) == educator:
+                continue
+            self.remove([educator.id])
+            self.educators[educator.id] = educator
+            text = normalize(f'{educator.display_name} {educator.full_name}')
+            self._texts[educator.id] = text
+            for word in set(text.split()):
+                if not self._ids_by_word[word]:
+                    insort(self._words, word)
+                self._ids_by_word[word].add(educator.id)
+                for trigram in _trigrams(word):
+                    self._ids_by_trigram[trigram].add(educator.id)
+            changed += 1
+        return changed
+
+    def remove(self, educator_ids: Iterable[int]) -> None:
+        for educator_id in educator_ids:
+            if self.educators.pop(educator_id, None) is None:
+                continue
+            for word in set(self._texts.pop(educator_id).split()):
+                ids = self._ids_by_word[word]
+                ids.discard(educator_id)
+                if not ids:
+                    del self._ids_by_word[word]
+                    del self._words[bisect_left(self._words, word)]
+                for trigram in _trigrams(word):
+                    ids = self._ids_by_trigram[trigram]
+                    ids.discard(educator_id)
+                    if not ids:
+                        del self._ids_by_trigram[trigram]
+
+    def refresh(self, queries: Iterable[str] = None,
+                max_workers: int = default_max_workers) -> int:
+        """
+        Repeats `search_educator` for `queries` concurrently and updates the
+        index with the results; only changed educators are reindexed. When
+        refreshing with the default queries, educators that are no longer
+        found are removed. Returns the number of educators added, changed or
+        removed.
+        """
+        complete = queries is None
+        queries = default_seed_queries if complete else list(queries)
+        found = {}
+        with ThreadPoolExecutor(max_workers) as pool:
+            for educators in pool.map(search_educator, queries):
+                found.update((educator.id, educator) for educator in educators)
+        changed = self.update(found.values())
+        if complete:
+            gone = [i for i in self.educators if i not in found]
+            self.remove(gone)
+            changed += len(gone)
+        return changed
+
+    def _prefix_ids(self, prefix: str) -> Set[int]:
+        ids = set()
+        position = bisect_left(self._words, prefix)
+        while (position < len(self._words)
+               and self._words[position].startswith(prefix)):
+            ids |= self._ids_by_word[self._words[position]]
+            position += 1
+        return ids
+
+    def _substring_ids(self, word: str) -> Set[int]:
+        trigrams = _trigrams(word)
+        if not trigrams:
+            return set()
+        candidates = set.intersection(*(
+            self._ids_by_trigram.get(trigram, set()) for trigram in trigrams
+        ))
+        return {i for i in candidates if word in self._texts[i]}
+
+    def search(self, query: str, department: str = None,
+               limit: int = None) -> List[Educator]:
+        """
+        :param department: only educators with an employment in a
+            department whose name contains this, case-insensitively
+        """
+        words = normalize(query).split()
+        if not words:
+            return []
+        matched = None
+        prefix_matches: Dict[int, int] = defaultdict(int)
+        for word in words:
+            by_prefix = self._prefix_ids(word)
+            for educator_id in by_prefix:
+                prefix_matches[educator_id] += 1
+            ids = by_prefix | self._substring_ids(word)
+            matched = ids if matched is None else matched & ids
+            if not matched:
+                return []
+
+        if department is not None:
+            department = department.lower()
+            matched = {
+                i for i in matched
+                if any(department in (employment.department or '').lower()
+                       for employment in self.educators[i].employments)
+            }
+        found = sorted(
+            (self.educators[i] for i in matched),
+            key=lambda educator: (-prefix_matches[educator.id],
+                                  educator.display_name or '',
+                                  educator.id)
+        )
+        return found[:limit] if limit is not None else found
+
+
+def normalize_group_name(name: Optional[str]) -> str:
+    """
+    `"20.Б07-мм"`, `"20 б07 мм"` and `"20.Б07-MM"` all become `"20б07мм"`.
+    """
+    return _NON_WORD.sub('', normalize(name).translate(_HOMOGLYPHS))
+
+
+def _deletions(word: str) -> Set[str]:
+    return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+def _edit_distance(a: str, b: str) -> int:
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+class GroupResolver:
+    """
+    Resolves group names as users type them into `PGGroup` objects without
+    network calls.
+
+    Names are compared normalized, ignoring case, punctuation, spaces and
+    latin look-alike letters. Names with a typo are found through an index
+    of every normalized name with one letter deleted, so a lookup costs a
+    few dictionary lookups however many groups there are.
+    """
+    def __init__(self, groups: Iterable[PGGroup] = ()):
+        self.groups: Dict[int, PGGroup] = {}
+        self._by_name: Dict[str, List[int]] = defaultdict(list)
+        self._by_deletion: Dict[str, Set[str]] = defaultdict(set)
+        for group in groups:
+            self.add(group)
+
+    def __len__(self) -> int:
+        return len(self.groups)
+
+    @classmethod
+    def from_catalog(cls, catalog: Catalog) -> 'GroupResolver':
+        return cls(catalog.groups())
+
+    @classmethod
+    def load(cls, path: str) -> 'GroupResolver':
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(PGGroup.de_json(obj) for obj in json.load(f))
+
+    def save(self, path: str) -> None:
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump([
+                {
+                    'StudentGroupId': group.student_group_id,
+                    'StudentGroupName': group.student_group_name,
+                    'StudentGroupStudyForm': group.student_group_study_form,
+                    'StudentGroupProfiles': group.student_group_profiles,
+                    'PublicDivisionAlias': group.public_division_alias
+                }
+                for group in self.groups.values()
+            ], f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def add(self, group: PGGroup) -> None:
+        if group.student_group_id in self.groups:
+            return
+        self.groups[group.student_group_id] = group
+        name = normalize_group_name(group.student_group_name)
+        if not name:
+            return
+        self._by_name[name].append(group.student_group_id)
+        for deletion in _deletions(name):
+            self._by_deletion[deletion].add(name)
+
+    def _groups(self, name: str) -> List[PGGroup]:
+        return [self.groups[i] for i in self._by_name.get(name, [])]
+
+    def resolve(self, name: str, fuzzy: bool = True) -> List[PGGroup]:
+        """
+        Returns the groups named `name`, or, if there are none and `fuzzy`
+        is set, the groups with the closest names at most two typos away.
+        """
+        query = normalize_group_name(name)
+        if not query:
+            return []
+        if query in self._by_name or not fuzzy:
+            return self._groups(query)
+
+        # a name one letter longer, one letter shorter, or with one letter
+        # replaced shares a one-deletion variant with the query
+        candidates = set(self._by_deletion.get(query, ()))
+        for deletion in _deletions(query):
+            if deletion in self._by_name:
+                candidates.add(deletion)
+            candidates.update(self._by_deletion.get(deletion, ()))
+        if not candidates:
+            return []
+        distances = {
+            candidate: _edit_distance(query, candidate)
+            for candidate in candidates
+        }
+        closest = min(distances.values())
+        return [
+            group
+            for candidate in sorted(candidates)
+            if distances[candidate] == closest
+            for group in self._groups(candidate)
+        ]
+
+    def resolve_id(self, name: str, fuzzy: bool = True) -> Optional[int]:
+        """
+        The `student_group_id` of the only group `resolve` finds, if any.
+        """
+        groups = self.resolve(name, fuzzy)
+        return groups[0].student_group_id if len(groups) == 1 else None
@@ -0,0 +1,91 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+from typing import Callable, Iterable, Iterator, List
+
+from .bulk import default_max_workers
+from .classrooms import get_classroom_events
+from .educators import get_educator_events
+from .groups import get_group_events
+from .intervals import Interval, IntervalIndex, merge
+from .occurrences import (Occurrence, iter_classroom_occurrences,
+                          iter_educator_occurrences, iter_group_occurrences)
+
+
+@dataclass
+class FreeSlot:
+    start: datetime
+    end: datetime
+
+    @property
+    def duration(self) -> timedelta:
+        return self.end - self.start
+
+
+def _busy(occurrences: Iterable[Occurrence]) -> List[Interval]:
+    return sorted(
+        (occurrence.start, occurrence.end) for occurrence in occurrences
+        if not occurrence.is_cancelled
+    )
+
+
+def _working_hours(_from: datetime, _to: datetime, day_start: time,
+                   day_end: time) -> Iterator[Interval]:
+    day = _from.date()
+    while day <= _to.date():
+        start = max(_from, datetime.combine(day, day_start))
+        end = min(_to, datetime.combine(day, day_end))
+        if start < end:
+            yield start, end
+        day += timedelta(days=1)
+
+
+def find_free_slots(_from: datetime, _to: datetime,
+                    group_ids: Iterable[int] = (),
+                    educator_ids: Iterable[int] = (),
+                    classroom_oids: Iterable[str] = (),
+                    min_duration: timedelta = timedelta(minutes=90),
+                    day_start: time = time(9), day_end: time = time(21),
+                    limit: int = None,
+                    max_workers: int = default_max_workers
+                    ) -> List[FreeSlot]:
+    """
+    Returns the windows between `_from` and `_to` in which every given
+    group, educator and classroom is free, within `day_start`-`day_end`
+    every day, ranked longest first and then earliest first.
+
+    The timetables are fetched concurrently and their sorted busy intervals
+    are combined with a k-way merge.
+
+    :param min_duration: shortest window worth returning
+    """
+    fetches: List[Callable[[], List[Interval]]] = []
+    for group_id in group_ids:
+        fetches.append(lambda group_id=group_id: _busy(iter_group_occurrences(
+            get_group_events(group_id, _from.date(), _to.date())
+        )))
+    for educator_id in educator_ids:
+        fetches.append(lambda educator_id=educator_id: _busy(
+            iter_educator_occurrences(
+                get_educator_events(educator_id, _from.date(), _to.date())
+            )
+        ))
+    for oid in classroom_oids:
+        fetches.append(lambda oid=oid: _busy(iter_classroom_occurrences(
+            get_classroom_events(oid, _from, _to)
+        )))
+    if fetches:
+        with ThreadPoolExecutor(min(max_workers, len(fetches))) as pool:
+            busy = IntervalIndex(merge(*pool.map(lambda f: f(), fetches)))
+    else:
+        busy = IntervalIndex()
+
+    slots = [
+        FreeSlot(start, end)
+        for window_start, window_end in _working_hours(_from, _to, day_start,
+                                                       day_end)
+        for start, end in busy.gaps(window_start, window_end)
+        if end - start >= min_duration
+    ]
+    slots.sort(key=lambda slot: (-slot.duration, slot.start))
+    return slots[:limit] if limit is not None else slots
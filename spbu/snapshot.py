@@ -0,0 +1,229 @@
+import abc
+import json
+import os
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from itertools import islice
+from typing import Iterator, List, Optional, Tuple
+
+from .bulk import _parse_batch, default_parse_batch_size
+from .types import GroupEvents
+
+META_KEY = 'meta'
+STUDY_DIVISIONS_KEY = 'study_divisions'
+
+
+def study_levels_key(alias: str) -> str:
+    return f'study_levels/{alias}'
+
+
+def groups_key(program_id: int) -> str:
+    return f'groups/{program_id}'
+
+
+def group_events_key(group_id: int, week_monday: date) -> str:
+    return f'group_events/{group_id}/{week_monday}'
+
+
+class Sink(abc.ABC):
+    """
+    Storage of raw response bodies by key. Keys are `/`-separated paths,
+    such as `group_events/19082/2019-05-27`.
+    Subclasses must be safe to use from several threads.
+    """
+
+    @abc.abstractmethod
+    def put(self, key: str, content: bytes) -> None:
+        ...
+
+    @abc.abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abc.abstractmethod
+    def keys(self, prefix: str = '') -> Iterator[str]:
+        ...
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> 'Sink':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class MemorySink(Sink):
+    def __init__(self):
+        self._entries = {}
+
+    def put(self, key: str, content: bytes) -> None:
+        self._entries[key] = content
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._entries.get(key)
+
+    def keys(self, prefix: str = '') -> Iterator[str]:
+        return (key for key in list(self._entries) if key.startswith(prefix))
+
+
+class DirectorySink(Sink):
+    """
+    Stores every entry as a `<key>.json` file under `path`.
+    """
+    suffix = '.json'
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, *key.split('/')) + self.suffix
+
+    def put(self, key: str, content: bytes) -> None:
+        file = self._file(key)
+        os.makedirs(os.path.dirname(file), exist_ok=True)
+        tmp_file = f'{file}.{threading.get_ident()}.tmp'
+        with open(tmp_file, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_file, file)
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._file(key), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.isfile(self._file(key))
+
+    def keys(self, prefix: str = '') -> Iterator[str]:
+        for root, dirs, files in os.walk(self.path):
+            dirs.sort()
+            rel_root = os.path.relpath(root, self.path)
+            for name in sorted(files):
+                if not name.endswith(self.suffix):
+                    continue
+                parts = [] if rel_root == os.curdir else rel_root.split(os.sep)
+                key = '/'.join(parts + [name[:-len(self.suffix)]])
+                if key.startswith(prefix):
+                    yield key
+
+
+class SQLiteSink(Sink):
+    """
+    Stores entries in the `entries` table of an SQLite database.
+    """
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS entries '
+                '(key TEXT PRIMARY KEY, content BLOB NOT NULL)'
+            )
+
+    def put(self, key: str, content: bytes) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO entries (key, content) VALUES (?, ?)',
+                (key, content)
+            )
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT content FROM entries WHERE key = ?', (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def keys(self, prefix: str = '') -> Iterator[str]:
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT key FROM entries WHERE substr(key, 1, ?) = ? '
+                'ORDER BY key',
+                (len(prefix), prefix)
+            ).fetchall()
+        return (row[0] for row in rows)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class Snapshot:
+    """
+    Read access to the timetables stored in a sink by `crawl`.
+    """
+    def __init__(self, sink: Sink):
+        self.sink = sink
+
+    @property
+    def meta(self) -> dict:
+        content = self.sink.get(META_KEY)
+        return json.loads(content) if content else {}
+
+    @property
+    def week_monday(self) -> Optional[date]:
+        week_monday = self.meta.get('week_monday')
+        if week_monday:
+            return date.fromisoformat(week_monday)
+        return None
+
+    def get_group_events(self, group_id: int,
+                         week_monday: date) -> Optional[GroupEvents]:
+        content = self.sink.get(group_events_key(group_id, week_monday))
+        return GroupEvents.de_json(json.loads(content)) if content else None
+
+    def iter_group_events(self, parse_processes: Optional[int] = None
+                          ) -> Iterator[Tuple[Tuple[int, date], GroupEvents]]:
+        """
+        Yields `((group_id, week_monday), GroupEvents)` for every stored
+        group week. With `parse_processes` the entries are parsed in a pool
+        of that many processes.
+        """
+        entries = (
+            (_parse_group_events_key(key), self.sink.get(key))
+            for key in self.sink.keys('group_events/')
+        )
+        if not parse_processes:
+            for week_key, content in entries:
+                yield week_key, GroupEvents.de_json(json.loads(content))
+            return
+
+        with ProcessPoolExecutor(parse_processes) as pool:
+            batches = iter(lambda: list(
+                islice(entries, default_parse_batch_size)
+            ), [])
+            for batch in _map_batches(pool, batches, 2 * parse_processes):
+                yield from batch
+
+
+def _map_batches(pool: ProcessPoolExecutor, batches: Iterator[list],
+                 limit: int
+                 ) -> Iterator[List[Tuple[Tuple[int, date], GroupEvents]]]:
+    # keeps at most `limit` batches in flight, so a large snapshot is never
+    # fully loaded into memory
+    in_flight = []
+    for batch in batches:
+        keys = [week_key for week_key, _ in batch]
+        contents = [content for _, content in batch]
+        in_flight.append((keys, pool.submit(_parse_batch, GroupEvents,
+                                            contents)))
+        if len(in_flight) >= limit:
+            keys, future = in_flight.pop(0)
+            yield list(zip(keys, future.result()))
+    for keys, future in in_flight:
+        yield list(zip(keys, future.result()))
+
+
+def _parse_group_events_key(key: str) -> Tuple[int, date]:
+    _, group_id, week_monday = key.split('/')
+    return int(group_id), date.fromisoformat(week_monday)
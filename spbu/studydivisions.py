@@ -6,21 +6,21 @@ from .types import SDStudyDivision, SDPLStudyLevel
 
 
 def get_study_divisions() -> List[SDStudyDivision]:
-    return [
-        SDStudyDivision.de_json(sd)
-        for sd in util.call_api(
+    return util.parse_list(
+        SDStudyDivision,
+        util.call_api(
             method=APIMethods.SD_DIVISIONS
         )
-    ]
+    )
 
 
 def get_study_levels(alias: str) -> List[SDPLStudyLevel]:
-    return [
-        SDPLStudyLevel.de_json(sl)
-        for sl in util.call_api(
+    return util.parse_list(
+        SDPLStudyLevel,
+        util.call_api(
             method=APIMethods.SD_PROGRAMS,
             path_values={
                 "alias": alias
             }
         )
-    ]
+    )
@@ -0,0 +1,189 @@
+import hashlib
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from . import util
+from .bulk import default_max_workers
+from .crawler import _fetch
+from .groups import _group_events_request
+from .snapshot import Sink, Snapshot, _parse_group_events_key
+
+RESYNC_STATE_KEY = 'resync_state'
+
+default_min_interval = timedelta(hours=1)
+recent_change_period = timedelta(days=7)
+
+# a week is considered volatile if the server marks any of its events as
+# moved, relocated or reassigned; matched on the raw body to avoid parsing
+_CHANGE_FLAGS = re.compile(
+    rb'"(?:TimeWasChanged|LocationsWereChanged|EducatorsWereReassigned)"'
+    rb'\s*:\s*true'
+)
+
+
+def fingerprint(content: bytes) -> str:
+    """
+    Hash of the days of a stored group week. The week links and other
+    fields that depend on the current date are left out, so only changes of
+    the events themselves change the fingerprint.
+    """
+    days = json.loads(content).get("Days", [])
+    return hashlib.sha1(
+        json.dumps(days, sort_keys=True, ensure_ascii=False).encode()
+    ).hexdigest()
+
+
+@dataclass
+class _WeekState:
+    fingerprint: str
+    checked_at: float
+    changed_at: Optional[float] = None
+    has_change_flags: bool = False
+
+    def is_volatile(self, now: float) -> bool:
+        return self.has_change_flags or (
+            self.changed_at is not None
+            and now - self.changed_at < recent_change_period.total_seconds()
+        )
+
+
+@dataclass
+class ResyncReport:
+    checked: int = 0
+    changed: int = 0
+    not_due: int = 0
+    bytes_written: int = 0
+    bytes_not_written: int = 0
+    failures: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def requests_saved(self) -> int:
+        return self.not_due
+
+    @property
+    def writes_saved(self) -> int:
+        return self.checked - self.changed
+
+    @property
+    def saved_ratio(self) -> float:
+        """
+        Share of the requests and writes a full recrawl would have made that
+        were avoided.
+        """
+        total = self.checked + self.not_due
+        if not total:
+            return 0.0
+        return (self.requests_saved + self.writes_saved) / (2 * total)
+
+
+def refresh_interval(week_monday: date, now: datetime, volatile: bool,
+                     min_interval: timedelta = default_min_interval
+                     ) -> Optional[timedelta]:
+    """
+    How often a stored group week is worth refetching: the current week
+    every `min_interval`, each following week half as often, volatile weeks
+    four times as often. Past weeks are never refetched.
+    """
+    current_monday = now.date() - timedelta(days=now.weekday())
+    distance = (week_monday - current_monday).days // 7
+    if distance < 0:
+        return None
+    interval = min_interval * 2 ** min(distance, 8)
+    if volatile:
+        interval /= 4
+    return interval
+
+
+def _load_state(sink: Sink) -> Dict[str, _WeekState]:
+    content = sink.get(RESYNC_STATE_KEY)
+    if not content:
+        return {}
+    return {
+        key: _WeekState(*values)
+        for key, values in json.loads(content).items()
+    }
+
+
+def _save_state(sink: Sink, state: Dict[str, _WeekState]) -> None:
+    sink.put(RESYNC_STATE_KEY, json.dumps({
+        key: [week.fingerprint, week.checked_at, week.changed_at,
+              week.has_change_flags]
+        for key, week in state.items()
+    }).encode())
+
+
+def resync(sink: Sink, now: datetime = None,
+           min_interval: timedelta = default_min_interval,
+           max_workers: int = default_max_workers,
+           requests_per_second: float = None, retries: int = 2,
+           retry_delay: float = 1.0) -> ResyncReport:
+    """
+    Refreshes the group weeks of a snapshot made by `crawl`.
+
+    Only the weeks due according to `refresh_interval` are refetched, and a
+    week is rewritten only if its `fingerprint` changed. Fingerprints and
+    check times are kept in the sink, so consecutive runs only do the work
+    that is due.
+    """
+    now = now or datetime.now()
+    timestamp = now.timestamp()
+    state = _load_state(sink)
+    # weeks never resynced before are as fresh as the crawl that stored them
+    crawled_at = Snapshot(sink).meta.get('started_at', 0.0)
+    report = ResyncReport()
+
+    due: List[Tuple[str, Tuple[int, date]]] = []
+    for key in sink.keys('group_events/'):
+        group_id, week_monday = _parse_group_events_key(key)
+        week = state.get(key)
+        if week is None:
+            content = sink.get(key)
+            week = state[key] = _WeekState(
+                fingerprint(content), crawled_at,
+                has_change_flags=bool(_CHANGE_FLAGS.search(content))
+            )
+        interval = refresh_interval(week_monday, now,
+                                    week.is_volatile(timestamp),
+                                    min_interval)
+        if interval is None \
+                or week.checked_at + interval.total_seconds() > timestamp:
+            report.not_due += 1
+        else:
+            due.append((key, (group_id, week_monday)))
+
+    limiter = None
+    if requests_per_second:
+        limiter = util.RateLimiter(requests_per_second)
+    with ThreadPoolExecutor(max_workers) as pool:
+        futures = {
+            pool.submit(_fetch, _group_events_request(*week_key), limiter,
+                        retries, retry_delay): key
+            for key, week_key in due
+        }
+        for future in as_completed(futures):
+            key = futures.pop(future)
+            try:
+                content = future.result()
+            except Exception as e:
+                report.failures[key] = f'{type(e).__name__}: {e}'
+                continue
+            report.checked += 1
+            week = state[key]
+            week.checked_at = timestamp
+            week.has_change_flags = bool(_CHANGE_FLAGS.search(content))
+            new_fingerprint = fingerprint(content)
+            if new_fingerprint == week.fingerprint:
+                report.bytes_not_written += len(content)
+                continue
+            sink.put(key, content)
+            week.fingerprint = new_fingerprint
+            week.changed_at = timestamp
+            report.changed += 1
+            report.bytes_written += len(content)
+
+    _save_state(sink, state)
+    return report
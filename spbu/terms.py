@@ -0,0 +1,140 @@
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Tuple
+
+from .consts import WEEKDAYS
+from .occurrences import _combine, expand_dates
+from .types import (EdEEvent, EdEEventsDay, EdETEvent, EducatorEvents,
+                    EducatorEventsTerm)
+
+MONTHS = ['января', 'февраля', 'марта', 'апреля', 'мая', 'июня', 'июля',
+          'августа', 'сентября', 'октября', 'ноября', 'декабря']
+
+
+def _date_string(day: date) -> str:
+    return f'{day.day} {MONTHS[day.month - 1]}'
+
+
+def _iter_bits(bits: int) -> Iterator[int]:
+    while bits:
+        lowest = bits & -bits
+        yield lowest.bit_length() - 1
+        bits ^= lowest
+
+
+class EducatorTerm:
+    """
+    Answers `get_educator_events`-shaped queries for any dates of a term
+    from one `EducatorEventsTerm`.
+
+    The dates of every term event are expanded once into a bitmap with one
+    bit per day of the term, so a range query is a few integer operations
+    per event and builds only the events of the requested days.
+    """
+    def __init__(self, term: EducatorEventsTerm):
+        self.term = term
+        self.from_date = term.from_date
+        self.to_date = term.to_date
+        self.bitmap = 0
+        self._events: List[Tuple[EdETEvent, int]] = []
+        if self.from_date is None or self.to_date is None:
+            return
+        for day in term.educator_events_days:
+            for event in day.day_study_events:
+                bits = 0
+                for event_date in expand_dates(event.dates, self.from_date,
+                                               self.to_date):
+                    if self.from_date <= event_date <= self.to_date:
+                        bits |= 1 << (event_date - self.from_date).days
+                if bits:
+                    self._events.append((event, bits))
+                    self.bitmap |= bits
+
+    def covers(self, _from: date, _to: date) -> bool:
+        return (self.from_date is not None and self.to_date is not None
+                and self.from_date <= _from and _to <= self.to_date)
+
+    def _mask(self, _from: date, _to: date) -> int:
+        first = max((_from - self.from_date).days, 0)
+        last = (_to - self.from_date).days
+        if last < first:
+            return 0
+        return ((1 << (last - first + 1)) - 1) << first
+
+    def dates(self, _from: date, _to: date) -> List[date]:
+        """
+        The days between `_from` and `_to` inclusive with any events.
+        """
+        if self.from_date is None:
+            return []
+        return [
+            self.from_date + timedelta(days=i)
+            for i in _iter_bits(self.bitmap & self._mask(_from, _to))
+        ]
+
+    def _event(self, event: EdETEvent, day: date) -> EdEEvent:
+        start = _combine(day, event.start)
+        end = _combine(day, event.end)
+        date_string = f'{_date_string(day)} {event.time_interval_string}'
+        locations = [
+            location.display_name for location in event.event_locations
+            if location.display_name
+        ]
+        return EdEEvent(
+            study_events_timetable_kind_code=(
+                event.study_events_timetable_kind_code
+            ),
+            start=start,
+            end=end,
+            subject=event.subject,
+            time_interval_string=event.time_interval_string,
+            date_with_time_interval_string=date_string,
+            display_date_and_time_interval_string=date_string,
+            locations_display_text='; '.join(locations) or None,
+            educators_display_text=event.educators_display_text,
+            contingent_unit_name=', '.join(
+                unit.groups for unit in event.contingent_unit_names
+                if unit.groups
+            ) or None,
+            division_and_course=', '.join(
+                unit.courses for unit in event.contingent_unit_names
+                if unit.courses
+            ) or None,
+            elective_disciplines_count=None,
+            has_educators=bool(event.educator_ids),
+            is_cancelled=event.is_cancelled,
+            within_the_same_day=True,
+            event_locations=list(event.event_locations)
+        )
+
+    def get_events(self, _from: date, _to: date) -> EducatorEvents:
+        """
+        The educator's events from `_from` to `_to` inclusive, shaped like
+        the response of `get_educator_events`.
+        """
+        by_day: Dict[date, List[EdEEvent]] = defaultdict(list)
+        if self.from_date is not None:
+            mask = self._mask(_from, _to)
+            for event, bits in self._events:
+                for i in _iter_bits(bits & mask):
+                    day = self.from_date + timedelta(days=i)
+                    by_day[day].append(self._event(event, day))
+        return EducatorEvents(
+            educator_master_id=self.term.educator_master_id,
+            educator_display_text=self.term.educator_display_text,
+            educator_long_display_text=self.term.educator_long_display_text,
+            previous_week_monday=None,
+            next_week_monday=None,
+            week_display_text=None,
+            week_monday=None,
+            educator_events_days=[
+                EdEEventsDay(
+                    day=day,
+                    day_string=f'{WEEKDAYS[day.weekday()].lower()}, '
+                               f'{_date_string(day)}',
+                    day_study_events=sorted(by_day[day],
+                                            key=lambda e: e.start)
+                )
+                for day in sorted(by_day)
+            ]
+        )
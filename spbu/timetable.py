@@ -0,0 +1,321 @@
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from datetime import date, timedelta
+from typing import Callable, Dict, Hashable, List, Optional, TypeVar, Union
+
+from .bulk import (default_max_workers, get_educator_events_chunked,
+                   get_group_events_chunked)
+from .cache import TTLCache
+from .consts import ChunkSizes, LessonsTypes
+from .educators import get_educator_term_events
+from .groups import get_group_events
+from .terms import EducatorTerm
+from .types import EducatorEvents, EducatorEventsTerm, GroupEvents
+
+EVENTS = TypeVar('EVENTS', GroupEvents, EducatorEvents)
+
+# `study_events_timetable_kind_code` of the events of each lessons type.
+# The API does not document the codes; this mapping is a guess from the
+# classroom timetables, not verified against the server, which also
+# reports 0 in the sample group week.
+LESSONS_TYPES_BY_KIND_CODE = {
+    1: LessonsTypes.PRIMARY,
+    2: LessonsTypes.ATTESTATION,
+    3: LessonsTypes.FINAL,
+}
+SPLIT_LESSONS_TYPES = (LessonsTypes.ALL,) + tuple(
+    LESSONS_TYPES_BY_KIND_CODE.values()
+)
+
+
+def _days_field(events: Union[GroupEvents, EducatorEvents]) -> str:
+    return 'days' if isinstance(events, GroupEvents) \
+        else 'educator_events_days'
+
+
+def _entity(key: Hashable) -> Hashable:
+    # ('group_week', 19082, monday) -> ('group', 19082)
+    return key[0].partition('_')[0], key[1]
+
+
+def week_monday(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+def split_lessons_types(events: EVENTS
+                        ) -> Optional[Dict[LessonsTypes, EVENTS]]:
+    """
+    Splits a timetable fetched with `LessonsTypes.ALL` into the timetables
+    of each lessons type by `study_events_timetable_kind_code`, leaving out
+    the days without events of that type. Returns None if some event has a
+    kind code of no known lessons type, as the split would then lose it.
+    """
+    days_field = _days_field(events)
+    days = getattr(events, days_field)
+    if any(event.study_events_timetable_kind_code
+           not in LESSONS_TYPES_BY_KIND_CODE
+           for day in days for event in day.day_study_events):
+        return None
+    views = {LessonsTypes.ALL: events}
+    for kind_code, lessons_type in LESSONS_TYPES_BY_KIND_CODE.items():
+        type_days = []
+        for day in days:
+            day_events = [
+                event for event in day.day_study_events
+                if event.study_events_timetable_kind_code == kind_code
+            ]
+            if day_events:
+                type_days.append(replace(day, day_study_events=day_events))
+        views[lessons_type] = replace(events, **{days_field: type_days})
+    return views
+
+
+class Timetable:
+    """
+    Cached access to group and educator timetables.
+
+    With `split_lessons_types` set, a request for any of the
+    `SPLIT_LESSONS_TYPES` fetches the timetable with `LessonsTypes.ALL`
+    once and fills the cache entries of every lessons type from it, so
+    switching between the types of the same week costs no more requests.
+    Once a group's or educator's timetable turns out to have events of no
+    known lessons type, such as kind code 0, the other lessons types of
+    that group or educator are requested as they are, without fetching
+    `LessonsTypes.ALL` first. The kind codes of `LESSONS_TYPES_BY_KIND_CODE`
+    are unverified, so splitting is best effort.
+
+    Educator ranges within a term fetched by `get_educator_term_events`
+    are answered from the cached term without requests.
+
+    Group timetables are cached by week, under the key of the week's
+    Monday, as the server returns the whole week for any date of it. With
+    `split_group_ranges` set, a request with `to_date` is served from the
+    weeks it spans, the missing ones fetched concurrently by up to
+    `max_workers` threads; otherwise such ranges are requested and cached
+    as they are. A request without dates is answered from the cached week
+    of today's Monday when there is one, such as a week a `Warmer`
+    prefetched.
+
+    Other ranges longer than a `chunk` are fetched as concurrent requests
+    of a chunk each, merged into one timetable.
+
+    The requests of every group and educator are counted in
+    `group_accesses` and `educator_accesses`, which a `Warmer` uses to tell
+    the timetables worth prefetching.
+    """
+    def __init__(self, cache: TTLCache = None,
+                 split_lessons_types: bool = True,
+                 split_group_ranges: bool = True,
+                 chunk: ChunkSizes = ChunkSizes.MONTH,
+                 max_workers: int = default_max_workers):
+        self.cache = cache if cache is not None else TTLCache()
+        self.split_lessons_types = split_lessons_types
+        self.split_group_ranges = split_group_ranges
+        self.chunk = chunk
+        self.max_workers = max_workers
+        # whether the kind codes of a group's or educator's events tell the
+        # lessons types apart, once a timetable fetched with
+        # `LessonsTypes.ALL` shows it
+        self._kind_codes_known: Dict[Hashable, bool] = {}
+        self.group_accesses = Counter()
+        self.educator_accesses = Counter()
+        self._accesses_lock = threading.Lock()
+
+    def _count_access(self, accesses: Counter, entity_id: int) -> None:
+        with self._accesses_lock:
+            accesses[entity_id] += 1
+
+    def most_accessed(self, accesses: Counter, n: int) -> List[int]:
+        with self._accesses_lock:
+            return [entity_id for entity_id, _ in accesses.most_common(n)]
+
+    def decay_accesses(self, factor: float = 0.5) -> None:
+        """
+        Scales every access count down by `factor`, dropping the ones that
+        fall below one, so the counts favour recent requests.
+        """
+        with self._accesses_lock:
+            for accesses in (self.group_accesses, self.educator_accesses):
+                for entity_id, count in list(accesses.items()):
+                    count = int(count * factor)
+                    if count:
+                        accesses[entity_id] = count
+                    else:
+                        del accesses[entity_id]
+
+    def _put(self, key: Hashable, views: Dict[LessonsTypes, EVENTS],
+             canonical_key: Callable[[EVENTS], Hashable] = None,
+             ttl: Optional[float] = None) -> None:
+        keys = [key]
+        if canonical_key is not None:
+            keys.append(canonical_key(next(iter(views.values()))))
+        for view_key in keys:
+            if view_key is None:
+                continue
+            for view_type, view in views.items():
+                self.cache.put((view_key, view_type), view, ttl)
+
+    def _get(self, key: Hashable, lessons_type: LessonsTypes,
+             fetch: Callable[[LessonsTypes], EVENTS],
+             canonical_key: Callable[[EVENTS], Hashable] = None,
+             ttl: Optional[float] = None) -> EVENTS:
+        """
+        The cached timetable of `key`, fetched on a miss. `canonical_key`
+        gives another key to cache the fetched timetable under. With `ttl`
+        set, a cached timetable is kept for `ttl` seconds from now.
+        """
+        cached = self.cache.get((key, lessons_type))
+        if cached is not None:
+            if ttl is not None:
+                self.cache.put((key, lessons_type), cached, ttl)
+            return cached
+        if self.split_lessons_types and lessons_type in SPLIT_LESSONS_TYPES \
+                and (lessons_type is LessonsTypes.ALL
+                     or self._kind_codes_known.get(_entity(key), True)):
+            events = fetch(LessonsTypes.ALL)
+            views = split_lessons_types(events)
+            self._kind_codes_known[_entity(key)] = views is not None
+            if views is None:
+                views = {LessonsTypes.ALL: events}
+            self._put(key, views, canonical_key, ttl)
+            if lessons_type in views:
+                return views[lessons_type]
+        events = fetch(lessons_type)
+        self._put(key, {lessons_type: events}, canonical_key, ttl)
+        return events
+
+    def _get_group_week(self, group_id: int, monday: date,
+                        lessons_type: LessonsTypes,
+                        ttl: Optional[float] = None) -> GroupEvents:
+        return self._get(
+            ('group_week', group_id, monday), lessons_type,
+            lambda fetched_type: get_group_events(group_id, monday,
+                                                  lessons_type=fetched_type),
+            ttl=ttl
+        )
+
+    def prefetch_group_week(self, group_id: int, monday: date,
+                            lessons_type: LessonsTypes = LessonsTypes.UNKNOWN,
+                            ttl: Optional[float] = None) -> GroupEvents:
+        """
+        Caches the group's week starting on `monday` for `ttl` seconds
+        without counting it as an access.
+        """
+        return self._get_group_week(group_id, monday, lessons_type, ttl)
+
+    def _get_group_weeks(self, group_id: int, mondays: List[date],
+                         lessons_type: LessonsTypes) -> List[GroupEvents]:
+        missing = [
+            monday for monday in mondays
+            if self.cache.get((('group_week', group_id, monday),
+                               lessons_type)) is None
+        ]
+        if len(missing) > 1:
+            with ThreadPoolExecutor(min(self.max_workers,
+                                        len(missing))) as pool:
+                list(pool.map(
+                    lambda monday: self._get_group_week(group_id, monday,
+                                                        lessons_type),
+                    missing
+                ))
+        return [
+            self._get_group_week(group_id, monday, lessons_type)
+            for monday in mondays
+        ]
+
+    def get_group_events(self, group_id: int, from_date: date = None,
+                         to_date: date = None,
+                         lessons_type: LessonsTypes = LessonsTypes.UNKNOWN
+                         ) -> GroupEvents:
+        self._count_access(self.group_accesses, group_id)
+        if from_date is None:
+            if to_date is None:
+                # the current week as a `Warmer` prefetched it on the eve
+                cached = self.cache.get((
+                    ('group_week', group_id, week_monday(date.today())),
+                    lessons_type
+                ))
+                if cached is not None:
+                    return cached
+            # the current week, whose Monday is only known from the response
+            return self._get(
+                ('group_events', group_id, None, to_date), lessons_type,
+                lambda fetched_type: get_group_events(group_id, None,
+                                                      to_date, fetched_type),
+                lambda events: ('group_week', group_id, events.week_monday)
+                if to_date is None and events.week_monday else None
+            )
+        if to_date is None:
+            return self._get_group_week(group_id, week_monday(from_date),
+                                        lessons_type)
+        if not self.split_group_ranges:
+            return self._get(
+                ('group_events', group_id, from_date, to_date), lessons_type,
+                lambda fetched_type: get_group_events_chunked(
+                    group_id, from_date, to_date, fetched_type, self.chunk,
+                    self.max_workers
+                )
+            )
+
+        mondays = [week_monday(from_date)]
+        while mondays[-1] + timedelta(weeks=1) <= to_date:
+            mondays.append(mondays[-1] + timedelta(weeks=1))
+        weeks = self._get_group_weeks(group_id, mondays, lessons_type)
+        return replace(weeks[0], days=[
+            day for week in weeks for day in week.days
+            if from_date <= day.day <= to_date
+        ])
+
+    def prefetch_educator_term(self, educator_id: int,
+                               next_term: bool = False,
+                               ttl: Optional[float] = None
+                               ) -> EducatorEventsTerm:
+        """
+        Caches the educator's term for `ttl` seconds without counting it as
+        an access. A cached term is kept for `ttl` seconds from now.
+        """
+        key = ('educator_term', educator_id, next_term)
+        term = self.cache.get(key)
+        if term is None:
+            term = EducatorTerm(get_educator_term_events(educator_id,
+                                                         next_term))
+            self.cache.put(key, term, ttl)
+        elif ttl is not None:
+            self.cache.put(key, term, ttl)
+        return term.term
+
+    def get_educator_term_events(self, educator_id: int,
+                                 next_term: bool = False
+                                 ) -> EducatorEventsTerm:
+        self._count_access(self.educator_accesses, educator_id)
+        return self.prefetch_educator_term(educator_id, next_term)
+
+    def _educator_term(self, educator_id: int, _from: date, _to: date
+                       ) -> Optional[EducatorTerm]:
+        for next_term in (False, True):
+            term = self.cache.get(('educator_term', educator_id, next_term))
+            if term is not None and term.covers(_from, _to):
+                return term
+        return None
+
+    def get_educator_events(self, educator_id: int, _from: date, _to: date,
+                            lessons_type: LessonsTypes = LessonsTypes.UNKNOWN
+                            ) -> EducatorEvents:
+        self._count_access(self.educator_accesses, educator_id)
+        term = self._educator_term(educator_id, _from, _to)
+        if term is not None:
+            events = term.get_events(_from, _to)
+            if lessons_type in (LessonsTypes.UNKNOWN, LessonsTypes.ALL):
+                return events
+            views = split_lessons_types(events)
+            if views is not None and lessons_type in views:
+                return views[lessons_type]
+        return self._get(
+            ('educator_events', educator_id, _from, _to), lessons_type,
+            lambda fetched_type: get_educator_events_chunked(
+                educator_id, _from, _to, fetched_type, self.chunk,
+                self.max_workers
+            )
+        )
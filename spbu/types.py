@@ -4,8 +4,6 @@ from dataclasses import dataclass, field
 from datetime import datetime, date, time
 from typing import TypeVar, Optional, List
 
-from requests import models
-
 from spbu.consts import error_msg
 
 JSON_TYPE = TypeVar('JSON_TYPE', dict, str)
@@ -1132,7 +1130,7 @@ class ApiException(Exception):
         :param function_name: The name of function which raise the exception
         :type function_name: str
         :param result: request response
-        :type result: models.Response
+        :type result: requests.models.Response
         """
         super(ApiException, self).__init__(error_msg.format(msg))
         self.function_name = function_name
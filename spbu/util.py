@@ -1,22 +1,61 @@
+import hashlib
+import json
 import os
-from typing import Union
-
-from requests import get, Response
+import threading
+import time
+from collections import OrderedDict
+from typing import (TYPE_CHECKING, Any, Hashable, List, Optional, Type,
+                    TypeVar, Union)
 
 from spbu.consts import APIMethods, BASE_URL
-from spbu.types import ApiException
+from spbu.types import ApiException, _JsonDeserializable
+
+if TYPE_CHECKING:
+    from requests import Response
+
+    from spbu.cache import ResponseCache
 
+PARSED = TypeVar('PARSED', bound=_JsonDeserializable)
 
 default_timeout = int(os.getenv('SPBU_TT_API_REQUEST_TIMEOUT', '5'))
+default_memo_size = int(os.getenv('SPBU_TT_API_PARSE_MEMO_SIZE', '256'))
+
+# when set, every request goes through this cache
+response_cache: Optional['ResponseCache'] = None
 
 
 def _make_request(url: str, params: dict = None,
-                  timeout: int = default_timeout) -> Response:
+                  timeout: int = default_timeout) -> 'Response':
+    # imported on the first request, `requests` takes long to import
+    from requests import get
     return get(url, params, timeout=timeout)
 
 
-def call_api(method: APIMethods, path_values: dict = None,
-             params: dict = None) -> Union[dict, list]:
+def _request_key(method: APIMethods, path_values: dict = None,
+                 params: dict = None) -> tuple:
+    return (
+        method,
+        tuple(sorted((path_values or {}).items())),
+        tuple(sorted((params or {}).items()))
+    )
+
+
+def call_api_raw(method: APIMethods, path_values: dict = None,
+                 params: dict = None) -> bytes:
+    """
+    Same as `call_api`, but returns the undecoded response body, so decoding
+    can be deferred or moved to another process.
+    """
+    if response_cache is not None:
+        return response_cache.get(
+            _request_key(method, path_values, params),
+            lambda: _fetch_raw(method, path_values, params)
+        )
+    return _fetch_raw(method, path_values, params)
+
+
+def _fetch_raw(method: APIMethods, path_values: dict = None,
+               params: dict = None) -> bytes:
     res = _make_request(
         BASE_URL + method.value.format(**(path_values or {})), params
     )
@@ -25,4 +64,135 @@ def call_api(method: APIMethods, path_values: dict = None,
             f'Response body:\n[{res.text}]'
         raise ApiException(msg, method.name, res)
 
-    return res.json()
+    return res.content
+
+
+class JsonDict(dict):
+    """
+    Decoded response body, with the `digest` of the body it was decoded
+    from.
+    """
+    digest: bytes = b''
+
+
+class JsonList(list):
+    digest: bytes = b''
+
+
+class _Memo:
+    """
+    Thread-safe mapping of up to `size` least recently used entries.
+    """
+    def __init__(self, size: int):
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# decoded bodies by digest, and parsed bodies by type and digest; both are
+# handed out to every caller as they are, so they must not be modified
+_decoded = _Memo(default_memo_size)
+_parsed = _Memo(default_memo_size)
+
+
+def decode(content: bytes) -> Union[dict, list]:
+    """
+    Decodes a response body. Bodies are hashed, and one identical to a
+    recently decoded body gets the same, shared, object back without being
+    decoded again, so the result must be treated as read-only.
+    """
+    digest = hashlib.blake2b(content, digest_size=16).digest()
+    decoded = _decoded.get(digest)
+    if decoded is not None:
+        return decoded
+    decoded = json.loads(content)
+    if isinstance(decoded, dict):
+        decoded = JsonDict(decoded)
+    elif isinstance(decoded, list):
+        decoded = JsonList(decoded)
+    else:
+        return decoded
+    decoded.digest = digest
+    _decoded.put(digest, decoded)
+    return decoded
+
+
+def parse(cls: Type[PARSED], data: Union[dict, list]) -> PARSED:
+    """
+    `cls.de_json(data)`, memoized by the digest of the body `data` was
+    decoded from: a body parsed before into `cls` gets the same object
+    back, which callers share and must treat as read-only.
+    """
+    digest = getattr(data, 'digest', None)
+    if not digest:
+        return cls.de_json(data)
+    parsed = _parsed.get((cls, digest))
+    if parsed is None:
+        parsed = cls.de_json(data)
+        _parsed.put((cls, digest), parsed)
+    return parsed
+
+
+def parse_list(cls: Type[PARSED], data: Union[dict, list],
+               field: str = None) -> List[PARSED]:
+    """
+    `parse` for bodies holding a list of `cls`, or holding it in `field`.
+    The list is new for every call, its items are shared.
+    """
+    digest = getattr(data, 'digest', None)
+    items = data if field is None else data[field]
+    if not digest:
+        return [cls.de_json(item) for item in items]
+    parsed = _parsed.get((list, cls, field, digest))
+    if parsed is None:
+        parsed = [cls.de_json(item) for item in items]
+        _parsed.put((list, cls, field, digest), parsed)
+    return list(parsed)
+
+
+def call_api(method: APIMethods, path_values: dict = None,
+             params: dict = None) -> Union[dict, list]:
+    return decode(call_api_raw(method, path_values, params))
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket: lets through at most `rate` calls per second on
+    average and up to `burst` calls at once.
+    """
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0
+        if delay:
+            time.sleep(delay)
@@ -0,0 +1,132 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time, timedelta
+from typing import Callable, List, Optional
+
+from .bulk import default_max_workers
+from .consts import LessonsTypes
+from .timetable import Timetable, week_monday
+from .util import RateLimiter
+
+default_warming_rate = float(os.getenv('SPBU_TT_API_WARMING_RATE', '5'))
+default_warming_lead = int(os.getenv('SPBU_TT_API_WARMING_LEAD', '7200'))
+
+
+def next_boundary(now: datetime) -> datetime:
+    """
+    The start of the Monday after `now`.
+    """
+    return datetime.combine(week_monday(now.date()) + timedelta(weeks=1),
+                            time())
+
+
+class Warmer:
+    """
+    Prefetches the timetables of the most requested groups and educators
+    of a `Timetable` before the week boundary, so the requests for the new
+    week are served from the cache.
+
+    A `warm` round takes the `top` groups and educators by access count
+    and caches the next week of every group and the term of every
+    educator, with the next term too if the next week is past the current
+    one. Prefetched entries live until the boundary and a cache TTL after
+    it. Requests are spread by a `rate` per second limit and run on up to
+    `max_workers` threads; after a round the access counts are halved.
+
+    `start` runs a round `lead` seconds before every Monday in a daemon
+    thread.
+    """
+    def __init__(self, timetable: Timetable, top: int = 100,
+                 rate: float = default_warming_rate,
+                 lead: float = default_warming_lead,
+                 lessons_type: LessonsTypes = LessonsTypes.UNKNOWN,
+                 max_workers: int = default_max_workers):
+        self.timetable = timetable
+        self.top = top
+        self.rate = rate
+        self.lead = lead
+        self.lessons_type = lessons_type
+        self.max_workers = max_workers
+        self.failures = 0
+        self._warmed_for: Optional[datetime] = None
+        self._stop_warming = threading.Event()
+        self._warmer: Optional[threading.Thread] = None
+
+    def warm(self, now: datetime = None) -> int:
+        """
+        Runs one round for the boundary after `now` and returns the number
+        of timetables prefetched.
+        """
+        now = now or datetime.now()
+        boundary = next_boundary(now)
+        ttl = (boundary - now).total_seconds() + self.timetable.cache.ttl
+        limiter = RateLimiter(self.rate)
+        timetable = self.timetable
+
+        def group_week(group_id: int) -> int:
+            limiter.acquire()
+            timetable.prefetch_group_week(group_id, boundary.date(),
+                                          self.lessons_type, ttl)
+            return 1
+
+        def educator_terms(educator_id: int) -> int:
+            limiter.acquire()
+            term = timetable.prefetch_educator_term(educator_id, ttl=ttl)
+            week_end = boundary.date() + timedelta(days=6)
+            if term.to_date is not None and term.to_date >= week_end:
+                return 1
+            limiter.acquire()
+            timetable.prefetch_educator_term(educator_id, True, ttl)
+            return 2
+
+        tasks: List[Callable[[], int]] = [
+            lambda group_id=group_id: group_week(group_id)
+            for group_id in timetable.most_accessed(
+                timetable.group_accesses, self.top
+            )
+        ] + [
+            lambda educator_id=educator_id: educator_terms(educator_id)
+            for educator_id in timetable.most_accessed(
+                timetable.educator_accesses, self.top
+            )
+        ]
+        prefetched = 0
+        with ThreadPoolExecutor(self.max_workers) as pool:
+            for future in [pool.submit(task) for task in tasks]:
+                try:
+                    prefetched += future.result()
+                except Exception:
+                    # a round must not stop the warming thread
+                    self.failures += 1
+        timetable.decay_accesses()
+        self._warmed_for = boundary
+        return prefetched
+
+    def start(self) -> None:
+        self.stop()
+        self._stop_warming.clear()
+        self._warmer = threading.Thread(target=self._warm_forever,
+                                        daemon=True)
+        self._warmer.start()
+
+    def stop(self) -> None:
+        if self._warmer is not None:
+            self._stop_warming.set()
+            self._warmer.join()
+            self._warmer = None
+
+    def _warm_forever(self) -> None:
+        while not self._stop_warming.is_set():
+            now = datetime.now()
+            boundary = next_boundary(now)
+            warm_at = boundary - timedelta(seconds=self.lead)
+            if now >= warm_at and self._warmed_for != boundary:
+                self.warm(now)
+                continue
+            if now < warm_at:
+                pause = warm_at - now
+            else:
+                pause = boundary - now
+            if self._stop_warming.wait(max(pause.total_seconds(), 1)):
+                return
@@ -0,0 +1,12 @@
+import json
+
+
+def load_dataset(filename: str):
+    with open(f'datasets/{filename}.json', 'r') as f:
+        dataset = json.loads(f.read())
+    return dataset
+
+
+def load_raw_dataset(filename: str) -> bytes:
+    with open(f'datasets/{filename}.json', 'rb') as f:
+        return f.read()
@@ -0,0 +1,111 @@
+import unittest
+from datetime import date
+from unittest.mock import patch
+
+import spbu
+
+from helpers import load_dataset, load_raw_dataset
+
+
+class TestBulk(unittest.TestCase):
+    @patch('spbu.util.call_api_raw',
+           return_value=load_raw_dataset('groups_events'))
+    def test_many_group_events(self, call_api_raw):
+        expected = spbu.types.GroupEvents.de_json(call_api_raw().decode())
+        group_ids = range(40)
+
+        in_thread = spbu.get_many_group_events(group_ids)
+        in_processes = spbu.get_many_group_events(group_ids,
+                                                  parse_processes=2)
+
+        self.assertEqual(set(in_thread), set(group_ids))
+        self.assertEqual(in_thread, in_processes)
+        for group_events in in_processes.values():
+            self.assertEqual(group_events, expected)
+
+    @patch('spbu.util.call_api_raw',
+           return_value=load_raw_dataset('educator_events_term'))
+    def test_many_educator_term_events(self, call_api_raw):
+        expected = spbu.types.EducatorEventsTerm.de_json(
+            call_api_raw().decode()
+        )
+        events = spbu.get_many_educator_term_events((1, 2, 3),
+                                                    parse_processes=1)
+        self.assertEqual(events, {1: expected, 2: expected, 3: expected})
+
+    def test_return_exceptions(self):
+        requests = {
+            group_id: spbu.bulk._group_events_request(group_id)
+            for group_id in (1, 2)
+        }
+        bodies = {1: b'{"StudentGroupId": 1}', 2: b'{broken'}
+        with patch('spbu.util.call_api_raw',
+                   side_effect=lambda method, path_values, params:
+                   bodies[path_values['id']]):
+            for parse_processes in (None, 1):
+                results = dict(spbu.bulk.iter_fetched(
+                    spbu.types.GroupEvents, requests,
+                    parse_processes=parse_processes,
+                    return_exceptions=True
+                ))
+                self.assertEqual(results[1].student_group_id, 1)
+                self.assertIsInstance(results[2], ValueError)
+
+                with self.assertRaises(ValueError):
+                    dict(spbu.bulk.iter_fetched(
+                        spbu.types.GroupEvents, requests,
+                        parse_processes=parse_processes
+                    ))
+
+
+class TestChunks(unittest.TestCase):
+    def test_split_range(self):
+        self.assertEqual(
+            spbu.bulk.split_range(date(2019, 4, 3), date(2019, 4, 16)),
+            [(date(2019, 4, 3), date(2019, 4, 7)),
+             (date(2019, 4, 8), date(2019, 4, 14)),
+             (date(2019, 4, 15), date(2019, 4, 16))]
+        )
+        self.assertEqual(
+            spbu.bulk.split_range(date(2018, 12, 20), date(2019, 2, 10),
+                                  spbu.consts.ChunkSizes.MONTH),
+            [(date(2018, 12, 20), date(2018, 12, 31)),
+             (date(2019, 1, 1), date(2019, 1, 31)),
+             (date(2019, 2, 1), date(2019, 2, 10))]
+        )
+        self.assertEqual(
+            spbu.bulk.split_range(date(2019, 4, 3), date(2019, 4, 2)), []
+        )
+        self.assertEqual(
+            spbu.bulk.split_range(date(2019, 4, 5), date(2019, 4, 11)),
+            [(date(2019, 4, 5), date(2019, 4, 11))]
+        )
+        self.assertEqual(
+            spbu.bulk.split_range(date(2019, 5, 29), date(2019, 6, 13),
+                                  spbu.consts.ChunkSizes.MONTH),
+            [(date(2019, 5, 29), date(2019, 6, 13))]
+        )
+
+    def test_educator_events_chunked(self):
+        dataset = load_dataset('educator_events')
+        calls = []
+
+        def call_api(method, path_values=None, params=None):
+            calls.append((path_values['from'], path_values['to']))
+            return dataset
+
+        with patch('spbu.util.call_api', side_effect=call_api):
+            events = spbu.bulk.get_educator_events_chunked(
+                1420, date(2019, 3, 25), date(2019, 4, 14)
+            )
+        self.assertCountEqual(calls, [
+            (date(2019, 3, 25), date(2019, 3, 31)),
+            (date(2019, 4, 1), date(2019, 4, 7)),
+            (date(2019, 4, 8), date(2019, 4, 14)),
+        ])
+        self.assertEqual(events,
+                         spbu.types.EducatorEvents.de_json(dataset))
+
+
+if __name__ == '__main__':
+    unittest.main()
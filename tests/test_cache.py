@@ -0,0 +1,240 @@
+import threading
+import traceback
+import unittest
+from unittest.mock import Mock, patch
+
+from spbu import util
+from spbu.cache import BoundedCache, ResponseCache, TTLCache
+from spbu.consts import APIMethods
+from spbu.types import ApiException
+
+
+class TestTTLCache(unittest.TestCase):
+    def test_expiry(self):
+        cache = TTLCache(ttl=10)
+        with patch('time.time', return_value=100):
+            cache.put('a', 1)
+            cache.put('b', 2, ttl=100)
+            self.assertEqual(cache.get('a'), 1)
+            self.assertIn('a', cache)
+        with patch('time.time', return_value=110):
+            self.assertIsNone(cache.get('a'))
+            self.assertNotIn('a', cache)
+            self.assertEqual(cache.get('b'), 2)
+        self.assertEqual(cache.pop('b'), 2)
+        self.assertEqual(len(cache), 0)
+
+    def test_max_entries(self):
+        cache = TTLCache(max_entries=2)
+        for key in 'abc':
+            cache.put(key, key)
+        self.assertNotIn('a', cache)
+        cache.put('b', 'b')
+        cache.put('d', 'd')
+        self.assertNotIn('c', cache)
+        self.assertEqual(len(cache), 2)
+
+
+class TestBoundedCache(unittest.TestCase):
+    def test_frequent_entries_stay(self):
+        cache = BoundedCache(max_bytes=300, compress=False,
+                             parsed_size_factor=1, window_fraction=0)
+        value = 'x' * 80
+        cache.put('a', value)
+        cache.put('b', value)
+        cache.put('c', value)
+        for _ in range(2):
+            self.assertEqual(cache.get('a'), value)
+        cache.get('c')
+        # not used more than b, so not admitted
+        cache.put('d', value)
+        self.assertEqual(cache.stats.rejections, 1)
+        self.assertIsNone(cache.get('d'))
+        cache.put('d', value)
+        self.assertEqual(cache.stats.evictions, 1)
+        self.assertIsNone(cache.get('b'))
+        for key in 'acd':
+            self.assertEqual(cache.get(key), value)
+        self.assertLessEqual(cache.size, cache.max_bytes)
+
+        cache.put('huge', 'x' * 1000)
+        self.assertNotIn('huge', cache)
+        self.assertEqual(cache.stats.rejections, 2)
+        self.assertEqual(len(cache), 3)
+
+    def test_one_off_entries_pass_through_window(self):
+        cache = BoundedCache(max_bytes=400, compress=False,
+                             parsed_size_factor=1, window_fraction=0.25)
+        value = 'x' * 80
+        for key in 'abc':
+            cache.put(key, value)
+            cache.get(key)
+            cache.get(key)
+        for i in range(10):
+            cache.put(i, value)
+        for key in 'abc':
+            self.assertEqual(cache.get(key), value)
+        self.assertEqual(cache.get(9), value)
+        self.assertEqual(len(cache), 4)
+        self.assertEqual(cache.stats.rejections, 9)
+        self.assertEqual(cache.stats.evictions, 0)
+
+    def test_hot_entries_are_kept_unpacked(self):
+        cache = BoundedCache(hot_frequency=3)
+        value = {'days': [{'subject': 'История России'}] * 1000}
+        cache.put('a', value)
+        compressed = cache.size
+        first = cache.get('a')
+        self.assertIsNot(cache.get('a'), first)
+        self.assertGreater(cache.size, compressed)
+        self.assertIs(cache.get('a'), cache.get('a'))
+        self.assertEqual(cache.get('a'), value)
+        self.assertEqual(cache.pop('a'), value)
+        self.assertEqual(cache.size, 0)
+
+    def test_compression(self):
+        cache = BoundedCache()
+        value = {'days': [{'subject': 'История России'}] * 1000}
+        cache.put('a', value)
+        self.assertEqual(cache.get('a'), value)
+        self.assertLess(cache.size, 1000)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.stats.hits, 1)
+        self.assertEqual(cache.stats.misses, 1)
+        self.assertEqual(cache.stats.hit_rate, 0.5)
+        self.assertEqual(cache.pop('a'), value)
+        self.assertEqual(cache.size, 0)
+
+    def test_expiry(self):
+        cache = BoundedCache(ttl=10)
+        with patch('time.time', return_value=100):
+            cache.put('a', 1)
+        with patch('time.time', return_value=110):
+            self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats.expirations, 1)
+        self.assertEqual(len(cache), 0)
+
+
+def not_found():
+    raise ApiException('Not found', 'G_EVENTS', Mock(status_code=404))
+
+
+class TestResponseCache(unittest.TestCase):
+    def test_stale_while_revalidate(self):
+        cache = ResponseCache(ttl=10, stale_ttl=100)
+        fetch = Mock(side_effect=[b'1', b'2', b'3'])
+        with patch('time.time', return_value=100):
+            self.assertEqual(cache.get('a', fetch), b'1')
+        with patch('time.time', return_value=105):
+            self.assertEqual(cache.get('a', fetch), b'1')
+        self.assertEqual(fetch.call_count, 1)
+        with patch('time.time', return_value=120):
+            self.assertEqual(cache.get('a', fetch), b'1')
+            cache.join()
+            self.assertEqual(fetch.call_count, 2)
+            self.assertEqual(cache.get('a', fetch), b'2')
+        with patch('time.time', return_value=300):
+            self.assertEqual(cache.get('a', fetch), b'3')
+
+    def test_failed_refresh_keeps_stale(self):
+        cache = ResponseCache(ttl=10, stale_ttl=100)
+        fetch = Mock(side_effect=[b'1', ConnectionError(), b'2'])
+        with patch('time.time', return_value=100):
+            cache.get('a', fetch)
+        with patch('time.time', return_value=120):
+            self.assertEqual(cache.get('a', fetch), b'1')
+            cache.join()
+            self.assertEqual(cache.get('a', fetch), b'1')
+            cache.join()
+            self.assertEqual(cache.get('a', fetch), b'2')
+
+    def test_negative_caching(self):
+        cache = ResponseCache(ttl=10, stale_ttl=100, negative_ttl=5)
+        fetch = Mock(side_effect=not_found)
+        empty = Mock(return_value=b'[]')
+        with patch('time.time', return_value=100):
+            for _ in range(2):
+                self.assertRaises(ApiException, cache.get, 'a', fetch)
+                self.assertEqual(cache.get('b', empty), b'[]')
+            self.assertEqual(fetch.call_count, 1)
+            self.assertEqual(empty.call_count, 1)
+        with patch('time.time', return_value=105):
+            self.assertRaises(ApiException, cache.get, 'a', fetch)
+            cache.get('b', empty)
+        self.assertEqual(fetch.call_count, 2)
+        self.assertEqual(empty.call_count, 2)
+
+    def test_negative_caching_raises_fresh_tracebacks(self):
+        cache = ResponseCache(negative_ttl=5)
+        fetch = Mock(side_effect=not_found)
+        depths = []
+        for _ in range(3):
+            try:
+                cache.get('a', fetch)
+            except ApiException as e:
+                depths.append(len(traceback.extract_tb(e.__traceback__)))
+        self.assertEqual(len(set(depths)), 1)
+
+    def test_refreshes_share_bounded_threads(self):
+        cache = ResponseCache(ttl=10, stale_ttl=100, refresh_workers=2)
+        release = threading.Event()
+        lock = threading.Lock()
+        running = [0]
+        most = [0]
+
+        def fetch():
+            with lock:
+                running[0] += 1
+                most[0] = max(most[0], running[0])
+            release.wait(5)
+            with lock:
+                running[0] -= 1
+            return b'2'
+
+        with patch('time.time', return_value=100):
+            for key in range(5):
+                cache.get(key, Mock(return_value=b'1'))
+        with patch('time.time', return_value=120):
+            for key in range(5):
+                self.assertEqual(cache.get(key, fetch), b'1')
+            release.set()
+            cache.join()
+            self.assertEqual([cache.get(key, fetch) for key in range(5)],
+                             [b'2'] * 5)
+        self.assertEqual(most[0], 2)
+
+    def test_max_bytes(self):
+        cache = ResponseCache(max_bytes=10)
+        fetch = Mock(side_effect=[b'aaaaa', b'bbbbb', b'cccc', b'bbbbb'])
+        cache.get('a', fetch)
+        cache.get('b', fetch)
+        cache.get('a', fetch)
+        cache.get('c', fetch)
+        self.assertEqual(cache.size, 9)
+        self.assertEqual(cache.get('a', fetch), b'aaaaa')
+        self.assertEqual(fetch.call_count, 3)
+        self.assertEqual(cache.get('b', fetch), b'bbbbb')
+        self.assertEqual(fetch.call_count, 4)
+        self.assertLessEqual(cache.size, 10)
+
+    def test_errors_are_not_cached(self):
+        cache = ResponseCache()
+        fetch = Mock(side_effect=[ConnectionError(), b'1'])
+        self.assertRaises(ConnectionError, cache.get, 'a', fetch)
+        self.assertEqual(cache.get('a', fetch), b'1')
+
+    @patch('spbu.util._make_request')
+    def test_call_api(self, make_request):
+        make_request.return_value = Mock(status_code=200, content=b'[1]')
+        with patch('spbu.util.response_cache', ResponseCache()):
+            for _ in range(2):
+                self.assertEqual(
+                    util.call_api(APIMethods.G_EVENTS, {'id': 1},
+                                  {'timetable': 'All'}),
+                    [1]
+                )
+        self.assertEqual(make_request.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
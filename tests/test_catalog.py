@@ -0,0 +1,98 @@
+import json
+import unittest
+from unittest.mock import patch
+
+import spbu
+from spbu.catalog import Catalog
+from spbu.consts import APIMethods
+from spbu.snapshot import MemorySink, Snapshot
+
+from helpers import load_dataset
+
+
+class TestCatalog(unittest.TestCase):
+    responses = {
+        APIMethods.SD_DIVISIONS: load_dataset('study_divisions'),
+        APIMethods.SD_PROGRAMS: load_dataset('study_levels'),
+        APIMethods.P_GROUPS: load_dataset('groups'),
+    }
+    groups = responses[APIMethods.P_GROUPS]['Groups']
+    divisions = responses[APIMethods.SD_DIVISIONS]
+
+    def call_api(self, method, **kwargs):
+        return self.responses[method]
+
+    def check_catalog(self, catalog: Catalog):
+        group = catalog.group(self.groups[0]['StudentGroupId'])
+        self.assertEqual(group.student_group_name,
+                         self.groups[0]['StudentGroupName'])
+        self.assertEqual(
+            catalog.groups_by_name(
+                ' ' + self.groups[0]['StudentGroupName'].upper()
+            ),
+            [group]
+        )
+        self.assertIsNone(catalog.group(-1))
+        self.assertEqual(len(catalog.groups()), len(self.groups))
+
+        alias = self.divisions[0]['Alias']
+        self.assertEqual(catalog.division(alias).name,
+                         self.divisions[0]['Name'])
+        self.assertEqual(catalog.division_groups(alias), catalog.groups())
+        self.assertEqual(catalog.division_groups(self.divisions[1]['Alias']),
+                         [])
+
+        program = catalog.program(10035)
+        self.assertEqual(program.division.alias, alias)
+        self.assertEqual(program.admission_year.study_program_id, 10035)
+        self.assertEqual(catalog.program_of_group(group.student_group_id),
+                         program)
+
+    def test_lookups(self):
+        with patch('spbu.util.call_api',
+                   side_effect=self.call_api) as call_api:
+            catalog = Catalog().load()
+            calls = call_api.call_count
+            self.check_catalog(catalog)
+            self.assertEqual(call_api.call_count, calls)
+
+    def test_ttl(self):
+        loads = []
+
+        def loader():
+            loads.append(1)
+            return [], {}, {}
+
+        catalog = Catalog(ttl=3600, loader=loader)
+        catalog.division('AGSM')
+        catalog.division('AGSM')
+        self.assertEqual(len(loads), 1)
+        catalog.ttl = 0
+        catalog.division('AGSM')
+        self.assertEqual(len(loads), 2)
+
+    def test_failed_reload_keeps_previous_tree(self):
+        trees = [([], {}, {})]
+
+        def loader():
+            if not trees:
+                raise ConnectionError
+            return trees.pop()
+
+        catalog = Catalog(ttl=0, loader=loader).load()
+        self.assertIsNone(catalog.division('AGSM'))
+
+    def test_from_snapshot(self):
+        def call_api_raw(method, path_values=None, params=None):
+            return json.dumps(self.responses[method]).encode()
+
+        sink = MemorySink()
+        with patch('spbu.util.call_api_raw', side_effect=call_api_raw):
+            spbu.crawl(sink, weeks=0)
+        with patch('spbu.util.call_api') as call_api:
+            self.check_catalog(Catalog.from_snapshot(Snapshot(sink)))
+        call_api.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
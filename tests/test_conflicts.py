@@ -0,0 +1,147 @@
+import copy
+import unittest
+from datetime import datetime
+
+from spbu.conflicts import find_conflicts
+from spbu.consts import ResourceKinds
+from spbu.search import normalize_group_name
+from spbu.types import ClassroomEvents, EducatorEvents, GroupEvents
+
+from helpers import load_dataset
+
+
+class TestFindConflicts(unittest.TestCase):
+    group_events = load_dataset('groups_events')
+
+    def test_no_conflicts_in_one_timetable(self):
+        self.assertEqual(
+            list(find_conflicts([GroupEvents.de_json(self.group_events)])),
+            []
+        )
+
+    def test_same_events_are_not_conflicts(self):
+        # a lecture for two groups, seen from both group timetables
+        other = dict(self.group_events, StudentGroupId=1,
+                     StudentGroupDisplayName='Группа 18.М01-с')
+        self.assertEqual(
+            list(find_conflicts([GroupEvents.de_json(self.group_events),
+                                 GroupEvents.de_json(other)])),
+            []
+        )
+
+    def test_room_and_group_conflicts(self):
+        other = copy.deepcopy(self.group_events)
+        other['StudentGroupId'] = 1
+        other['StudentGroupDisplayName'] = 'Группа 18.М01-с'
+        event = other['Days'][1]['DayStudyEvents'][0]
+        event['Subject'] = 'Другая дисциплина'
+        event['Start'] = '2019-05-30T16:00:00'
+        event['End'] = '2019-05-30T17:30:00'
+        other['Days'][1]['DayStudyEvents'].append(copy.deepcopy(event))
+        other['Days'][1]['DayStudyEvents'][-1]['Subject'] = 'Третья'
+
+        conflicts = list(find_conflicts([GroupEvents.de_json(self.group_events),
+                                         GroupEvents.de_json(other)]))
+        rooms = [c for c in conflicts if c.kind == ResourceKinds.CLASSROOM]
+        groups = [c for c in conflicts if c.kind == ResourceKinds.GROUP]
+        # in both rooms the two new events clash with each other and with
+        # both events of group 19082
+        self.assertEqual(len(rooms), 2 * (1 + 2 * 2))
+        self.assertEqual(
+            {(c.start, c.end) for c in rooms},
+            {(datetime(2019, 5, 30, 16), datetime(2019, 5, 30, 16, 50)),
+             (datetime(2019, 5, 30, 17), datetime(2019, 5, 30, 17, 30)),
+             (datetime(2019, 5, 30, 16), datetime(2019, 5, 30, 17, 30))}
+        )
+        # group 18.М01-с now has three events at once
+        self.assertEqual(len(groups), 3)
+        self.assertEqual({c.resource for c in groups}, {'18м01с'})
+        for conflict in conflicts:
+            self.assertLess(conflict.start, conflict.end)
+            self.assertLessEqual(conflict.first.start, conflict.second.start)
+
+    def test_mixed_timetables(self):
+        # group 18.Б01-фл, with an event moved over one of its classes
+        # held in the classroom
+        group_events = copy.deepcopy(self.group_events)
+        group_events['StudentGroupId'] = 1
+        group_events['StudentGroupDisplayName'] = 'Группа 18.Б01-фл'
+        day = group_events['Days'][0]
+        day['Day'] = '2019-05-21T00:00:00'
+        day['DayStudyEvents'] = day['DayStudyEvents'][:1]
+        day['DayStudyEvents'][0]['Start'] = '2019-05-21T09:30:00'
+        day['DayStudyEvents'][0]['End'] = '2019-05-21T11:00:00'
+        group_events['Days'] = [day]
+        timetables = [
+            EducatorEvents.de_json(load_dataset('educator_events')),
+            ClassroomEvents.de_json(load_dataset('classroom_events')),
+            GroupEvents.de_json(group_events),
+        ]
+        conflicts = list(find_conflicts(timetables))
+        self.assertEqual(len(conflicts), 1)
+        conflict = conflicts[0]
+        self.assertEqual(conflict.kind, ResourceKinds.GROUP)
+        self.assertEqual(conflict.resource, normalize_group_name('18.Б01-фл'))
+        self.assertEqual(
+            (conflict.start, conflict.end),
+            (datetime(2019, 5, 21, 9, 30), datetime(2019, 5, 21, 10, 30))
+        )
+        self.assertEqual(
+            (conflict.first.subject, conflict.second.subject),
+            ('Введение в литературоведение, сам. работа в присутствии '
+             'преподавателя',
+             'Научно-исследовательская работа, зачёт (комиссия)')
+        )
+
+    def test_group_names_are_normalized(self):
+        educator_events = load_dataset('educator_events')
+        event = educator_events['EducatorEventsDays'][0]['DayStudyEvents'][0]
+        event['ContingentUnitName'] = '18.Б01-фл, 18.Б02-фл'
+        event['IsElective'] = False
+        group_events = copy.deepcopy(self.group_events)
+        group_events['StudentGroupDisplayName'] = 'Группа 18.Б02-фл'
+        group_events['Days'] = group_events['Days'][:1]
+        group_events['Days'][0]['Day'] = \
+            educator_events['EducatorEventsDays'][0]['Day']
+        group_events['Days'][0]['DayStudyEvents'] = [
+            dict(group_events['Days'][0]['DayStudyEvents'][0],
+                 Start=event['Start'], End=event['End'])
+        ]
+        conflicts = [
+            c for c in find_conflicts([EducatorEvents.de_json(educator_events),
+                                       GroupEvents.de_json(group_events)])
+            if c.kind == ResourceKinds.GROUP
+        ]
+        self.assertEqual([c.resource for c in conflicts], ['18б02фл'])
+
+    def test_course_names_are_not_groups(self):
+        # contingent unit names from educator_events_term, with commas
+        # inside their course descriptions
+        names = [
+            '034294 История русских революций (Основной курс, Основная '
+            'траектория) (год начала обучения - 2018)',
+            '053447 Спецкурс «Церковь и религиозные течения в России в ХХ '
+            'веке» (профиль Отечественная история, Основная траектория) '
+            '(год начала обучения - 2018)',
+        ]
+        educator_events = load_dataset('educator_events')
+        day = educator_events['EducatorEventsDays'][0]
+        first = day['DayStudyEvents'][0]
+        day['DayStudyEvents'] = [
+            dict(first, ContingentUnitName=name, IsElective=False,
+                 Subject=name)
+            for name in names
+        ]
+        conflicts = list(
+            find_conflicts([EducatorEvents.de_json(educator_events)])
+        )
+        self.assertTrue(conflicts)
+        self.assertNotIn(ResourceKinds.GROUP, [c.kind for c in conflicts])
+
+    def test_unsupported_timetable(self):
+        with self.assertRaises(TypeError):
+            list(find_conflicts([object()]))
+
+
+if __name__ == '__main__':
+    unittest.main()
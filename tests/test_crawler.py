@@ -0,0 +1,118 @@
+import os
+import tempfile
+import unittest
+from datetime import date
+from unittest.mock import patch
+
+from requests import ConnectionError
+
+import spbu
+from spbu.consts import APIMethods
+from spbu.snapshot import MemorySink, DirectorySink, SQLiteSink, Snapshot
+
+from helpers import load_dataset, load_raw_dataset
+
+
+class FakeApi:
+    responses = {
+        APIMethods.SD_DIVISIONS: load_raw_dataset('study_divisions'),
+        APIMethods.SD_PROGRAMS: load_raw_dataset('study_levels'),
+        APIMethods.P_GROUPS: load_raw_dataset('groups'),
+        APIMethods.G_EVENTS_FROM: load_raw_dataset('groups_events'),
+    }
+
+    def __init__(self, failing_group_ids=()):
+        self.failing_group_ids = set(failing_group_ids)
+        self.calls = []
+
+    def __call__(self, method, path_values=None, params=None):
+        self.calls.append((method, path_values))
+        if method == APIMethods.G_EVENTS_FROM \
+                and path_values['id'] in self.failing_group_ids:
+            raise ConnectionError('connection reset')
+        return self.responses[method]
+
+
+class TestCrawler(unittest.TestCase):
+    week_monday = date(2019, 5, 27)
+    group_ids = {
+        group['StudentGroupId']
+        for group in load_dataset('groups')['Groups']
+    }
+
+    def _crawl(self, sink, api, **kwargs):
+        with patch('spbu.util.call_api_raw', side_effect=api):
+            return spbu.crawl(sink, week_monday=date(2019, 5, 29), weeks=2,
+                              aliases=['LAWS'], retry_delay=0, **kwargs)
+
+    def _assertSnapshot(self, sink):
+        snapshot = Snapshot(sink)
+        self.assertEqual(snapshot.week_monday, self.week_monday)
+        weeks = dict(snapshot.iter_group_events())
+        self.assertEqual(
+            set(weeks),
+            {(group_id, monday)
+             for group_id in self.group_ids
+             for monday in (self.week_monday, date(2019, 6, 3))}
+        )
+        expected = spbu.types.GroupEvents.de_json(
+            load_raw_dataset('groups_events').decode()
+        )
+        for group_events in weeks.values():
+            self.assertEqual(group_events, expected)
+        self.assertEqual(dict(snapshot.iter_group_events(parse_processes=2)),
+                         weeks)
+
+    def test_crawl(self):
+        with tempfile.TemporaryDirectory() as path:
+            sinks = (
+                MemorySink(),
+                DirectorySink(os.path.join(path, 'snapshot')),
+                SQLiteSink(os.path.join(path, 'snapshot.db'))
+            )
+            for sink in sinks:
+                with sink:
+                    api = FakeApi()
+                    report = self._crawl(sink, api)
+                    self.assertTrue(report.is_complete)
+                    self.assertEqual(report.resumed, 0)
+                    self.assertEqual(report.fetched, len(api.calls))
+                    self.assertEqual(
+                        sum(method == APIMethods.G_EVENTS_FROM
+                            for method, _ in api.calls),
+                        2 * len(self.group_ids)
+                    )
+                    self._assertSnapshot(sink)
+
+    def test_resume(self):
+        sink = MemorySink()
+        failing_group_id = min(self.group_ids)
+        report = self._crawl(sink, FakeApi([failing_group_id]), retries=1)
+        self.assertEqual(
+            set(report.failures),
+            {f'group_events/{failing_group_id}/2019-05-27',
+             f'group_events/{failing_group_id}/2019-06-03'}
+        )
+
+        api = FakeApi()
+        with patch('spbu.util.call_api_raw', side_effect=api):
+            report = spbu.crawl(sink, retry_delay=0)
+        self.assertTrue(report.is_complete)
+        self.assertEqual(report.week_monday, self.week_monday)
+        self.assertEqual(
+            api.calls,
+            [(APIMethods.G_EVENTS_FROM,
+              {'id': failing_group_id, 'from': monday})
+             for monday in (self.week_monday, date(2019, 6, 3))]
+        )
+        self._assertSnapshot(sink)
+
+    def test_other_week(self):
+        sink = MemorySink()
+        self._crawl(sink, FakeApi())
+        with self.assertRaises(ValueError):
+            spbu.crawl(sink, week_monday=date(2019, 6, 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
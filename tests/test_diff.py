@@ -0,0 +1,93 @@
+import copy
+import json
+import unittest
+from datetime import date
+
+import spbu
+from spbu.consts import ChangeKinds
+from spbu.diff import diff_group_events, diff_snapshots
+from spbu.snapshot import MemorySink, Snapshot, group_events_key
+
+from helpers import load_dataset
+
+
+class TestDiff(unittest.TestCase):
+    dataset = load_dataset('groups_events')
+
+    def _changed_dataset(self) -> dict:
+        changed = copy.deepcopy(self.dataset)
+        tuesday, thursday, friday = changed['Days']
+        # moved from 13:00 to 15:00
+        tuesday['DayStudyEvents'][0]['Start'] = '2019-05-28T15:00:00'
+        tuesday['DayStudyEvents'][0]['End'] = '2019-05-28T16:30:00'
+        # cancelled
+        thursday['DayStudyEvents'][0]['IsCancelled'] = True
+        # removed
+        del thursday['DayStudyEvents'][1]
+        # moved to another room and taught by another educator
+        friday['DayStudyEvents'][0]['EventLocations'] = \
+            friday['DayStudyEvents'][-1]['EventLocations']
+        friday['DayStudyEvents'][0]['EducatorIds'] = [
+            {'Item1': 42, 'Item2': 'Иванов И. И., доцент'}
+        ]
+        # added
+        friday['DayStudyEvents'].append(dict(
+            friday['DayStudyEvents'][-1],
+            Subject='Дополнительное занятие'
+        ))
+        return changed
+
+    def test_diff_group_events(self):
+        old = spbu.types.GroupEvents.de_json(self.dataset)
+        new = spbu.types.GroupEvents.de_json(self._changed_dataset())
+
+        self.assertEqual(list(diff_group_events(old, old)), [])
+
+        changes = list(diff_group_events(old, new))
+        self.assertEqual(
+            sorted((change.kind.value, change.group_id) for change in changes),
+            sorted([
+                (ChangeKinds.MOVED.value, 19082),
+                (ChangeKinds.CANCELLED.value, 19082),
+                (ChangeKinds.REMOVED.value, 19082),
+                (ChangeKinds.ROOM_CHANGED.value, 19082),
+                (ChangeKinds.EDUCATOR_REASSIGNED.value, 19082),
+                (ChangeKinds.ADDED.value, 19082),
+            ])
+        )
+        by_kind = {change.kind: change for change in changes}
+        moved = by_kind[ChangeKinds.MOVED]
+        self.assertEqual(moved.old.start.hour, 13)
+        self.assertEqual(moved.new.start.hour, 15)
+        self.assertIsNone(by_kind[ChangeKinds.ADDED].old)
+        self.assertEqual(by_kind[ChangeKinds.ADDED].new.subject,
+                         'Дополнительное занятие')
+        self.assertIsNone(by_kind[ChangeKinds.REMOVED].new)
+        self.assertEqual(by_kind[ChangeKinds.REMOVED].old,
+                         old.days[1].day_study_events[1])
+
+    def test_diff_snapshots(self):
+        old, new = MemorySink(), MemorySink()
+        week = date(2019, 5, 27)
+        content = json.dumps(self.dataset).encode()
+        old.put(group_events_key(1, week), content)
+        new.put(group_events_key(1, week), content)
+        old.put(group_events_key(2, week), content)
+        new.put(group_events_key(2, week),
+                json.dumps(self._changed_dataset()).encode())
+        new.put(group_events_key(3, week), content)
+
+        changes = list(diff_snapshots(Snapshot(old), Snapshot(new)))
+        self.assertEqual(
+            {week_key for week_key, _ in changes},
+            {(2, week), (3, week)}
+        )
+        self.assertEqual(
+            sum(change.kind == ChangeKinds.ADDED
+                for week_key, change in changes if week_key == (3, week)),
+            sum(len(day['DayStudyEvents']) for day in self.dataset['Days'])
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+
+import spbu
+
+from helpers import load_dataset
+
+
+def shift_group_week(dataset: dict, week_monday: date) -> dict:
+    """
+    Moves the dataset week to `week_monday`, linking it to the next week.
+    """
+    dataset_monday = datetime.strptime(dataset['WeekMonday'],
+                                       '%Y-%m-%d').date()
+    shift = week_monday - dataset_monday
+    shifted = dict(dataset)
+    shifted['WeekMonday'] = str(week_monday)
+    shifted['PreviousWeekMonday'] = str(week_monday - timedelta(weeks=1))
+    shifted['NextWeekMonday'] = str(week_monday + timedelta(weeks=1))
+    shifted['Days'] = [
+        dict(day, Day=(
+            datetime.strptime(day['Day'], '%Y-%m-%dT%H:%M:%S') + shift
+        ).strftime('%Y-%m-%dT%H:%M:%S'))
+        for day in dataset['Days']
+    ]
+    return shifted
+
+
+class TestGroupWeeks(unittest.TestCase):
+    dataset = load_dataset('groups_events')
+
+    def _call_api(self, method, path_values, params):
+        return shift_group_week(self.dataset, path_values['from'])
+
+    def test_iter_group_weeks(self):
+        with patch('spbu.util.call_api',
+                   side_effect=self._call_api) as call_api:
+            days = list(spbu.iter_group_weeks(
+                19082, start=date(2019, 5, 29), end=date(2019, 6, 13)
+            ))
+
+        self.assertEqual(
+            [day.day for day in days],
+            [date(2019, 5, 30), date(2019, 5, 31),
+             date(2019, 6, 4), date(2019, 6, 6), date(2019, 6, 7),
+             date(2019, 6, 11), date(2019, 6, 13)]
+        )
+        self.assertEqual(
+            sorted(c[1]['path_values']['from']
+                   for c in call_api.call_args_list),
+            [date(2019, 5, 27), date(2019, 6, 3), date(2019, 6, 10)]
+        )
+
+    def test_iter_group_weeks_last_week(self):
+        def call_api(method, path_values, params):
+            week = self._call_api(method, path_values, params)
+            week['IsNextWeekReferenceAvailable'] = False
+            return week
+
+        with patch('spbu.util.call_api', side_effect=call_api):
+            days = list(spbu.iter_group_weeks(
+                19082, start=date(2019, 5, 27), end=date(2019, 6, 30),
+                prefetch=0
+            ))
+
+        self.assertEqual(len(days), len(self.dataset['Days']))
+        self.assertTrue(all(day.day < date(2019, 6, 3) for day in days))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import io
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+from spbu.ical import write_calendar, write_group_calendars
+from spbu.occurrences import iter_educator_term_occurrences
+from spbu.types import (ClassroomEvents, EducatorEvents, EducatorEventsTerm,
+                        ExtracurEvents, GroupEvents)
+
+from helpers import load_dataset, load_raw_dataset
+
+
+def render(timetable) -> bytes:
+    stream = io.BytesIO()
+    write_calendar(timetable, stream, dtstamp=datetime(2019, 5, 1))
+    return stream.getvalue()
+
+
+class TestWriteCalendar(unittest.TestCase):
+    timetables = {
+        'groups_events': GroupEvents,
+        'educator_events': EducatorEvents,
+        'educator_events_term': EducatorEventsTerm,
+        'classroom_events': ClassroomEvents,
+        'extracur_events': ExtracurEvents,
+    }
+
+    def test_write_calendar(self):
+        for filename, cls in self.timetables.items():
+            with self.subTest(filename):
+                content = render(cls.de_json(load_dataset(filename)))
+                self.assertTrue(content.startswith(b'BEGIN:VCALENDAR\r\n'))
+                self.assertTrue(content.endswith(b'END:VCALENDAR\r\n'))
+                lines = content.split(b'\r\n')[:-1]
+                for line in lines:
+                    self.assertLessEqual(len(line), 75)
+                    line.decode()
+                events = lines.count(b'BEGIN:VEVENT')
+                self.assertGreater(events, 0)
+                uids = [line for line in lines if line.startswith(b'UID:')]
+                self.assertEqual(len(set(uids)), events)
+
+    def test_stable_uids(self):
+        group_events = load_dataset('groups_events')
+        first = render(GroupEvents.de_json(group_events))
+        group_events['Days'][0]['DayStudyEvents'][0]['Subject'] = 'Другое'
+        second = render(GroupEvents.de_json(group_events))
+        first_uids = {line for line in first.split(b'\r\n')
+                      if line.startswith(b'UID:')}
+        second_uids = {line for line in second.split(b'\r\n')
+                       if line.startswith(b'UID:')}
+        self.assertEqual(len(first_uids - second_uids), 1)
+        self.assertEqual(render(GroupEvents.de_json(group_events)), second)
+
+    def test_moved_events_keep_uids(self):
+        group_events = load_dataset('groups_events')
+        first = render(GroupEvents.de_json(group_events))
+        event = group_events['Days'][0]['DayStudyEvents'][0]
+        event['Start'] = event['Start'].replace('T13:00', 'T15:00')
+        event['End'] = event['End'].replace('T14:30', 'T16:30')
+        for location in event['EventLocations']:
+            location['DisplayName'] = 'Другая аудитория'
+        second = render(GroupEvents.de_json(group_events))
+        self.assertNotEqual(first, second)
+        self.assertEqual(
+            {line for line in first.split(b'\r\n')
+             if line.startswith(b'UID:')},
+            {line for line in second.split(b'\r\n')
+             if line.startswith(b'UID:')}
+        )
+
+    def test_term_dates_are_expanded(self):
+        term = EducatorEventsTerm.de_json(load_dataset('educator_events_term'))
+        content = render(term)
+        self.assertEqual(
+            content.count(b'BEGIN:VEVENT'),
+            len(list(iter_educator_term_occurrences(term)))
+        )
+        self.assertGreater(
+            content.count(b'BEGIN:VEVENT'),
+            sum(len(day.day_study_events)
+                for day in term.educator_events_days)
+        )
+
+    def test_unsupported_timetable(self):
+        with self.assertRaises(TypeError):
+            write_calendar(object(), io.BytesIO())
+
+
+class TestWriteGroupCalendars(unittest.TestCase):
+    def test_write_group_calendars(self):
+        content = load_raw_dataset('groups_events')
+
+        def call_api_raw(method, path_values=None, params=None):
+            if path_values['id'] == 2:
+                raise ValueError('broken')
+            if path_values['id'] == 4:
+                return b'{"Days": null}'
+            return content
+
+        with tempfile.TemporaryDirectory() as directory, \
+                patch('spbu.util.call_api_raw', side_effect=call_api_raw):
+            failures = write_group_calendars([1, 2, 3, 4], directory)
+            self.assertEqual(sorted(failures), ['2', '4'])
+            self.assertEqual(sorted(os.listdir(directory)),
+                             ['1.ics', '3.ics'])
+            with open(os.path.join(directory, '1.ics'), 'rb') as f:
+                self.assertIn(b'BEGIN:VEVENT', f.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
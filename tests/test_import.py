@@ -0,0 +1,51 @@
+import os
+import subprocess
+import sys
+import unittest
+
+import spbu
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(spbu.__file__)))
+
+
+def run(code: str) -> str:
+    return subprocess.run(
+        [sys.executable, '-c', code],
+        env=dict(os.environ, PYTHONPATH=ROOT), stdout=subprocess.PIPE,
+        check=True, universal_newlines=True
+    ).stdout.strip()
+
+
+class TestLazyImport(unittest.TestCase):
+    def test_import_loads_no_submodules(self):
+        self.assertEqual(run(
+            'import sys, spbu; '
+            'print(sorted(m for m in sys.modules '
+            'if m.startswith("spbu.") or m == "requests"))'
+        ), '[]')
+
+    def test_function_loads_only_its_modules(self):
+        self.assertEqual(run(
+            'import sys, spbu; spbu.get_study_divisions; '
+            'print("spbu.studydivisions" in sys.modules, '
+            '"spbu.crawler" in sys.modules, "requests" in sys.modules)'
+        ), 'True False False')
+
+    def test_endpoint_does_not_load_thread_pools(self):
+        self.assertEqual(run(
+            'import sys, spbu; spbu.get_group_events; '
+            'print("concurrent.futures" in sys.modules)'
+        ), 'False')
+
+    def test_exports(self):
+        for name in spbu.__all__:
+            with self.subTest(name=name):
+                self.assertIsNotNone(getattr(spbu, name))
+        self.assertIs(spbu.get_group_events, spbu.groups.get_group_events)
+        self.assertIn('get_group_events', dir(spbu))
+        with self.assertRaises(AttributeError):
+            spbu.no_such_function
+
+
+if __name__ == '__main__':
+    unittest.main()
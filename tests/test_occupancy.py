@@ -0,0 +1,82 @@
+import unittest
+from datetime import datetime
+
+from spbu.classrooms import ClassroomSchedule
+from spbu.occupancy import ClassroomDirectory, derive_classroom_events
+from spbu.occurrences import iter_classroom_occurrences, iter_group_occurrences
+from spbu.types import (Address, Classroom, ClassroomEvents, EducatorEvents,
+                        GroupEvents)
+
+from helpers import load_dataset
+
+
+class TestDeriveClassroomEvents(unittest.TestCase):
+    group_events = load_dataset('groups_events')
+    address = Address(oid='a', display_name=' ул. Смольного, д. 1/3,корп. '
+                                            'подъезд 9',
+                      matches=None, wanting_equipment=None)
+    classroom = Classroom(oid='c143', display_name='143', seating_type=0,
+                          capacity=30, additional_info=None,
+                          wanting_equipment=None)
+    _from = datetime(2019, 5, 27)
+    _to = datetime(2019, 6, 3)
+
+    def derive(self, timetables):
+        directory = ClassroomDirectory([(self.address, self.classroom)])
+        return derive_classroom_events(timetables, directory, self._from,
+                                       self._to)
+
+    def test_derive(self):
+        group_events = GroupEvents.de_json(self.group_events)
+        other = dict(self.group_events, StudentGroupId=1,
+                     StudentGroupDisplayName='Группа 2')
+        rooms = self.derive([group_events, GroupEvents.de_json(other)])
+
+        classroom_events = rooms['c143']
+        self.assertIsInstance(classroom_events, ClassroomEvents)
+        self.assertEqual(classroom_events.oid, 'c143')
+        self.assertEqual(classroom_events.from_datetime, self._from)
+        self.assertEqual(
+            [(o.start, o.end, o.subject)
+             for o in iter_classroom_occurrences(classroom_events)],
+            [(o.start, o.end, o.subject)
+             for o in iter_group_occurrences(group_events)
+             if any(location.endswith(' 143') for location in o.locations)]
+        )
+        for day in classroom_events.classroom_events_days:
+            self.assertEqual(day.day_string, 'Четверг')
+            for event in day.day_study_events:
+                self.assertEqual(
+                    [unit.groups for unit in event.contingent_unit_names],
+                    [self.group_events['StudentGroupDisplayName'],
+                     'Группа 2']
+                )
+
+        unmatched = rooms['ул. Смольного, д. 1/3, корп. подъезд 9, 242']
+        self.assertIsNone(unmatched.oid)
+        self.assertEqual(unmatched.display_text,
+                         'ул. Смольного, д. 1/3, корп. подъезд 9, 242')
+
+        schedule = ClassroomSchedule('c143')
+        schedule.add(classroom_events)
+        self.assertTrue(schedule.is_busy(datetime(2019, 5, 30, 16),
+                                         datetime(2019, 5, 30, 16, 30)).is_busy)
+        self.assertFalse(schedule.is_busy(datetime(2019, 5, 30, 12),
+                                          datetime(2019, 5, 30, 13)).is_busy)
+
+    def test_range(self):
+        rooms = self.derive([GroupEvents.de_json(self.group_events),
+                             EducatorEvents.de_json(
+                                 load_dataset('educator_events'))])
+        for classroom_events in rooms.values():
+            for occurrence in iter_classroom_occurrences(classroom_events):
+                self.assertGreaterEqual(occurrence.start, self._from)
+                self.assertLessEqual(occurrence.end, self._to)
+
+    def test_unsupported_timetable(self):
+        with self.assertRaises(TypeError):
+            self.derive([object()])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import unittest
+from datetime import date, datetime
+from unittest.mock import patch
+
+from spbu.occurrences import (iter_classroom_occurrences,
+                              iter_educator_occurrences)
+from spbu.ranges import (ClassroomRangeCache, EducatorRangeCache,
+                         RangeCache, missing_runs)
+from spbu.types import ClassroomEvents, EducatorEvents
+
+from helpers import load_dataset
+
+
+class TestMissingRuns(unittest.TestCase):
+    def test_missing_runs(self):
+        covered = {date(2019, 4, 2), date(2019, 4, 3), date(2019, 4, 6)}
+        self.assertEqual(
+            missing_runs(covered, date(2019, 4, 1), date(2019, 4, 8)),
+            [(date(2019, 4, 1), date(2019, 4, 1)),
+             (date(2019, 4, 4), date(2019, 4, 5)),
+             (date(2019, 4, 7), date(2019, 4, 8))]
+        )
+        self.assertEqual(
+            missing_runs(covered, date(2019, 4, 2), date(2019, 4, 3)), []
+        )
+
+
+class TestRangeCache(unittest.TestCase):
+    def call_api(self, dataset: str):
+        calls = []
+
+        def call_api(method, path_values=None, params=None):
+            calls.append((path_values['from'], path_values['to']))
+            return load_dataset(dataset)
+        return calls, call_api
+
+    def test_classroom_fetches_missing_days(self):
+        calls, call_api = self.call_api('classroom_events')
+        cache = ClassroomRangeCache()
+        oid = '8ba13bec-5213-4114-bd77-fc202c6aa4e5'
+        with patch('spbu.util.call_api', side_effect=call_api):
+            cache.get_classroom_events(oid, datetime(2019, 5, 20, 8),
+                                       datetime(2019, 5, 22, 18))
+            self.assertEqual(calls, [('201905200000', '201905230000')])
+            events = cache.get_classroom_events(oid, datetime(2019, 5, 21),
+                                                datetime(2019, 5, 26))
+            self.assertEqual(calls, [('201905200000', '201905230000'),
+                                     ('201905230000', '201905260000')])
+
+        expected = ClassroomEvents.de_json(load_dataset('classroom_events'))
+        expected.from_datetime = datetime(2019, 5, 21)
+        expected.to_datetime = datetime(2019, 5, 26)
+        self.assertEqual(
+            sorted((o.start, o.end, o.subject)
+                   for o in iter_classroom_occurrences(events)),
+            sorted((o.start, o.end, o.subject)
+                   for o in iter_classroom_occurrences(expected))
+        )
+        self.assertEqual(events.oid, oid)
+        self.assertEqual(events.display_text, expected.display_text)
+        self.assertEqual([day.day for day in events.classroom_events_days],
+                         [2, 3, 4, 5])
+
+    def test_educator_fetches_missing_days(self):
+        calls, call_api = self.call_api('educator_events')
+        cache = EducatorRangeCache()
+        with patch('spbu.util.call_api', side_effect=call_api):
+            cache.get_educator_events(1420, date(2019, 4, 1),
+                                      date(2019, 4, 2))
+            cache.get_educator_events(1420, date(2019, 4, 4),
+                                      date(2019, 4, 4))
+            events = cache.get_educator_events(1420, date(2019, 4, 1),
+                                               date(2019, 4, 7))
+            self.assertEqual(calls[:2], [
+                (date(2019, 4, 1), date(2019, 4, 2)),
+                (date(2019, 4, 4), date(2019, 4, 4)),
+            ])
+            self.assertCountEqual(calls[2:], [
+                (date(2019, 4, 3), date(2019, 4, 3)),
+                (date(2019, 4, 5), date(2019, 4, 7)),
+            ])
+            cache.get_educator_events(1420, date(2019, 4, 2),
+                                      date(2019, 4, 6))
+            self.assertEqual(len(calls), 4)
+        self.assertEqual(events.educator_master_id, 1420)
+        self.assertEqual(
+            [day.day for day in events.educator_events_days],
+            [date(2019, 4, 1), date(2019, 4, 2), date(2019, 4, 3),
+             date(2019, 4, 4), date(2019, 4, 6)]
+        )
+        self.assertEqual(
+            len(list(iter_educator_occurrences(events))),
+            len(list(iter_educator_occurrences(EducatorEvents.de_json(
+                load_dataset('educator_events')
+            ))))
+        )
+
+    def test_empty_range(self):
+        calls, call_api = self.call_api('educator_events')
+        with patch('spbu.util.call_api', side_effect=call_api):
+            with self.assertRaises(ValueError):
+                EducatorRangeCache().get_educator_events(
+                    1420, date(2019, 4, 7), date(2019, 4, 1)
+                )
+        self.assertEqual(calls, [])
+
+    def test_fetch_is_abstract(self):
+        with self.assertRaises(TypeError):
+            RangeCache()
+
+
+if __name__ == '__main__':
+    unittest.main()
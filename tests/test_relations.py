@@ -0,0 +1,68 @@
+import copy
+import unittest
+
+from spbu.relations import RelationIndex
+from spbu.search import GroupResolver
+from spbu.types import EducatorEventsTerm, GroupEvents, PGGroup
+
+from helpers import load_dataset
+
+
+class TestRelationIndex(unittest.TestCase):
+    group_events = load_dataset('groups_events')
+    term = load_dataset('educator_events_term')
+    room = 'ул. Смольного, д. 1/3, корп. подъезд 9, 143'
+
+    def with_educator(self, educator_id: int) -> dict:
+        group_events = copy.deepcopy(self.group_events)
+        event = group_events['Days'][1]['DayStudyEvents'][0]
+        event['EducatorIds'] = [{'Item1': educator_id, 'Item2': 'Иванов'}]
+        return group_events
+
+    def test_group_events(self):
+        index = RelationIndex()
+        index.add_group_events(GroupEvents.de_json(self.with_educator(7)))
+        self.assertEqual(index.groups_of_educator(7), {19082})
+        self.assertEqual(index.educators_of_group(19082), {7})
+        self.assertIn(self.room, index.classrooms_of_group(19082))
+        self.assertEqual(index.groups_of_classroom(self.room), {19082})
+        # the event has two rooms and no educators per room
+        self.assertEqual(index.classrooms_of_educator(7), set())
+        self.assertEqual(index.groups_of_educator(8), set())
+
+    def test_incremental_update(self):
+        index = RelationIndex()
+        index.add_group_events(GroupEvents.de_json(self.with_educator(7)))
+        index.add_group_events(GroupEvents.de_json(self.with_educator(8)))
+        self.assertEqual(len(index), 1)
+        self.assertEqual(index.groups_of_educator(7), set())
+        self.assertEqual(index.groups_of_educator(8), {19082})
+
+        next_week = self.with_educator(7)
+        next_week['WeekMonday'] = '2019-06-03'
+        index.add_group_events(GroupEvents.de_json(next_week))
+        self.assertEqual(len(index), 2)
+        self.assertEqual(index.educators_of_group(19082), {7, 8})
+
+    def test_educator_term(self):
+        resolver = GroupResolver([
+            PGGroup(student_group_id=1, student_group_name='16.Б06-ии',
+                    student_group_study_form=None,
+                    student_group_profiles=None, public_division_alias=None)
+        ])
+        index = RelationIndex(resolver)
+        index.add_educator_term(EducatorEventsTerm.de_json(self.term))
+        groups = index.groups_of_educator(2254)
+        self.assertIn(1, groups)
+        self.assertIn('16.Б08-ии', groups)
+        self.assertEqual(index.educators_of_group(1), {2254})
+        self.assertIn('В.О., Менделеевская линия, д. 5, 103',
+                      index.classrooms_of_group(1))
+        self.assertEqual(
+            index.educators_of_classroom('В.О.,  Менделеевская линия, д. 5, 1'),
+            {2254}
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,231 @@
+import threading
+import unittest
+from datetime import date, datetime
+from unittest.mock import patch
+
+from spbu.classrooms import ClassroomSchedule
+from spbu.consts import APIMethods, SeatingTypes
+from spbu.intervals import IntervalIndex
+from spbu.occurrences import expand_dates
+from spbu.rooms import RoomFinder
+from spbu.types import ApiException, ClassroomEvents
+
+from helpers import load_dataset
+
+
+class TestExpandDates(unittest.TestCase):
+    def test_expand_dates(self):
+        term = date(2019, 2, 1), date(2019, 8, 1)
+        self.assertEqual(expand_dates(['15.4'], *term), [date(2019, 4, 15)])
+        self.assertEqual(
+            expand_dates(['с 29.5 по 5.6 (2)', 'с 22.2 по 8.3 (2)'], *term),
+            [date(2019, 5, 29), date(2019, 6, 5),
+             date(2019, 2, 22), date(2019, 3, 8)]
+        )
+        self.assertEqual(
+            len(expand_dates(['с 26.2 по 7.5 (11)'], *term)), 11
+        )
+        self.assertEqual(expand_dates(['unknown'], *term), [])
+
+    def test_expand_dates_across_years(self):
+        term = date(2019, 9, 1), date(2020, 1, 31)
+        self.assertEqual(
+            expand_dates(['с 24.12 по 14.1', '10.1'], *term),
+            [date(2019, 12, 24), date(2019, 12, 31), date(2020, 1, 7),
+             date(2020, 1, 14), date(2020, 1, 10)]
+        )
+
+    def test_expand_dates_to_leap_day(self):
+        term = date(2019, 9, 1), date(2020, 5, 31)
+        dates = expand_dates(['с 3.12 по 29.2 (13)'], *term)
+        self.assertEqual((dates[0], dates[-1]),
+                         (date(2019, 12, 3), date(2020, 2, 25)))
+        self.assertEqual(len(dates), 13)
+        self.assertEqual(expand_dates(['30.2', 'с 1.2 по 30.2'], *term), [])
+
+
+class TestIntervalIndex(unittest.TestCase):
+    def test_interval_index(self):
+        index = IntervalIndex([
+            (datetime(2019, 5, 20, 12), datetime(2019, 5, 20, 13)),
+            (datetime(2019, 5, 20, 9), datetime(2019, 5, 20, 10)),
+            (datetime(2019, 5, 20, 12, 30), datetime(2019, 5, 20, 14)),
+        ])
+        self.assertEqual(len(index), 2)
+        self.assertTrue(index.overlaps(datetime(2019, 5, 20, 13),
+                                       datetime(2019, 5, 20, 15)))
+        self.assertTrue(index.overlaps(datetime(2019, 5, 20, 8),
+                                       datetime(2019, 5, 20, 9, 1)))
+        self.assertFalse(index.overlaps(datetime(2019, 5, 20, 10),
+                                        datetime(2019, 5, 20, 12)))
+        self.assertTrue(index.covers(datetime(2019, 5, 20, 12, 15),
+                                     datetime(2019, 5, 20, 14)))
+        self.assertFalse(index.covers(datetime(2019, 5, 20, 9),
+                                      datetime(2019, 5, 20, 11)))
+        self.assertEqual(
+            list(index.gaps(datetime(2019, 5, 20, 9, 30),
+                            datetime(2019, 5, 20, 15))),
+            [(datetime(2019, 5, 20, 10), datetime(2019, 5, 20, 12)),
+             (datetime(2019, 5, 20, 14), datetime(2019, 5, 20, 15))]
+        )
+
+
+class TestClassroomSchedule(unittest.TestCase):
+    classroom_events = load_dataset('classroom_events')
+
+    def test_is_busy(self):
+        schedule = ClassroomSchedule('oid')
+        schedule.add(ClassroomEvents.de_json(self.classroom_events))
+        with patch('spbu.util.call_api') as call_api:
+            busy = schedule.is_busy(datetime(2019, 5, 20, 12, 30),
+                                    datetime(2019, 5, 20, 13))
+            free = schedule.is_busy(datetime(2019, 5, 20, 8),
+                                    datetime(2019, 5, 20, 9))
+        call_api.assert_not_called()
+        self.assertTrue(busy.is_busy)
+        self.assertEqual(busy.oid, 'oid')
+        self.assertEqual(busy.from_datetime, datetime(2019, 5, 20, 12, 30))
+        self.assertEqual(busy.to_datetime, datetime(2019, 5, 20, 13))
+        self.assertFalse(free.is_busy)
+
+    def test_falls_back_to_api(self):
+        schedule = ClassroomSchedule('oid')
+        schedule.add(ClassroomEvents.de_json(self.classroom_events))
+        with patch('spbu.util.call_api',
+                   return_value=load_dataset('classroom_busyness')
+                   ) as call_api:
+            schedule.is_busy(datetime(2019, 5, 25, 10),
+                             datetime(2019, 5, 25, 12))
+        self.assertEqual(call_api.call_args[1]['method'],
+                         APIMethods.C_IS_BUSY)
+
+    def test_add_replaces_range(self):
+        schedule = ClassroomSchedule('oid')
+        schedule.add(ClassroomEvents.de_json(self.classroom_events))
+        empty = dict(self.classroom_events, ClassroomEventsDays=[],
+                     From='2019-05-20T12:00:00', To='2019-05-21T00:00:00')
+        schedule.add(ClassroomEvents.de_json(empty))
+        self.assertFalse(
+            schedule.is_busy(datetime(2019, 5, 20, 12, 30),
+                             datetime(2019, 5, 20, 13)).is_busy
+        )
+        self.assertEqual(list(schedule.covered),
+                         [(datetime(2019, 5, 20, 8),
+                           datetime(2019, 5, 25, 11))])
+
+
+class TestRoomFinder(unittest.TestCase):
+    responses = {
+        APIMethods.A_ADDRESSES: load_dataset('addresses'),
+        APIMethods.A_CLASSROOMS: load_dataset('classrooms'),
+        APIMethods.C_EVENTS: load_dataset('classroom_events'),
+    }
+    address_oid = responses[APIMethods.A_ADDRESSES][0]['Oid']
+
+    def _load(self) -> RoomFinder:
+        with patch('spbu.util.call_api',
+                   side_effect=lambda method, **kwargs:
+                   self.responses[method]) as call_api:
+            finder = RoomFinder(datetime(2019, 5, 20, 8),
+                                datetime(2019, 5, 25, 11),
+                                address_oids=[self.address_oid]).load()
+        self.assertEqual(call_api.call_count,
+                         2 + len(self.responses[APIMethods.A_CLASSROOMS]))
+        return finder
+
+    def test_find_free_rooms(self):
+        finder = self._load()
+        self.assertEqual(
+            finder.find_free_rooms(datetime(2019, 5, 20, 12, 30),
+                                   datetime(2019, 5, 20, 13)),
+            []
+        )
+
+        rooms = finder.find_free_rooms(datetime(2019, 5, 20, 9),
+                                       datetime(2019, 5, 20, 11, 30),
+                                       capacity=60,
+                                       seating=SeatingTypes.THEATER,
+                                       near=self.address_oid)
+        expected = [
+            classroom for classroom in
+            self.responses[APIMethods.A_CLASSROOMS]
+            if classroom['Capacity'] >= 60 and classroom['SeatingType'] == 0
+        ]
+        self.assertEqual(len(rooms), len(expected))
+        self.assertTrue(rooms)
+        self.assertEqual(
+            [room.classroom.capacity for room in rooms],
+            sorted(classroom['Capacity'] for classroom in expected)
+        )
+        self.assertEqual(
+            finder.find_free_rooms(datetime(2019, 5, 20, 9),
+                                   datetime(2019, 5, 20, 11, 30),
+                                   seating=SeatingTypes.ROUNDTABLE),
+            [
+                room for room in finder.rooms.values()
+                if room.classroom.seating_type == 2
+            ]
+        )
+
+    def test_refreshing(self):
+        finder = self._load()
+        refreshed = threading.Event()
+        with patch('spbu.util.call_api',
+                   side_effect=lambda method, **kwargs: refreshed.set() or
+                   self.responses[method]):
+            finder.start_refreshing(0.01)
+            self.assertTrue(refreshed.wait(5))
+            finder.stop_refreshing()
+
+    def test_failed_rooms(self):
+        failing = self.responses[APIMethods.A_CLASSROOMS][0]['Oid']
+
+        def call_api(method, path_values=None, **kwargs):
+            if method == APIMethods.C_EVENTS \
+                    and path_values['oid'] == failing:
+                raise ApiException('Server error', method.name, None)
+            return self.responses[method]
+
+        with patch('spbu.util.call_api', side_effect=call_api):
+            finder = RoomFinder(datetime(2019, 5, 20, 8),
+                                datetime(2019, 5, 25, 11),
+                                address_oids=[self.address_oid]).load()
+        self.assertEqual(list(finder.failures), [failing])
+        self.assertIsNone(finder.rooms[failing].schedule)
+        rooms = finder.find_free_rooms(datetime(2019, 5, 20, 9),
+                                       datetime(2019, 5, 20, 11, 30))
+        self.assertTrue(rooms)
+        self.assertNotIn(failing, [room.classroom.oid for room in rooms])
+
+        with patch('spbu.util.call_api',
+                   side_effect=lambda method, **kwargs:
+                   self.responses[method]):
+            finder._try_refresh_room(failing)
+        self.assertEqual(finder.failures, {})
+
+    def test_malformed_room(self):
+        failing = self.responses[APIMethods.A_CLASSROOMS][0]['Oid']
+
+        def call_api(method, path_values=None, **kwargs):
+            if method == APIMethods.C_EVENTS \
+                    and path_values['oid'] == failing:
+                raise ValueError('Expecting value')
+            return self.responses[method]
+
+        with patch('spbu.util.call_api', side_effect=call_api):
+            finder = RoomFinder(datetime(2019, 5, 20, 8),
+                                datetime(2019, 5, 25, 11),
+                                address_oids=[self.address_oid]).load()
+        self.assertEqual(list(finder.failures), [failing])
+        self.assertEqual(len(finder.rooms),
+                         len(self.responses[APIMethods.A_CLASSROOMS]))
+
+    def test_outside_loaded_range(self):
+        finder = self._load()
+        with self.assertRaises(ValueError):
+            finder.find_free_rooms(datetime(2019, 5, 25, 10),
+                                   datetime(2019, 5, 25, 12))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from spbu.search import EducatorIndex, GroupResolver
+from spbu.types import Educator, PGGroup
+
+from helpers import load_dataset
+
+
+class TestEducatorIndex(unittest.TestCase):
+    educators = [
+        Educator.de_json(educator)
+        for educator in load_dataset('educators')['Educators']
+    ]
+
+    def test_search(self):
+        index = EducatorIndex(self.educators)
+        self.assertEqual(len(index), len(self.educators))
+        self.assertEqual(len(index.search('смирнов')), len(self.educators))
+        found = index.search('СМИРНОВ Алексей В')
+        self.assertEqual(
+            sorted(educator.id for educator in found),
+            sorted(educator.id for educator in self.educators
+                   if educator.full_name.startswith('Смирнов Алексей В'))
+        )
+        self.assertEqual(found, sorted(
+            found, key=lambda educator: (educator.display_name, educator.id)
+        ))
+        self.assertTrue(index.search('мирно'))
+        self.assertEqual(index.search('иванов'), [])
+        self.assertEqual(index.search(' '), [])
+        self.assertEqual(len(index.search('смирнов', limit=2)), 2)
+
+    def test_department(self):
+        index = EducatorIndex(self.educators)
+        found = index.search('смирнов', department='высшей геометрии')
+        self.assertEqual([educator.id for educator in found], [11834])
+
+    def test_update_and_remove(self):
+        index = EducatorIndex(self.educators)
+        self.assertEqual(index.update(self.educators), 0)
+        renamed = Educator(id=6775, display_name='Петров А. А.',
+                           full_name='Петров Алексей Алексеевич')
+        self.assertEqual(index.update([renamed]), 1)
+        self.assertEqual(index.search('петров'), [renamed])
+        self.assertNotIn(6775, [e.id for e in index.search('смирнов')])
+        index.remove([6775])
+        self.assertEqual(index.search('петров'), [])
+        self.assertNotIn(6775, index)
+
+    def test_refresh(self):
+        response = load_dataset('educators')
+        with patch('spbu.util.call_api', return_value=response) as call_api:
+            index = EducatorIndex.seed(['смирнов'])
+        self.assertEqual(call_api.call_count, 1)
+        self.assertEqual(len(index), len(self.educators))
+
+        response = dict(response, Educators=response['Educators'][1:])
+        with patch('spbu.util.call_api', return_value=response):
+            self.assertEqual(index.refresh(['смирнов']), 0)
+            self.assertEqual(len(index), len(self.educators))
+            self.assertEqual(index.refresh(), 1)
+        self.assertEqual(len(index), len(self.educators) - 1)
+
+
+class TestGroupResolver(unittest.TestCase):
+    groups = [
+        PGGroup.de_json(group) for group in load_dataset('groups')['Groups']
+    ]
+
+    def test_resolve(self):
+        resolver = GroupResolver(self.groups)
+        group = self.groups[0]
+        self.assertEqual(group.student_group_name, '18.Б01-ю')
+        for name in ('18.Б01-ю', ' 18 б01 Ю', '18.Б01-Ю', '18,б01/ю'):
+            self.assertEqual(resolver.resolve(name), [group])
+        self.assertEqual(resolver.resolve_id('18.Б01-ю'),
+                         group.student_group_id)
+        self.assertEqual(resolver.resolve(''), [])
+        self.assertEqual(resolver.resolve('совсем другое'), [])
+
+    def test_fuzzy(self):
+        resolver = GroupResolver(self.groups)
+        group = self.groups[0]
+        # a missing letter, an extra letter and a wrong letter
+        for name in ('18.Б01-', '18.Б001-ю', '18.Б01-я'):
+            self.assertEqual(resolver.resolve(name), [group])
+        # equally close to 18.Б01-ю ... 18.Б09-ю
+        self.assertEqual(
+            [g.student_group_name for g in resolver.resolve('18.Б0-ю')],
+            [f'18.Б0{i}-ю' for i in range(1, 10)]
+        )
+        self.assertIsNone(resolver.resolve_id('18.Б0-ю'))
+
+    def test_save_and_load(self):
+        resolver = GroupResolver(self.groups)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'groups.json')
+            resolver.save(path)
+            loaded = GroupResolver.load(path)
+        self.assertEqual(len(loaded), len(resolver))
+        self.assertEqual(loaded.resolve('18.Б01-ю'),
+                         resolver.resolve('18.Б01-ю'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from spbu.consts import APIMethods
+from spbu.intervals import merge
+from spbu.slots import FreeSlot, find_free_slots
+
+from helpers import load_dataset
+
+
+class TestMerge(unittest.TestCase):
+    def test_merge(self):
+        self.assertEqual(
+            list(merge([(1, 3), (6, 8)], [(2, 4), (8, 9)], [], [(5, 5)])),
+            [(1, 4), (6, 9)]
+        )
+
+
+class TestFindFreeSlots(unittest.TestCase):
+    responses = {
+        APIMethods.G_EVENTS_FROM_TO: load_dataset('groups_events'),
+        APIMethods.E_EVENTS_FROM_TO: load_dataset('educator_events'),
+        APIMethods.C_EVENTS: load_dataset('classroom_events'),
+    }
+
+    def test_find_free_slots(self):
+        with patch('spbu.util.call_api',
+                   side_effect=lambda method, **kwargs:
+                   self.responses[method]) as call_api:
+            slots = find_free_slots(datetime(2019, 5, 30),
+                                    datetime(2019, 5, 31),
+                                    group_ids=[1, 2], educator_ids=[3],
+                                    classroom_oids=['oid'])
+        self.assertEqual(call_api.call_count, 4)
+        self.assertEqual(slots, [
+            FreeSlot(datetime(2019, 5, 30, 9), datetime(2019, 5, 30, 15, 20)),
+            FreeSlot(datetime(2019, 5, 30, 18, 30), datetime(2019, 5, 30, 21)),
+        ])
+
+    def test_min_duration_and_limit(self):
+        with patch('spbu.util.call_api',
+                   return_value=self.responses[APIMethods.G_EVENTS_FROM_TO]):
+            slots = find_free_slots(datetime(2019, 5, 30, 12),
+                                    datetime(2019, 5, 31, 12),
+                                    group_ids=[1],
+                                    min_duration=timedelta(minutes=10))
+            self.assertEqual(
+                [(slot.start, slot.end) for slot in slots],
+                [(datetime(2019, 5, 30, 12), datetime(2019, 5, 30, 15, 20)),
+                 (datetime(2019, 5, 31, 9), datetime(2019, 5, 31, 12)),
+                 (datetime(2019, 5, 30, 18, 30), datetime(2019, 5, 30, 21)),
+                 (datetime(2019, 5, 30, 16, 50), datetime(2019, 5, 30, 17))]
+            )
+            self.assertEqual(len(find_free_slots(datetime(2019, 5, 30, 12),
+                                                 datetime(2019, 5, 31, 12),
+                                                 group_ids=[1], limit=1)),
+                             1)
+
+
+if __name__ == '__main__':
+    unittest.main()
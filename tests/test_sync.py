@@ -0,0 +1,93 @@
+import json
+import unittest
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+
+import spbu
+from spbu.snapshot import MemorySink, META_KEY, group_events_key
+from spbu.sync import fingerprint
+
+from helpers import load_raw_dataset
+
+
+class TestResync(unittest.TestCase):
+    now = datetime(2019, 5, 28, 12, 0)
+    content = load_raw_dataset('groups_events')
+    changed_content = content.replace(
+        '"Subject":"Научно-исследовательская работа'.encode(),
+        '"Subject":"Научно-исследовательская практика'.encode()
+    )
+    flagged_content = content.replace(b'"TimeWasChanged":false',
+                                      b'"TimeWasChanged":true')
+
+    def _make_sink(self) -> MemorySink:
+        sink = MemorySink()
+        sink.put(META_KEY, json.dumps({
+            'week_monday': '2019-05-20',
+            'weeks': 4,
+            'aliases': None,
+            'started_at': (self.now - timedelta(hours=3)).timestamp()
+        }).encode())
+        weeks = {
+            (1, date(2019, 5, 20)): self.content,
+            (1, date(2019, 5, 27)): self.content,
+            (1, date(2019, 6, 3)): self.content,
+            (1, date(2019, 6, 10)): self.content,
+            (2, date(2019, 6, 10)): self.flagged_content,
+        }
+        for (group_id, week_monday), content in weeks.items():
+            sink.put(group_events_key(group_id, week_monday), content)
+        return sink
+
+    def _call_api_raw(self, method, path_values, params):
+        if path_values == {'id': 1, 'from': date(2019, 6, 3)}:
+            return self.changed_content
+        if path_values['id'] == 2:
+            return self.flagged_content
+        return self.content
+
+    def test_resync(self):
+        sink = self._make_sink()
+        with patch('spbu.util.call_api_raw',
+                   side_effect=self._call_api_raw) as call_api_raw:
+            report = spbu.resync(sink, now=self.now)
+
+        self.assertEqual(
+            sorted((c[0][1]['id'], c[0][1]['from'])
+                   for c in call_api_raw.call_args_list),
+            [(1, date(2019, 5, 27)), (1, date(2019, 6, 3)),
+             (2, date(2019, 6, 10))]
+        )
+        self.assertEqual(report.checked, 3)
+        self.assertEqual(report.changed, 1)
+        self.assertEqual(report.not_due, 2)
+        self.assertEqual(report.requests_saved, 2)
+        self.assertEqual(report.writes_saved, 2)
+        self.assertEqual(report.bytes_written, len(self.changed_content))
+        self.assertEqual(report.saved_ratio, 0.4)
+        self.assertEqual(
+            sink.get(group_events_key(1, date(2019, 6, 3))),
+            self.changed_content
+        )
+
+        with patch('spbu.util.call_api_raw',
+                   side_effect=self._call_api_raw) as call_api_raw:
+            report = spbu.resync(sink, now=self.now + timedelta(minutes=5))
+        self.assertFalse(call_api_raw.called)
+        self.assertEqual(report.not_due, 5)
+
+    def test_fingerprint(self):
+        relinked = json.loads(self.content)
+        relinked['IsCurrentWeekReferenceAvailable'] = True
+        self.assertEqual(
+            fingerprint(self.content),
+            fingerprint(json.dumps(relinked).encode())
+        )
+        self.assertNotEqual(
+            fingerprint(self.content),
+            fingerprint(self.changed_content)
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
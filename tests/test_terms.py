@@ -0,0 +1,92 @@
+import unittest
+from datetime import date
+from unittest.mock import patch
+
+from spbu.consts import APIMethods
+from spbu.occurrences import (iter_educator_occurrences,
+                              iter_educator_term_occurrences)
+from spbu.terms import EducatorTerm
+from spbu.timetable import Timetable
+from spbu.types import EducatorEventsTerm
+
+from helpers import load_dataset
+
+
+class TestEducatorTerm(unittest.TestCase):
+    def setUp(self):
+        self.term = EducatorEventsTerm.de_json(
+            load_dataset('educator_events_term')
+        )
+        self.educator_term = EducatorTerm(self.term)
+
+    def test_matches_term_occurrences(self):
+        for _from, _to in ((date(2019, 4, 1), date(2019, 4, 7)),
+                           (date(2019, 2, 1), date(2019, 8, 1)),
+                           (date(2019, 5, 20), date(2019, 5, 20))):
+            with self.subTest(_from=_from, _to=_to):
+                events = self.educator_term.get_events(_from, _to)
+                expected = sorted(
+                    (o.start, o.end, o.subject)
+                    for o in iter_educator_term_occurrences(self.term,
+                                                            _from, _to)
+                )
+                self.assertEqual(sorted(
+                    (o.start, o.end, o.subject)
+                    for o in iter_educator_occurrences(events)
+                ), expected)
+                self.assertEqual(
+                    [day.day for day in events.educator_events_days],
+                    self.educator_term.dates(_from, _to)
+                )
+
+    def test_events_shape(self):
+        events = self.educator_term.get_events(date(2019, 4, 1),
+                                               date(2019, 4, 7))
+        self.assertEqual(events.educator_master_id, 2254)
+        day = events.educator_events_days[0]
+        self.assertEqual(day.day, date(2019, 4, 2))
+        self.assertEqual(day.day_string, 'вторник, 2 апреля')
+        event = day.day_study_events[0]
+        self.assertEqual(event.start.date(), date(2019, 4, 2))
+        self.assertTrue(event.date_with_time_interval_string
+                        .startswith('2 апреля '))
+
+    def test_covers(self):
+        self.assertTrue(self.educator_term.covers(date(2019, 2, 1),
+                                                  date(2019, 8, 1)))
+        self.assertFalse(self.educator_term.covers(date(2019, 1, 28),
+                                                   date(2019, 2, 3)))
+        self.assertEqual(
+            self.educator_term.get_events(date(2019, 9, 1),
+                                          date(2019, 9, 7)
+                                          ).educator_events_days,
+            []
+        )
+
+
+class TestTimetableTerms(unittest.TestCase):
+    def test_ranges_within_term_are_local(self):
+        calls = []
+
+        def call_api(method, path_values=None, params=None):
+            calls.append(method)
+            if method == APIMethods.E_EVENTS:
+                return load_dataset('educator_events_term')
+            return load_dataset('educator_events')
+
+        timetable = Timetable()
+        with patch('spbu.util.call_api', side_effect=call_api):
+            timetable.get_educator_term_events(2254)
+            timetable.get_educator_term_events(2254)
+            events = timetable.get_educator_events(2254, date(2019, 4, 1),
+                                                   date(2019, 4, 30))
+            self.assertEqual(calls, [APIMethods.E_EVENTS])
+            self.assertEqual(events.educator_master_id, 2254)
+            timetable.get_educator_events(2254, date(2019, 7, 29),
+                                          date(2019, 8, 4))
+        self.assertEqual(calls, [APIMethods.E_EVENTS,
+                                 APIMethods.E_EVENTS_FROM_TO])
+
+
+if __name__ == '__main__':
+    unittest.main()
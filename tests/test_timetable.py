@@ -0,0 +1,182 @@
+import copy
+import unittest
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+
+from spbu.consts import LessonsTypes
+from spbu.timetable import Timetable, split_lessons_types
+from spbu.types import GroupEvents
+
+from helpers import load_dataset
+
+
+def with_kind_codes(dataset: dict, days_field: str, codes) -> dict:
+    dataset = copy.deepcopy(dataset)
+    events = [
+        event for day in dataset[days_field]
+        for event in day['DayStudyEvents']
+    ]
+    for event, code in zip(events, codes * len(events)):
+        event['StudyEventsTimeTableKindCode'] = code
+    return dataset
+
+
+class TestSplitLessonsTypes(unittest.TestCase):
+    def test_split(self):
+        group_events = GroupEvents.de_json(
+            with_kind_codes(load_dataset('groups_events'), 'Days', [1, 2])
+        )
+        views = split_lessons_types(group_events)
+        self.assertIs(views[LessonsTypes.ALL], group_events)
+        primary = views[LessonsTypes.PRIMARY]
+        attestation = views[LessonsTypes.ATTESTATION]
+        self.assertEqual(views[LessonsTypes.FINAL].days, [])
+        self.assertEqual(primary.student_group_id,
+                         group_events.student_group_id)
+        self.assertEqual(
+            sum(len(day.day_study_events) for day in primary.days)
+            + sum(len(day.day_study_events) for day in attestation.days),
+            sum(len(day.day_study_events) for day in group_events.days)
+        )
+        for day in primary.days:
+            self.assertTrue(day.day_study_events)
+            for event in day.day_study_events:
+                self.assertEqual(event.study_events_timetable_kind_code, 1)
+
+    def test_unknown_kind_codes(self):
+        group_events = GroupEvents.de_json(load_dataset('groups_events'))
+        self.assertIsNone(split_lessons_types(group_events))
+
+
+class TestTimetable(unittest.TestCase):
+    def call_api(self, response):
+        calls = []
+
+        def call_api(method, path_values=None, params=None):
+            calls.append(params['timetable'])
+            return response
+        return calls, call_api
+
+    def test_one_request_for_every_lessons_type(self):
+        calls, call_api = self.call_api(with_kind_codes(
+            load_dataset('educator_events'), 'EducatorEventsDays', [1, 2, 3]
+        ))
+        timetable = Timetable()
+        with patch('spbu.util.call_api', side_effect=call_api):
+            views = {
+                lessons_type: timetable.get_educator_events(
+                    1420, date(2019, 4, 1), date(2019, 4, 7), lessons_type
+                )
+                for lessons_type in (LessonsTypes.PRIMARY,
+                                     LessonsTypes.ATTESTATION,
+                                     LessonsTypes.FINAL, LessonsTypes.ALL)
+            }
+            self.assertEqual(calls, ['All'])
+            timetable.get_educator_events(1420, date(2019, 4, 1),
+                                          date(2019, 4, 7),
+                                          LessonsTypes.UNKNOWN)
+            self.assertEqual(calls, ['All', 'Unknown'])
+        for lessons_type, code in ((LessonsTypes.PRIMARY, 1),
+                                   (LessonsTypes.ATTESTATION, 2),
+                                   (LessonsTypes.FINAL, 3)):
+            codes = {
+                event.study_events_timetable_kind_code
+                for day in views[lessons_type].educator_events_days
+                for event in day.day_study_events
+            }
+            self.assertEqual(codes, {code})
+
+    def test_unknown_kind_codes_are_not_split(self):
+        calls, call_api = self.call_api(load_dataset('groups_events'))
+        timetable = Timetable()
+        with patch('spbu.util.call_api', side_effect=call_api):
+            timetable.get_group_events(19082, date(2019, 5, 27),
+                                       lessons_type=LessonsTypes.PRIMARY)
+            timetable.get_group_events(19082, date(2019, 5, 27),
+                                       lessons_type=LessonsTypes.ALL)
+            timetable.get_group_events(19082, date(2019, 5, 27),
+                                       lessons_type=LessonsTypes.PRIMARY)
+            self.assertEqual(calls, ['All', 'Primary'])
+            # the group's kind codes are known not to split, so the first
+            # request of another week is a single one
+            timetable.get_group_events(19082, date(2019, 6, 3),
+                                       lessons_type=LessonsTypes.ATTESTATION)
+            self.assertEqual(calls, ['All', 'Primary', 'Attestation'])
+            # while other groups still try splitting
+            timetable.get_group_events(19083, date(2019, 5, 27),
+                                       lessons_type=LessonsTypes.PRIMARY)
+        self.assertEqual(calls, ['All', 'Primary', 'Attestation', 'All',
+                                 'Primary'])
+
+    def test_split_disabled(self):
+        calls, call_api = self.call_api(load_dataset('groups_events'))
+        timetable = Timetable(split_lessons_types=False)
+        with patch('spbu.util.call_api', side_effect=call_api):
+            timetable.get_group_events(19082,
+                                       lessons_type=LessonsTypes.PRIMARY)
+            timetable.get_group_events(19082,
+                                       lessons_type=LessonsTypes.FINAL)
+        self.assertEqual(calls, ['Primary', 'Final'])
+
+
+class TestGroupWeeks(unittest.TestCase):
+    def call_api(self):
+        calls = []
+        dataset = load_dataset('groups_events')
+
+        def call_api(method, path_values=None, params=None):
+            calls.append(path_values.get('from'))
+            # the dataset's week moved to the requested one
+            monday = path_values.get('from') or date(2019, 5, 27)
+            monday -= timedelta(days=monday.weekday())
+            shift = monday - date(2019, 5, 27)
+            week = copy.deepcopy(dataset)
+            week['WeekMonday'] = monday.isoformat()
+            for day in week['Days']:
+                day_date = datetime.strptime(day['Day'], '%Y-%m-%dT%H:%M:%S')
+                day['Day'] = (day_date + shift).isoformat()
+            return week
+        return calls, call_api
+
+    def test_dates_of_a_week_share_an_entry(self):
+        calls, call_api = self.call_api()
+        timetable = Timetable()
+        with patch('spbu.util.call_api', side_effect=call_api):
+            current = timetable.get_group_events(19082)
+            tuesday = timetable.get_group_events(19082, date(2019, 5, 28))
+            sunday = timetable.get_group_events(19082, date(2019, 6, 2))
+            timetable.get_group_events(19082, date(2019, 6, 4))
+        self.assertIs(tuesday, current)
+        self.assertIs(sunday, current)
+        self.assertEqual(calls, [None, date(2019, 6, 3)])
+
+    def test_ranges_are_split_into_weeks(self):
+        calls, call_api = self.call_api()
+        timetable = Timetable()
+        with patch('spbu.util.call_api', side_effect=call_api):
+            timetable.get_group_events(19082, date(2019, 6, 5))
+            events = timetable.get_group_events(19082, date(2019, 5, 29),
+                                                date(2019, 6, 13))
+        self.assertEqual(calls[0], date(2019, 6, 3))
+        self.assertCountEqual(calls[1:],
+                              [date(2019, 5, 27), date(2019, 6, 10)])
+        self.assertEqual(events.week_monday, date(2019, 5, 27))
+        self.assertEqual([day.day for day in events.days], [
+            date(2019, 5, 30), date(2019, 5, 31),
+            date(2019, 6, 4), date(2019, 6, 6), date(2019, 6, 7),
+            date(2019, 6, 11), date(2019, 6, 13),
+        ])
+
+    def test_ranges_not_split(self):
+        calls, call_api = self.call_api()
+        timetable = Timetable(split_group_ranges=False)
+        with patch('spbu.util.call_api', side_effect=call_api):
+            timetable.get_group_events(19082, date(2019, 5, 29),
+                                       date(2019, 6, 13))
+            timetable.get_group_events(19082, date(2019, 5, 29),
+                                       date(2019, 6, 13))
+        self.assertEqual(calls, [date(2019, 5, 29)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import json
+import unittest
+from unittest.mock import Mock, patch
+
+import spbu
+from spbu import util
+
+from helpers import load_raw_dataset
+
+
+def response(content: bytes) -> Mock:
+    return Mock(status_code=200, content=content)
+
+
+class TestParseMemo(unittest.TestCase):
+    def setUp(self):
+        util._decoded.clear()
+        util._parsed.clear()
+
+    @patch('spbu.util._make_request')
+    def test_same_body_is_parsed_once(self, make_request):
+        content = load_raw_dataset('groups_events')
+        make_request.return_value = response(content)
+        de_json = spbu.types.GroupEvents.de_json
+        loads = json.loads
+        with patch.object(spbu.types.GroupEvents, 'de_json',
+                          side_effect=de_json) as parsing, \
+                patch('json.loads', side_effect=loads) as decoding:
+            first = spbu.get_group_events(19082)
+            second = spbu.get_group_events(19083)
+            self.assertEqual(parsing.call_count, 1)
+            self.assertEqual(decoding.call_count, 1)
+            self.assertIs(first, second)
+
+            make_request.return_value = response(content + b' ')
+            third = spbu.get_group_events(19082)
+            self.assertEqual(parsing.call_count, 2)
+            self.assertEqual(decoding.call_count, 2)
+        self.assertIsNot(third, first)
+        self.assertEqual(third, first)
+
+    @patch('spbu.util._make_request')
+    def test_lists(self, make_request):
+        make_request.return_value = response(load_raw_dataset('educators'))
+        first = spbu.search_educator('Смирнов')
+        second = spbu.search_educator('Смирнов')
+        self.assertEqual(first, second)
+        self.assertIsNot(first, second)
+        self.assertIs(first[0], second[0])
+
+    def test_plain_data_is_not_memoized(self):
+        decoded = {'Oid': 'a', 'IsBusy': True}
+        first = util.parse(spbu.types.ClassroomBusyness, decoded)
+        second = util.parse(spbu.types.ClassroomBusyness, decoded)
+        self.assertIsNot(first, second)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+from datetime import date, datetime
+from unittest.mock import patch
+
+from spbu.consts import APIMethods
+from spbu.timetable import Timetable
+from spbu.warming import Warmer, next_boundary
+
+from helpers import load_dataset
+
+
+class TestWarmer(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        self.timetable = Timetable()
+
+    def call_api(self, method, path_values=None, params=None):
+        self.calls.append((method, path_values.get('id'),
+                           path_values.get('from'),
+                           params.get('showNextTerm')))
+        if method == APIMethods.E_EVENTS:
+            return load_dataset('educator_events_term')
+        return load_dataset('groups_events')
+
+    def test_next_boundary(self):
+        self.assertEqual(next_boundary(datetime(2019, 5, 26, 20)),
+                         datetime(2019, 5, 27))
+        self.assertEqual(next_boundary(datetime(2019, 5, 27)),
+                         datetime(2019, 6, 3))
+
+    def test_warm(self):
+        warmer = Warmer(self.timetable, top=1, rate=1000)
+        with patch('spbu.util.call_api', side_effect=self.call_api):
+            for _ in range(3):
+                self.timetable.get_group_events(19082, date(2019, 5, 20))
+            self.timetable.get_group_events(19083, date(2019, 5, 20))
+            self.timetable.get_educator_events(2254, date(2019, 5, 20),
+                                               date(2019, 5, 26))
+            self.timetable.get_educator_events(2254, date(2019, 5, 20),
+                                               date(2019, 5, 26))
+            self.calls.clear()
+
+            self.assertEqual(warmer.warm(datetime(2019, 5, 26, 20)), 2)
+            self.assertCountEqual(self.calls, [
+                (APIMethods.G_EVENTS_FROM, 19082, date(2019, 5, 27), None),
+                (APIMethods.E_EVENTS, 2254, None, 0),
+            ])
+            self.timetable.get_group_events(19082, date(2019, 5, 29))
+            self.timetable.get_educator_events(2254, date(2019, 5, 27),
+                                               date(2019, 6, 2))
+            self.assertEqual(len(self.calls), 2)
+        self.assertEqual(warmer.failures, 0)
+        self.assertEqual(dict(self.timetable.group_accesses), {19082: 2})
+
+    def test_current_week_is_served_after_the_boundary(self):
+        class Monday(date):
+            @classmethod
+            def today(cls):
+                return date(2019, 5, 27)
+
+        self.timetable.group_accesses[19082] = 1
+        warmer = Warmer(self.timetable, rate=1000)
+        with patch('spbu.util.call_api', side_effect=self.call_api):
+            warmer.warm(datetime(2019, 5, 26, 20))
+            self.calls.clear()
+            with patch('spbu.timetable.date', Monday):
+                events = self.timetable.get_group_events(19082)
+        self.assertEqual(self.calls, [])
+        self.assertEqual(events.week_monday, date(2019, 5, 27))
+
+    def test_next_term(self):
+        warmer = Warmer(self.timetable, rate=1000)
+        self.timetable.educator_accesses[2254] = 1
+        with patch('spbu.util.call_api', side_effect=self.call_api):
+            self.assertEqual(warmer.warm(datetime(2019, 7, 28, 20)), 2)
+        self.assertEqual(
+            sorted(call[3] for call in self.calls), [0, 1]
+        )
+
+    def test_warm_keeps_cached_entries(self):
+        self.timetable.educator_accesses[2254] = 1
+        self.timetable.group_accesses[19082] = 1
+        warmer = Warmer(self.timetable, rate=1000)
+        with patch('spbu.util.call_api', side_effect=self.call_api), \
+                patch('time.time', return_value=1000):
+            self.timetable.prefetch_educator_term(2254)
+            self.timetable.prefetch_group_week(19082, date(2019, 5, 27))
+            warmer.warm(datetime(2019, 5, 26, 20))
+        self.calls.clear()
+        with patch('spbu.util.call_api', side_effect=self.call_api), \
+                patch('time.time', return_value=1000 + 4 * 3600):
+            self.timetable.prefetch_educator_term(2254)
+            self.timetable.prefetch_group_week(19082, date(2019, 5, 27))
+        self.assertEqual(self.calls, [])
+
+    def test_unexpected_errors_are_counted(self):
+        self.timetable.group_accesses[19082] = 1
+        self.timetable.educator_accesses[2254] = 1
+        warmer = Warmer(self.timetable, rate=1000)
+        with patch('spbu.util.call_api', side_effect=ValueError):
+            self.assertEqual(warmer.warm(datetime(2019, 5, 26, 20)), 0)
+        self.assertEqual(warmer.failures, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()